@@ -0,0 +1,78 @@
+"""
+Compare response decoding paths for `protect/invoke`.
+
+- `dict + model_validate`: parse the body into dicts, then validate (the previous path).
+- `model_validate_json`: validate the body bytes directly (the current default path).
+- `RawResponse`: only extract the commonly used fields (`result_mode="raw"`).
+
+Reports time per call, peak transient memory per call and retained memory per result.
+
+Usage: `PYTHONPATH=src python -m benchmarks.decode [--calls 20000]`
+"""
+
+import tracemalloc
+from argparse import ArgumentParser
+from json import loads
+from time import perf_counter
+from typing import Any, Callable, Dict
+
+from benchmarks.stub_server import invoke_response_body
+from galileo_core.schemas.protect.response import Response
+from galileo_protect.schemas import RawResponse
+
+DECODERS: Dict[str, Callable[[bytes], Any]] = {
+    "dict + model_validate": lambda content: Response.model_validate(loads(content)),
+    "model_validate_json": Response.model_validate_json,
+    "RawResponse": RawResponse.from_json,
+}
+
+
+def reset_peak_memory() -> int:
+    """Reset the peak of the traced memory, and return the traced memory it's relative to."""
+    if hasattr(tracemalloc, "reset_peak"):
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return current
+    # Python 3.8 can't reset the peak alone, clearing the traces resets it too.
+    tracemalloc.clear_traces()
+    return 0
+
+
+def measure(decode: Callable[[bytes], Any], content: bytes, calls: int) -> Dict[str, float]:
+    start_time = perf_counter()
+    for _ in range(calls):
+        decode(content)
+    elapsed = perf_counter() - start_time
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(calls, 1000)):
+        current = reset_peak_memory()
+        decode(content)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    retained_before, _ = tracemalloc.get_traced_memory()
+    results = [decode(content) for _ in range(1000)]
+    retained_after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return {
+        "time_us": elapsed / calls * 1e6,
+        "peak_bytes": sum(peaks) / len(peaks),
+        "retained_bytes": (retained_after - retained_before) / 1000,
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    content = invoke_response_body()
+    print(f"{'decoder':<24}{'time (us)':>12}{'peak (B)':>12}{'retained (B)':>14}")
+    for name, decode in DECODERS.items():
+        result = measure(decode, content, args.calls)
+        print(f"{name:<24}{result['time_us']:>12.2f}{result['peak_bytes']:>12.0f}{result['retained_bytes']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""In-process HTTP stub of the Protect API for benchmarks."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from re import compile
+from threading import Thread
+from time import sleep, time_ns
+from typing import Any, Optional, Tuple
+from uuid import uuid4
+
+# Stage routes, `projects/{project_id}/stages` and `projects/{project_id}/stages/{stage_id}`.
+STAGE_ROUTE = compile(r"/projects/(?P<project_id>[^/]+)/stages(?:/(?P<stage_id>[^/?]+))?")
+
+
+def invoke_response_body(text: str = "benchmark") -> bytes:
+    now = time_ns()
+    return dumps(
+        {
+            "text": text,
+            "status": "NOT_TRIGGERED",
+            "trace_metadata": {"id": str(uuid4()), "received_at": now, "response_at": now, "execution_time": 0.001},
+        }
+    ).encode()
+
+
+def stage_response_body(project_id: str, stage_id: Optional[str] = None, name: str = "benchmark") -> bytes:
+    return dumps(
+        {"id": stage_id or str(uuid4()), "name": name, "project_id": project_id, "type": "local", "version": 0}
+    ).encode()
+
+
+def current_user_body() -> bytes:
+    return dumps({"id": str(uuid4()), "email": "benchmark@example.com", "role": "user"}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections, like the real API.
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, avoid the delayed ACK stall on reused
+    # connections.
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _respond(self, body: bytes, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        self.server.requests += 1  # type: ignore[attr-defined]
+        latency = self.server.latency  # type: ignore[attr-defined]
+        if latency:
+            sleep(latency)
+        stage = STAGE_ROUTE.match(self.path)
+        if self.path.endswith("/protect/invoke"):
+            self._respond(invoke_response_body())
+        elif stage is not None:
+            self._respond(stage_response_body(stage["project_id"], stage["stage_id"]))
+        elif self.path.endswith("/current_user"):
+            self._respond(current_user_body())
+        else:
+            self._respond(b"{}")
+
+    do_GET = do_POST = do_PUT = _handle
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 0), latency: float = 0) -> None:
+        super().__init__(address, StubHandler)
+        self.latency = latency
+        self.connections = 0
+        self.requests = 0
+        self._thread: Optional[Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/"
+
+    def __enter__(self) -> "StubServer":
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+        self.server_close()
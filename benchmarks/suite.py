@@ -0,0 +1,253 @@
+"""
+Benchmark suite for the client overhead of Protect, against a local stub server.
+
+The stub serves `protect/invoke`, the stage routes and the auth routes in-process, so
+that only the time spent in the client, plus a loopback round trip, is measured:
+
+- `raw_http`: a plain `httpx` request to the stub, the floor for every other benchmark.
+- `invoke`, `ainvoke`, `protect_tool`, `get_stage`: per-call latency, and overhead over
+  `raw_http`.
+- `throughput_invoke_<n>`, `throughput_ainvoke_<n>`: calls per second with `n` threads
+  calling `invoke`, or `n` concurrent `ainvoke` tasks.
+- `memory_invoke`: memory allocated per call, at peak and retained after the call.
+- `import`: time to import `galileo_protect` in a fresh interpreter.
+
+Results are printed as a table, and can be written as JSON with `--output` to compare
+versions: `--compare` reads a previous output, reports the benchmarks that regressed by
+more than `--threshold`, and exits with a non-zero status if any did.
+
+Usage: `PYTHONPATH=src python -m benchmarks.suite [--calls 1000] [--concurrency 1 8 32]
+[--output results.json] [--compare baseline.json] [--threshold 0.1]`
+"""
+
+import sys
+from argparse import ArgumentParser
+from asyncio import AbstractEventLoop, Semaphore, gather, new_event_loop
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from gc import collect
+from importlib.metadata import version
+from json import dumps, loads
+from os import environ
+from pathlib import Path
+from platform import platform, python_version
+from statistics import median
+from subprocess import check_output
+from time import perf_counter, time
+from tracemalloc import get_traced_memory
+from tracemalloc import start as start_tracemalloc
+from tracemalloc import stop as stop_tracemalloc
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Sequence
+from uuid import uuid4
+
+from httpx import Client
+from jwt import encode
+
+from benchmarks.decode import reset_peak_memory
+from benchmarks.stub_server import StubServer
+from benchmarks.sync_invoke import summarize
+from galileo_protect import ProtectConfig, __version__, ainvoke, get_stage, invoke
+from galileo_protect.constants.routes import Routes
+from galileo_protect.langchain import ProtectTool
+from galileo_protect.schemas import Payload
+
+PAYLOAD = Payload(input="benchmark")
+STAGE_NAME = "benchmark"
+# Metrics where higher is better, all the others are timings or sizes.
+HIGHER_IS_BETTER = ("calls_per_s",)
+IMPORT_CODE = "from time import perf_counter; s = perf_counter(); import galileo_protect; print(perf_counter() - s)"
+
+Results = Dict[str, Dict[str, float]]
+
+
+def configure(server: StubServer) -> ProtectConfig:
+    # The JWT isn't verified by the client, it only needs to not expire during the run.
+    jwt_token = encode({"exp": time() + 86_400}, "benchmark" * 4, algorithm="HS256")
+    return ProtectConfig.get(
+        console_url=server.url,
+        api_url=server.url,
+        jwt_token=jwt_token,
+        project_id=uuid4(),
+        stage_name=STAGE_NAME,
+    )
+
+
+def time_sync(fn: Callable[[], Any], calls: int) -> List[float]:
+    # Warm up the loop, connections and caches.
+    for _ in range(min(calls, 50)):
+        fn()
+    timings = []
+    for _ in range(calls):
+        start = perf_counter()
+        fn()
+        timings.append(perf_counter() - start)
+    return timings
+
+
+def time_async(loop: AbstractEventLoop, make_coroutine: Callable[[], Coroutine], calls: int) -> List[float]:
+    async def timed() -> List[float]:
+        for _ in range(min(calls, 50)):
+            await make_coroutine()
+        timings = []
+        for _ in range(calls):
+            start = perf_counter()
+            await make_coroutine()
+            timings.append(perf_counter() - start)
+        return timings
+
+    return loop.run_until_complete(timed())
+
+
+def throughput_sync(fn: Callable[[], Any], calls: int, threads: int) -> float:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        # Start the threads before timing.
+        list(executor.map(lambda _: fn(), range(threads)))
+        start = perf_counter()
+        list(executor.map(lambda _: fn(), range(calls)))
+        return calls / (perf_counter() - start)
+
+
+def throughput_async(
+    loop: AbstractEventLoop, make_coroutine: Callable[[], Coroutine], calls: int, concurrency: int
+) -> float:
+    async def timed() -> float:
+        semaphore = Semaphore(concurrency)
+
+        async def call() -> None:
+            async with semaphore:
+                await make_coroutine()
+
+        await gather(*(call() for _ in range(concurrency)))
+        start = perf_counter()
+        await gather(*(call() for _ in range(calls)))
+        return calls / (perf_counter() - start)
+
+    return loop.run_until_complete(timed())
+
+
+def memory_per_call(fn: Callable[[], Any], calls: int) -> Dict[str, float]:
+    for _ in range(min(calls, 50)):
+        fn()
+    collect()
+    start_tracemalloc()
+    try:
+        peaks = []
+        for _ in range(calls):
+            current = reset_peak_memory()
+            fn()
+            _, peak = get_traced_memory()
+            peaks.append(peak - current)
+        # Separate pass, resetting the peak may drop the traces.
+        collect()
+        before, _ = get_traced_memory()
+        for _ in range(calls):
+            fn()
+        collect()
+        after, _ = get_traced_memory()
+    finally:
+        stop_tracemalloc()
+    return {"peak_bytes": median(peaks), "retained_bytes": max(after - before, 0) / calls}
+
+
+def import_time(runs: int) -> Dict[str, float]:
+    timings = [float(check_output([sys.executable, "-c", IMPORT_CODE], env=environ.copy())) for _ in range(runs)]
+    return {"min_ms": min(timings) * 1e3, "median_ms": median(timings) * 1e3}
+
+
+def run_suite(calls: int, concurrency: Sequence[int], latency: float = 0) -> Results:
+    results: Results = dict()
+    # Connections are bound to the loop that opened them, so all the asynchronous
+    # benchmarks share a loop.
+    loop = new_event_loop()
+    with StubServer(latency=latency) as server:
+        configure(server)
+        tool = ProtectTool()
+        request_json = {"payload": PAYLOAD.model_dump(mode="json"), "stage_name": STAGE_NAME}
+        with Client(base_url=server.url) as http_client:
+            results["raw_http"] = summarize(
+                time_sync(lambda: http_client.post(Routes.invoke, json=request_json).json(), calls)
+            )
+        per_call: Dict[str, List[float]] = {
+            "invoke": time_sync(lambda: invoke(payload=PAYLOAD), calls),
+            "ainvoke": time_async(loop, lambda: ainvoke(payload=PAYLOAD), calls),
+            "protect_tool": time_sync(lambda: tool.run(dict(input="benchmark")), calls),
+            "get_stage": time_sync(get_stage, calls),
+        }
+        for name, timings in per_call.items():
+            summary = summarize(timings)
+            summary["overhead_us"] = summary["p50_us"] - results["raw_http"]["p50_us"]
+            results[name] = summary
+        for level in concurrency:
+            results[f"throughput_invoke_{level}"] = {
+                "calls_per_s": throughput_sync(lambda: invoke(payload=PAYLOAD), calls, level)
+            }
+            results[f"throughput_ainvoke_{level}"] = {
+                "calls_per_s": throughput_async(loop, lambda: ainvoke(payload=PAYLOAD), calls, level)
+            }
+        results["memory_invoke"] = memory_per_call(lambda: invoke(payload=PAYLOAD), min(calls, 200))
+    loop.close()
+    results["import"] = import_time(runs=5)
+    return results
+
+
+def compare(results: Results, baseline: Results, threshold: float) -> List[str]:
+    """List the metrics that regressed by more than `threshold`, relative to the baseline."""
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            previous = baseline.get(name, dict()).get(metric)
+            # Overheads are differences, too noisy to compare relatively.
+            if not previous or metric == "overhead_us":
+                continue
+            change = (value - previous) / abs(previous)
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(f"{name}.{metric}: {previous:.1f} -> {value:.1f} ({change:+.0%} worse)")
+    return regressions
+
+
+def print_results(results: Results) -> None:
+    print(f"{'benchmark':<28}{'metric':<18}{'value':>14}")
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            print(f"{name:<28}{metric:<18}{value:>14.1f}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0, help="Simulated server latency, in seconds.")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", type=Path, help="Compare with the JSON results of a previous run.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative change reported as a regression.")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.calls, args.concurrency, latency=args.latency)
+    print_results(results)
+    if args.output:
+        document = {
+            "metadata": {
+                "galileo_protect": __version__,
+                "galileo_core": version("galileo-core"),
+                "python": python_version(),
+                "platform": platform(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "calls": args.calls,
+                "latency": args.latency,
+            },
+            "results": results,
+        }
+        args.output.write_text(dumps(document, indent=2))
+    if args.compare:
+        regressions = compare(results, loads(args.compare.read_text())["results"], args.threshold)
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%} compared with {args.compare}.")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
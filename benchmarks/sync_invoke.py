@@ -0,0 +1,78 @@
+"""
+Compare the per-call overhead of the synchronous invocation path.
+
+Runs the same `protect/invoke` request against a local stub server through
+`galileo_core`'s event loop pool (used by `invoke` before) and through Protect's
+persistent background loop (used by `invoke` now).
+
+Usage: `PYTHONPATH=src python -m benchmarks.sync_invoke [--calls 2000]`
+"""
+
+from argparse import ArgumentParser
+from statistics import mean, quantiles
+from time import perf_counter
+from typing import Any, Callable, Coroutine, Dict, List
+
+from benchmarks.stub_server import StubServer
+from galileo_core.constants.request_method import RequestMethod
+from galileo_core.helpers.api_client import ApiClient
+from galileo_core.helpers.execution import async_run as core_async_run
+from galileo_protect.constants.routes import Routes
+from galileo_protect.execution import async_run as protect_async_run
+
+REQUEST_JSON = {"payload": {"input": "benchmark"}, "stage_name": "benchmark", "project_name": "benchmark"}
+
+
+async def noop() -> None:
+    return None
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    percentiles = quantiles(timings, n=100)
+    return {
+        "mean_us": mean(timings) * 1e6,
+        "p50_us": percentiles[49] * 1e6,
+        "p99_us": percentiles[98] * 1e6,
+    }
+
+
+def time_calls(run: Callable[[Coroutine], Any], make_coroutine: Callable[[], Coroutine], calls: int) -> List[float]:
+    # Warm up the loop(s) and connections.
+    for _ in range(min(calls, 50)):
+        run(make_coroutine())
+    timings = []
+    for _ in range(calls):
+        start = perf_counter()
+        run(make_coroutine())
+        timings.append(perf_counter() - start)
+    return timings
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    executors = {"galileo_core pool": core_async_run, "protect loop": protect_async_run}
+    print(f"{'benchmark':<28}{'mean (us)':>12}{'p50 (us)':>12}{'p99 (us)':>12}{'connections':>14}")
+    for name, run in executors.items():
+        summary = summarize(time_calls(run, noop, args.calls))
+        print(f"{'no-op ' + name:<28}{summary['mean_us']:>12.1f}{summary['p50_us']:>12.1f}{summary['p99_us']:>12.1f}")
+    for name, run in executors.items():
+        with StubServer() as server:
+            api_client = ApiClient(host=server.url, jwt_token="benchmark")
+            summary = summarize(
+                time_calls(
+                    run,
+                    lambda: api_client.arequest(RequestMethod.POST, Routes.invoke, json=REQUEST_JSON),
+                    args.calls,
+                )
+            )
+            print(
+                f"{'invoke ' + name:<28}{summary['mean_us']:>12.1f}{summary['p50_us']:>12.1f}"
+                f"{summary['p99_us']:>12.1f}{server.connections:>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare the throughput of many threads invoking Protect one call at a time.
+
+- `async_run per call`: every call is submitted to the background loop on its own
+  (what `invoke` does).
+- `ProtectWorkerPool`: calls are gathered into micro-batches, and the background loop
+  is woken up once per batch.
+
+The backend is simulated with a fixed latency, so that only the dispatch overhead is
+measured.
+
+Usage: `PYTHONPATH=src python -m benchmarks.worker_pool [--threads 8] [--calls 1000] [--window 0]`
+"""
+
+from argparse import ArgumentParser
+from asyncio import sleep
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional
+
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_protect.execution import async_run
+from galileo_protect.schemas import Payload
+from galileo_protect.worker_pool import ProtectWorkerPool
+
+PAYLOAD = Payload(input="benchmark")
+
+
+class StubProtector:
+    """Stands in for `Protector`, with a fixed backend latency."""
+
+    client = object()
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+
+    async def ainvoke(
+        self, payload: Payload, metadata: Optional[Dict[str, str]] = None, headers: Optional[Dict[str, str]] = None
+    ) -> Response:
+        await sleep(self.latency)
+        return Response(text=payload.text, trace_metadata=TraceMetadata())
+
+
+def throughput(invoke: Callable[[], Any], threads: int, calls: int, open_loop: bool = False) -> float:
+    def worker(_: int) -> None:
+        if open_loop:
+            # Submit all calls before waiting for any, like independent requests would.
+            futures = [invoke() for _ in range(calls)]
+            for future in futures:
+                future.result()
+        else:
+            for _ in range(calls):
+                invoke()
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, range(threads)))
+        start = perf_counter()
+        list(executor.map(worker, range(threads)))
+        return threads * calls / (perf_counter() - start)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--window", type=float, default=0)
+    args = parser.parse_args()
+
+    protector = StubProtector(args.latency)
+    print(f"{'benchmark':<36}{'calls/s':>12}")
+    for open_loop in [False, True]:
+        mode = "open loop" if open_loop else "closed loop"
+        rate = throughput(
+            lambda: async_run(protector.ainvoke(PAYLOAD), wait_for_result=not open_loop),
+            args.threads,
+            args.calls,
+            open_loop,
+        )
+        print(f"{'async_run per call, ' + mode:<36}{rate:>12.0f}")
+        with ProtectWorkerPool(protector, batch_window=args.window) as pool:  # type: ignore[arg-type]
+            submit = pool.submit if open_loop else pool.invoke
+            rate = throughput(lambda: submit(PAYLOAD), args.threads, args.calls, open_loop)
+        print(f"{'ProtectWorkerPool, ' + mode:<36}{rate:>12.0f}{'':>4}({pool.stats.batches} batches)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,35 @@
 # ruff: noqa: F401
 from galileo_core.helpers.dependencies import is_dependency_available
 from galileo_core.schemas.protect.subscription_config import SubscriptionConfig
+from galileo_protect.budget import InvocationBudget
+from galileo_protect.cache import ResponseCache
+from galileo_protect.circuit_breaker import CircuitBreaker, CircuitPolicy, CircuitState
+from galileo_protect.client import ProtectClient
+from galileo_protect.deadline import protect_deadline
+from galileo_protect.evaluation import RuleEvaluator
+from galileo_protect.exceptions import (
+    CircuitOpenError,
+    DeadlineExceededError,
+    RateLimitedError,
+    SchedulerQueueFullError,
+    WorkerPoolFullError,
+)
 from galileo_protect.health import healthcheck
-from galileo_protect.invocation import ainvoke, invoke
+from galileo_protect.hedge import HedgePolicy
+from galileo_protect.invocation import ainvoke, ainvoke_many, invoke, invoke_many
+from galileo_protect.metrics import (
+    CompositeRecorder,
+    MetricsRecorder,
+    OpenTelemetryRecorder,
+    PrometheusRecorder,
+    set_metrics_recorder,
+)
+from galileo_protect.preflight import Preflight
+from galileo_protect.profiling import Profiler, protect_profile
 from galileo_protect.project import create_project, get_project, get_projects
+from galileo_protect.protector import Protector
+from galileo_protect.providers import MetricProvider, register_metric_provider
+from galileo_protect.scheduler import InvocationScheduler, Priority
 from galileo_protect.schemas import (
     OverrideAction,
     PassthroughAction,
@@ -25,6 +51,9 @@ from galileo_protect.stage import (
     resume_stage,
     update_stage,
 )
+from galileo_protect.stream import ProtectStreamGuard, WindowPolicy
+from galileo_protect.timeout import AdaptiveTimeout
+from galileo_protect.worker_pool import ProtectWorkerPool
 
 if is_dependency_available("langchain_core"):
     from galileo_protect.langchain import ProtectParser, ProtectTool
@@ -0,0 +1,141 @@
+from asyncio import Future, ensure_future, wait
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, TypeVar, Union
+
+from pydantic import BaseModel, Field
+
+from galileo_core.helpers.logger import logger
+from galileo_core.schemas.protect.response import Response
+from galileo_protect.schemas import RawResponse
+from galileo_protect.schemas.response import passthrough_response
+
+R = TypeVar("R", bound=Union[Response, RawResponse])
+
+
+class BudgetStats(BaseModel):
+    requests: int = Field(default=0, description="Number of budgeted requests.")
+    exceeded: int = Field(default=0, description="Number of requests answered with the fallback response.")
+    completed_late: int = Field(default=0, description="Number of requests that completed after the budget.")
+    failed_late: int = Field(default=0, description="Number of requests that failed after the budget.")
+
+
+class InvocationBudget:
+    """
+    Time budget for invocations, with background completion.
+
+    If an invocation hasn't returned within the budget, the fallback response is
+    returned right away, but unlike the request timeout, the request isn't cancelled.
+    It completes in the background and its eventual response is passed to
+    `on_complete`, e.g. to audit or log what Protect would have done, or to warm a cache.
+
+    The same budget can be shared by all invocations it applies to, it is safe to share
+    across threads and event loops. Late responses are delivered from the event loop that
+    sent the request, so `on_complete` shouldn't block, e.g. `queue.Queue.put_nowait` can
+    be used to hand them over to another thread. Requests still in the background when
+    their event loop is closed are dropped.
+
+    Parameters
+    ----------
+    seconds : float
+        Time budget for the invocation, in seconds.
+    fallback : Optional[Response], optional
+        Response to return when the budget runs out, by default None, i.e. a skipped
+        response passing the payload text through.
+    on_complete : Optional[Callable[[Response], Any]], optional
+        Callback for the responses of the requests that completed after the budget ran
+        out, by default None, i.e. the responses are only logged.
+
+    Raises
+    ------
+    ValueError
+        If the budget isn't positive.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        fallback: Optional[Response] = None,
+        on_complete: Optional[Callable[[Response], Any]] = None,
+    ) -> None:
+        if seconds <= 0:
+            raise ValueError("Budget must be positive.")
+        self.seconds = seconds
+        self.fallback_response = fallback
+        self.on_complete = on_complete
+        self._lock = Lock()
+        self._stats = BudgetStats()
+        # Strong references to the requests completing in the background, so that they
+        # aren't garbage collected.
+        self._background: Set[Future] = set()
+
+    @property
+    def stats(self) -> BudgetStats:
+        with self._lock:
+            return self._stats.model_copy()
+
+    @property
+    def pending(self) -> int:
+        """Number of requests still completing in the background."""
+        return len(self._background)
+
+    def fallback(self, request_json: Dict[str, Any]) -> Response:
+        """Get the response to return for a request that ran out of budget."""
+        if self.fallback_response is not None:
+            return self.fallback_response.model_copy()
+        return passthrough_response(request_json)
+
+    def _complete(self, task: Future) -> None:
+        self._background.discard(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            with self._lock:
+                self._stats.failed_late += 1
+            logger.warning(f"Protect request failed after its budget ran out: {error!r}")
+            return
+        with self._lock:
+            self._stats.completed_late += 1
+        result = task.result()
+        response = result.to_response() if isinstance(result, RawResponse) else result
+        logger.debug(f"Protect request completed after its budget ran out with status {response.status}.")
+        if self.on_complete is not None:
+            try:
+                self.on_complete(response)
+            except Exception as error:
+                logger.warning(f"Budget completion callback failed: {error!r}")
+
+    async def run(self, request_json: Dict[str, Any], fn: Callable[[], Awaitable[R]]) -> Union[R, Response]:
+        """
+        Run `fn` within the budget.
+
+        Parameters
+        ----------
+        request_json : Dict[str, Any]
+            Serialized request, to build the fallback response from.
+        fn : Callable[[], Awaitable[R]]
+            Function sending the request.
+
+        Returns
+        -------
+        Union[R, Response]
+            Result of `fn` if it returned within the budget, the fallback response
+            otherwise.
+        """
+        with self._lock:
+            self._stats.requests += 1
+        task = ensure_future(fn())
+        try:
+            done, _ = await wait({task}, timeout=self.seconds)
+        except BaseException:
+            # The caller was cancelled, the request is no longer needed.
+            task.cancel()
+            raise
+        if done:
+            return task.result()
+        logger.debug("Protect invocation ran out of budget, completing it in the background.")
+        with self._lock:
+            self._stats.exceeded += 1
+        self._background.add(task)
+        task.add_done_callback(self._complete)
+        return self.fallback(request_json)
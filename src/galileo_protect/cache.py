@@ -0,0 +1,282 @@
+from collections import OrderedDict
+from hashlib import sha256
+from json import dumps
+from threading import Lock
+from time import monotonic
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from weakref import WeakSet
+
+from pydantic import BaseModel, Field
+
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response
+from galileo_protect.constants.cache import MAX_ENTRIES
+from galileo_protect.resolution import resolution_cache
+
+# Fields of the serialized request that don't affect the response, and are hence not
+# part of the cache key.
+_UNKEYED_FIELDS = frozenset(["timeout"])
+# Only deterministic outcomes are cached. Errors, timeouts, etc. should be retried.
+_CACHEABLE_STATUSES = frozenset([ExecutionStatus.triggered, ExecutionStatus.not_triggered])
+# All live caches, so that they can be invalidated when a stage is updated.
+_caches: "WeakSet[ResponseCache]" = WeakSet()
+
+
+def request_key(request_json: Dict[str, Any], stage_version: Optional[int] = None) -> str:
+    """
+    Get a stable key for a serialized Protect request.
+
+    The key covers the payload, the rulesets, the project and stage identity, the stage
+    version, metadata and headers, i.e. everything that determines the response.
+
+    Parameters
+    ----------
+    request_json : Dict[str, Any]
+        Request serialized in JSON mode.
+    stage_version : Optional[int], optional
+        Stage version, by default None.
+
+    Returns
+    -------
+    str
+        Hex digest for the request.
+    """
+    keyed = {key: value for key, value in request_json.items() if key not in _UNKEYED_FIELDS}
+    keyed["stage_version"] = stage_version if stage_version is not None else request_json.get("stage_version")
+    return sha256(dumps(keyed, sort_keys=True, separators=(",", ":"), default=str).encode()).hexdigest()
+
+
+def stage_key(request_json: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Get the project and stage a serialized Protect request is for.
+
+    Parameters
+    ----------
+    request_json : Dict[str, Any]
+        Request serialized in JSON mode.
+
+    Returns
+    -------
+    Tuple[str, str]
+        Project ID or name, and stage ID or name.
+    """
+    project = request_json.get("project_id") or request_json.get("project_name")
+    stage = request_json.get("stage_id") or request_json.get("stage_name")
+    return str(project), str(stage)
+
+
+class CacheStats(BaseModel):
+    hits: int = Field(default=0, description="Number of lookups that returned a cached response.")
+    misses: int = Field(default=0, description="Number of lookups that didn't return a cached response.")
+    evictions: int = Field(default=0, description="Number of entries evicted due to size or age.")
+    entries: int = Field(default=0, description="Number of entries currently in the cache.")
+    size_bytes: int = Field(default=0, description="Approximate size of the cached responses in bytes.")
+
+
+class _Entry(NamedTuple):
+    response: Response
+    size_bytes: int
+    expires_at: float
+    project_id: Optional[str]
+    stage_id: Optional[str]
+    stage_name: Optional[str]
+
+
+class ResponseCache:
+    """
+    In-process LRU cache for Protect responses with optional TTL and size bounds.
+
+    The cache is opt-in, pass an instance to `invoke` or `ainvoke` to use it. It is safe
+    to share across threads and event loops.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Maximum number of entries to keep, by default 1024.
+    max_bytes : Optional[int], optional
+        Maximum approximate size of the cached responses in bytes, by default None,
+        i.e. unbounded.
+    ttl : Optional[float], optional
+        Time to live for each entry in seconds, by default None, i.e. entries don't
+        expire.
+    """
+
+    def __init__(
+        self, max_entries: int = MAX_ENTRIES, max_bytes: Optional[int] = None, ttl: Optional[float] = None
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("Max entries must be at least 1.")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._size_bytes = 0
+        _caches.add(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                size_bytes=self._size_bytes,
+            )
+
+    def get(self, key: str) -> Optional[Response]:
+        """
+        Get the cached response for a key, if it exists and hasn't expired.
+
+        Parameters
+        ----------
+        key : str
+            Cache key, from `request_key`.
+
+        Returns
+        -------
+        Optional[Response]
+            A copy of the cached response, or None if there is no usable entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at < monotonic():
+                self._pop(key)
+                self._evictions += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return entry.response.model_copy()
+
+    def set(self, key: str, response: Response, request_json: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Cache a response for a key.
+
+        Responses that aren't deterministic outcomes (errors, timeouts, etc.) are not
+        cached.
+
+        Parameters
+        ----------
+        key : str
+            Cache key, from `request_key`.
+        response : Response
+            Response to cache.
+        request_json : Optional[Dict[str, Any]], optional
+            Serialized request, used to tag the entry with its project and stage for
+            invalidation, by default None.
+        """
+        if response.status not in _CACHEABLE_STATUSES:
+            return
+        request_json = request_json or dict()
+        project_id = request_json.get("project_id")
+        project_name, stage_id, stage_name = (
+            request_json.get("project_name"),
+            request_json.get("stage_id"),
+            request_json.get("stage_name"),
+        )
+        # Tag the entry with the IDs when they're known, so that it's invalidated when the
+        # stage is changed by ID.
+        if not project_id and project_name:
+            project_id = resolution_cache.get_project_id(project_name)
+        if not stage_id and project_id and stage_name:
+            stage_id = resolution_cache.get_stage_id(project_id, stage_name)
+        entry = _Entry(
+            response=response.model_copy(),
+            size_bytes=len(key) + len(response.model_dump_json()),
+            expires_at=monotonic() + self.ttl if self.ttl is not None else float("inf"),
+            project_id=str(project_id) if project_id else None,
+            stage_id=str(stage_id) if stage_id else None,
+            stage_name=stage_name,
+        )
+        if self.max_bytes is not None and entry.size_bytes > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self._size_bytes += entry.size_bytes
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._size_bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate(
+        self, stage_id: Optional[Any] = None, stage_name: Optional[str] = None, project_id: Optional[Any] = None
+    ) -> int:
+        """
+        Remove all entries for a stage, identified by ID or name.
+
+        Stage names are only unique within a project, so entries are only matched by name
+        within the given project. Entries whose project isn't known are matched in any
+        project.
+
+        Parameters
+        ----------
+        stage_id : Optional[Any], optional
+            Stage ID, by default None.
+        stage_name : Optional[str], optional
+            Stage name, by default None.
+        project_id : Optional[Any], optional
+            Project ID of the stage, by default None, i.e. any project.
+
+        Returns
+        -------
+        int
+            Number of entries removed.
+        """
+        stage_id = str(stage_id) if stage_id else None
+        project_id = str(project_id) if project_id else None
+        with self._lock:
+            keys = [
+                key
+                for key, entry in self._entries.items()
+                if (stage_id and entry.stage_id == stage_id)
+                or (
+                    stage_name
+                    and entry.stage_name == stage_name
+                    and (project_id is None or entry.project_id in (None, project_id))
+                )
+            ]
+            for key in keys:
+                self._pop(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = self._size_bytes = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= entry.size_bytes
+
+
+def invalidate_stage(
+    stage_id: Optional[Any] = None, stage_name: Optional[str] = None, project_id: Optional[Any] = None
+) -> None:
+    """
+    Remove the entries for a stage from all response caches.
+
+    Parameters
+    ----------
+    stage_id : Optional[Any], optional
+        Stage ID, by default None.
+    stage_name : Optional[str], optional
+        Stage name, by default None.
+    project_id : Optional[Any], optional
+        Project ID of the stage, by default None, i.e. any project.
+    """
+    for cache in list(_caches):
+        cache.invalidate(stage_id=stage_id, stage_name=stage_name, project_id=project_id)
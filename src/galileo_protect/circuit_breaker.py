@@ -0,0 +1,316 @@
+from collections import deque
+from enum import Enum
+from threading import Lock
+from time import monotonic
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Sequence, Tuple, TypeVar, Union
+from uuid import UUID
+
+from galileo_core.exceptions.http import GalileoHTTPException
+from galileo_core.helpers.logger import logger
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_protect.cache import stage_key
+from galileo_protect.constants.circuit_breaker import (
+    FAILURE_RATE_THRESHOLD,
+    HALF_OPEN_CALLS,
+    MIN_CALLS,
+    OPEN_DURATION,
+    WINDOW_SIZE,
+)
+from galileo_protect.exceptions import CircuitOpenError, DeadlineExceededError
+from galileo_protect.schemas import RawResponse
+from galileo_protect.schemas.response import passthrough_response
+
+R = TypeVar("R", bound=Union[Response, RawResponse])
+
+# Response statuses that indicate that the backend is degraded.
+_FAILED_STATUSES = frozenset([ExecutionStatus.error, ExecutionStatus.timeout])
+
+
+class CircuitState(str, Enum):
+    # Calls go through, and failures are tracked.
+    closed = "closed"
+    # Calls are rejected without calling the backend.
+    open = "open"
+    # A limited number of probe calls go through, to check if the backend recovered.
+    half_open = "half_open"
+
+
+class CircuitPolicy(str, Enum):
+    # Return a passthrough response with the payload text, i.e. skip Protect.
+    fail_open = "fail_open"
+    # Return a triggered response with the override text.
+    fail_closed = "fail_closed"
+    # Raise a `CircuitOpenError`.
+    raise_error = "raise"
+
+
+class CircuitTransition(NamedTuple):
+    project: str
+    stage: str
+    from_state: CircuitState
+    to_state: CircuitState
+
+
+class _Circuit:
+    def __init__(self, window_size: int) -> None:
+        self.state = CircuitState.closed
+        self.outcomes: Deque[bool] = deque(maxlen=window_size)
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self.probe_successes = 0
+
+    def record(self, failed: bool) -> None:
+        if len(self.outcomes) == self.outcomes.maxlen and self.outcomes[0]:
+            self.failures -= 1
+        self.outcomes.append(failed)
+        self.failures += failed
+
+    def reset(self) -> None:
+        self.outcomes.clear()
+        self.failures = 0
+        self.probes = 0
+        self.probe_successes = 0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for Protect invocations, tracked per project and stage.
+
+    While the circuit is closed, the outcome of every call is recorded in a sliding window
+    of the most recent calls. Errors (other than client errors), and responses with an
+    error or timeout status count as failures. Once the failure rate over the window
+    reaches the threshold, the circuit opens and calls are rejected immediately, using
+    the policy, instead of waiting for the degraded backend. After the open duration, the
+    circuit is half-open and lets a limited number of probe calls through. If they
+    succeed the circuit closes, otherwise it opens again.
+
+    Pass an instance to `invoke` or `ainvoke` to use it, and share it between
+    invocations. It is safe to share across threads and event loops.
+
+    Parameters
+    ----------
+    policy : Union[CircuitPolicy, str], optional
+        What to do with calls while the circuit is open, by default
+        `CircuitPolicy.fail_open`.
+    override_text : Optional[str], optional
+        Text to respond with for the fail-closed policy, by default None.
+    window_size : int, optional
+        Number of most recent calls to compute the failure rate over, by default 100.
+    min_calls : int, optional
+        Minimum number of calls in the window before the circuit can open, by default 20.
+    failure_rate_threshold : float, optional
+        Failure rate at which the circuit opens, by default 0.5.
+    open_duration : float, optional
+        Seconds the circuit stays open before probing the backend, by default 30 seconds.
+    half_open_calls : int, optional
+        Number of successful probe calls needed to close the circuit, by default 1.
+    listeners : Optional[Sequence[Callable[[CircuitTransition], None]]], optional
+        Functions called on every state transition, by default None.
+
+    Raises
+    ------
+    ValueError
+        If the override text is missing for the fail-closed policy, or the thresholds are
+        invalid.
+    """
+
+    def __init__(
+        self,
+        policy: Union[CircuitPolicy, str] = CircuitPolicy.fail_open,
+        override_text: Optional[str] = None,
+        window_size: int = WINDOW_SIZE,
+        min_calls: int = MIN_CALLS,
+        failure_rate_threshold: float = FAILURE_RATE_THRESHOLD,
+        open_duration: float = OPEN_DURATION,
+        half_open_calls: int = HALF_OPEN_CALLS,
+        listeners: Optional[Sequence[Callable[[CircuitTransition], None]]] = None,
+    ) -> None:
+        self.policy = CircuitPolicy(policy)
+        if self.policy == CircuitPolicy.fail_closed and override_text is None:
+            raise ValueError("Override text must be provided for the fail-closed policy.")
+        if not 0 < failure_rate_threshold <= 1:
+            raise ValueError("Failure rate threshold must be between 0 and 1.")
+        if window_size < 1 or half_open_calls < 1:
+            raise ValueError("Window size and half-open calls must be at least 1.")
+        self.override_text = override_text
+        self.window_size = window_size
+        self.min_calls = min(max(min_calls, 1), window_size)
+        self.failure_rate_threshold = failure_rate_threshold
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.listeners: List[Callable[[CircuitTransition], None]] = list(listeners or [])
+        self._lock = Lock()
+        self._circuits: Dict[Tuple[str, str], _Circuit] = dict()
+
+    def add_listener(self, listener: Callable[[CircuitTransition], None]) -> None:
+        """Add a function to call on every state transition."""
+        self.listeners.append(listener)
+
+    def state(
+        self, project: Optional[Union[UUID, str]] = None, stage: Optional[Union[UUID, str]] = None
+    ) -> CircuitState:
+        """
+        Get the state of the circuit for a project and stage.
+
+        Parameters
+        ----------
+        project : Optional[Union[UUID, str]], optional
+            Project ID, or name if invocations use the name, by default None.
+        stage : Optional[Union[UUID, str]], optional
+            Stage ID, or name if invocations use the name, by default None.
+
+        Returns
+        -------
+        CircuitState
+            State of the circuit.
+        """
+        with self._lock:
+            circuit = self._circuits.get((str(project), str(stage)))
+            return circuit.state if circuit is not None else CircuitState.closed
+
+    def reset(self) -> None:
+        """Close all circuits and forget the recorded calls."""
+        with self._lock:
+            self._circuits.clear()
+
+    def _transition(self, key: Tuple[str, str], circuit: _Circuit, state: CircuitState) -> CircuitTransition:
+        transition = CircuitTransition(key[0], key[1], circuit.state, state)
+        circuit.state = state
+        if state == CircuitState.open:
+            circuit.opened_at = monotonic()
+        circuit.reset()
+        return transition
+
+    def _notify(self, transition: Optional[CircuitTransition]) -> None:
+        if transition is None:
+            return
+        logger.debug(
+            f"Circuit for project {transition.project} and stage {transition.stage} is now "
+            f"{transition.to_state.value}, was {transition.from_state.value}."
+        )
+        for listener in self.listeners:
+            listener(transition)
+
+    def _acquire(self, key: Tuple[str, str]) -> Tuple[bool, Optional[CircuitTransition]]:
+        """Check whether a call can go through, and whether it's a probe."""
+        transition = None
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                circuit = self._circuits[key] = _Circuit(self.window_size)
+            if circuit.state == CircuitState.open:
+                retry_after = circuit.opened_at + self.open_duration - monotonic()
+                if retry_after > 0:
+                    raise CircuitOpenError(key[0], key[1], retry_after)
+                transition = self._transition(key, circuit, CircuitState.half_open)
+            if circuit.state == CircuitState.half_open:
+                if circuit.probes >= self.half_open_calls:
+                    raise CircuitOpenError(key[0], key[1], 0.0)
+                circuit.probes += 1
+                return True, transition
+        return False, transition
+
+    def _record(self, key: Tuple[str, str], is_probe: bool, failed: Optional[bool]) -> Optional[CircuitTransition]:
+        with self._lock:
+            circuit = self._circuits.get(key)
+            if circuit is None:
+                return None
+            if is_probe:
+                if circuit.state != CircuitState.half_open:
+                    return None
+                if failed is None:
+                    # The probe was cancelled, let another call probe instead.
+                    circuit.probes -= 1
+                elif failed:
+                    return self._transition(key, circuit, CircuitState.open)
+                else:
+                    circuit.probe_successes += 1
+                    if circuit.probe_successes >= self.half_open_calls:
+                        return self._transition(key, circuit, CircuitState.closed)
+                return None
+            if failed is None or circuit.state != CircuitState.closed:
+                return None
+            circuit.record(failed)
+            if (
+                len(circuit.outcomes) >= self.min_calls
+                and circuit.failures / len(circuit.outcomes) >= self.failure_rate_threshold
+            ):
+                return self._transition(key, circuit, CircuitState.open)
+        return None
+
+    @staticmethod
+    def _is_failure(exception: BaseException) -> bool:
+        # The caller ran out of time, the backend may well be healthy.
+        if isinstance(exception, DeadlineExceededError):
+            return False
+        # Client errors are caused by the request, not the backend, except rate limiting.
+        if isinstance(exception, GalileoHTTPException):
+            return not 400 <= exception.status_code < 500 or exception.status_code == 429
+        return True
+
+    async def run(self, request_json: Dict[str, Any], fn: Callable[[], Awaitable[R]]) -> R:
+        """
+        Run `fn` if the circuit for the request allows it, and record the outcome.
+
+        Parameters
+        ----------
+        request_json : Dict[str, Any]
+            Request serialized in JSON mode.
+        fn : Callable[[], Awaitable[R]]
+            Function sending the request.
+
+        Returns
+        -------
+        R
+            Result of `fn`.
+
+        Raises
+        ------
+        CircuitOpenError
+            If the circuit is open, regardless of the policy. Use `fallback` to apply it.
+        """
+        key = stage_key(request_json)
+        is_probe, transition = self._acquire(key)
+        self._notify(transition)
+        failed: Optional[bool] = None
+        try:
+            response = await fn()
+            failed = response.status in _FAILED_STATUSES
+            return response
+        except Exception as exception:
+            failed = self._is_failure(exception)
+            raise
+        finally:
+            self._notify(self._record(key, is_probe, failed))
+
+    def fallback(self, request_json: Dict[str, Any], error: CircuitOpenError) -> Response:
+        """
+        Get the response for a call rejected by an open circuit, according to the policy.
+
+        Parameters
+        ----------
+        request_json : Dict[str, Any]
+            Request serialized in JSON mode.
+        error : CircuitOpenError
+            Error the call was rejected with.
+
+        Returns
+        -------
+        Response
+            Passthrough response for the fail-open policy, or triggered response with the
+            override text for the fail-closed policy.
+
+        Raises
+        ------
+        CircuitOpenError
+            For the raise policy.
+        """
+        if self.policy == CircuitPolicy.raise_error:
+            raise error
+        if self.policy == CircuitPolicy.fail_closed:
+            return Response(
+                text=self.override_text or "", status=ExecutionStatus.triggered, trace_metadata=TraceMetadata()
+            )
+        return passthrough_response(request_json)
@@ -0,0 +1,128 @@
+from types import TracebackType
+from typing import Any, Dict, Optional, Type
+
+from httpx import AsyncClient, Limits, Timeout
+
+from galileo_core.constants.http_headers import HttpHeaders
+from galileo_core.constants.request_method import RequestMethod
+from galileo_core.helpers.api_client import DEFAULT_TIMEOUT_SECONDS, ApiClient
+from galileo_core.helpers.dependencies import is_dependency_available
+from galileo_core.helpers.logger import logger
+from galileo_protect.constants.client import (
+    CONNECT_TIMEOUT,
+    KEEPALIVE_EXPIRY,
+    MAX_CONNECTIONS,
+    MAX_KEEPALIVE_CONNECTIONS,
+)
+from galileo_protect.execution import async_run
+from galileo_protect.schemas.config import ProtectConfig
+
+
+class ProtectClient:
+    """
+    HTTP client with a dedicated, pooled connection transport for Protect invocations.
+
+    Pass it to `invoke`, `ainvoke` or `ProtectTool` to control connection reuse for the
+    invoke route. The client is bound to the event loop it's first used on, so use it
+    either from a single event loop or only through the synchronous `invoke`, which
+    always runs on Protect's background loop.
+
+    Examples
+    --------
+    ```python
+    async with ProtectClient(max_connections=200, http2=True) as client:
+        response = await ainvoke(payload=payload, client=client)
+    ```
+
+    Parameters
+    ----------
+    max_connections : int, optional
+        Maximum number of concurrent connections, by default 100.
+    max_keepalive_connections : int, optional
+        Maximum number of idle connections to keep alive, by default 100.
+    keepalive_expiry : float, optional
+        Time in seconds after which idle connections are closed, by default 30 seconds.
+    http2 : bool, optional
+        Use HTTP/2 if the server supports it, multiplexing requests over fewer
+        connections, by default False. This requires the `h2` package.
+
+    Raises
+    ------
+    ImportError
+        If HTTP/2 is requested but the `h2` package is not installed.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = KEEPALIVE_EXPIRY,
+        http2: bool = False,
+    ) -> None:
+        if http2 and not is_dependency_available("h2"):
+            raise ImportError("HTTP/2 requires the `h2` package, install it with `pip install httpx[http2]`.")
+        self.limits = Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self._async_client: Optional[AsyncClient] = None
+
+    def _get_async_client(self, api_client: ApiClient) -> AsyncClient:
+        if self._async_client is None or self._async_client.is_closed:
+            logger.debug("Creating pooled AsyncClient for Protect.")
+            self._async_client = AsyncClient(
+                base_url=api_client.host.unicode_string(),
+                verify=api_client.ssl_context,
+                timeout=Timeout(DEFAULT_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT),
+                limits=self.limits,
+                http2=self.http2,
+            )
+        return self._async_client
+
+    async def arequest(
+        self,
+        method: RequestMethod,
+        path: str,
+        content_headers: Dict[str, str] = HttpHeaders.json(),
+        api_client: Optional[ApiClient] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Make a request to the Galileo API using the pooled connections.
+
+        This mirrors `ApiClient.arequest`, using the host, credentials and SSL context
+        from the given API client, by default the one from the Protect config.
+        """
+        api_client = api_client or ProtectConfig.get().api_client
+        return await ApiClient.make_request(
+            request_method=method,
+            base_url=api_client.host.unicode_string(),
+            endpoint=path,
+            headers={**content_headers, **api_client.auth_header},
+            ssl_context=api_client.ssl_context,
+            async_client=self._get_async_client(api_client),
+            **kwargs,
+        )
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def close(self) -> None:
+        """Close the pooled connections from synchronous code."""
+        async_run(self.aclose())
+
+    async def __aenter__(self) -> "ProtectClient":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
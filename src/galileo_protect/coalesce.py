@@ -0,0 +1,86 @@
+from asyncio import CancelledError, shield, wrap_future
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from galileo_core.helpers.logger import logger
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """The leader of a call was cancelled, its followers retry the call."""
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into a single in-flight call.
+
+    The first caller for a key (the leader) runs the call, and every caller that arrives
+    while it is in flight awaits the same result, or the same exception. Calls are
+    tracked with `concurrent.futures.Future`s so that callers on different threads and
+    event loops (e.g. the synchronous `invoke`) can share them.
+
+    Cancelling a follower doesn't cancel the shared call. Cancelling the leader cancels
+    its own call, and the followers retry it: one of them becomes the new leader.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: Dict[str, Future] = dict()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` for the key, or wait for the in-flight call for the key.
+
+        Parameters
+        ----------
+        key : str
+            Key identifying identical calls.
+        fn : Callable[[], Awaitable[T]]
+            Function to call if there is no in-flight call for the key.
+
+        Returns
+        -------
+        T
+            Result of the (shared) call.
+        """
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                is_leader = future is None
+                if future is None:
+                    future = self._calls[key] = Future()
+            if is_leader:
+                break
+            logger.debug("Waiting for in-flight call.")
+            try:
+                return await shield(wrap_future(future))
+            except _LeaderCancelled:
+                logger.debug("In-flight call was cancelled, retrying.")
+        try:
+            result = await fn()
+        except CancelledError:
+            # The cancellation is the leader's own, the followers shouldn't get it.
+            self._complete(key, future, exception=_LeaderCancelled())
+            raise
+        except BaseException as exc:
+            self._complete(key, future, exception=exc)
+            raise
+        self._complete(key, future, result=result)
+        return result
+
+    def _complete(
+        self, key: str, future: Future, result: Any = None, exception: Optional[BaseException] = None
+    ) -> None:
+        # Remove the call before resolving it so that callers arriving after this start a
+        # new call instead of getting a stale result.
+        with self._lock:
+            self._calls.pop(key, None)
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
@@ -0,0 +1,2 @@
+# Maximum number of responses a response cache keeps by default.
+MAX_ENTRIES = 1024
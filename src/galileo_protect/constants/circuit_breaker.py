@@ -0,0 +1,12 @@
+from datetime import timedelta
+
+# Number of most recent calls the failure rate is computed over.
+WINDOW_SIZE = 100
+# Minimum number of calls in the window before the circuit can open.
+MIN_CALLS = 20
+# Failure rate at which the circuit opens.
+FAILURE_RATE_THRESHOLD = 0.5
+# Time the circuit stays open before probing the backend again.
+OPEN_DURATION = timedelta(seconds=30).total_seconds()
+# Number of probe calls allowed while the circuit is half-open.
+HALF_OPEN_CALLS = 1
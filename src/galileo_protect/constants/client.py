@@ -0,0 +1,7 @@
+from datetime import timedelta
+
+# Connection pool defaults for `ProtectClient`.
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 100
+KEEPALIVE_EXPIRY = timedelta(seconds=30).total_seconds()
+CONNECT_TIMEOUT = timedelta(seconds=5).total_seconds()
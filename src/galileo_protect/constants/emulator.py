@@ -0,0 +1,13 @@
+from uuid import UUID
+
+# Default address of the emulator.
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8088
+# Key the emulator signs its JWTs with, they only need to be decodable by the client.
+JWT_SECRET = "galileo-protect-emulator-jwt-secret"
+# Lifetime of the emulator's JWTs, in seconds.
+JWT_LIFETIME = 30 * 24 * 60 * 60
+# Namespace of the emulator's deterministic IDs, so that all workers agree on them.
+ID_NAMESPACE = UUID("6f1c1a52-5b4e-4d36-9a0e-0d2b6f4f5e7a")
+# Maximum number of pending connections per worker.
+REQUEST_QUEUE_SIZE = 1024
@@ -0,0 +1,4 @@
+# Maximum number of hedged requests per primary request.
+MAX_HEDGE_RATIO = 0.1
+# Maximum number of hedges that can be sent in a burst.
+MAX_HEDGE_BURST = 10
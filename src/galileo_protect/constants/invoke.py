@@ -2,3 +2,5 @@ from datetime import timedelta
 
 TIMEOUT = timedelta(seconds=10).total_seconds()
 TIMEOUT_MARGIN = timedelta(seconds=5).total_seconds()
+# Maximum number of concurrent Protect invocations for batch invocations.
+MAX_CONCURRENCY = 16
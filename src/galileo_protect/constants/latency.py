@@ -0,0 +1,4 @@
+# Number of latency samples to keep per window.
+WINDOW_SAMPLES = 1024
+# Minimum number of samples before a percentile is estimated.
+MIN_SAMPLES = 20
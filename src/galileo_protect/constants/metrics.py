@@ -0,0 +1,8 @@
+# Upper bounds of the latency histogram buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Prefix of the exported metric names.
+METRIC_PREFIX = "galileo_protect"
+# Name of the tracer and the spans for OpenTelemetry.
+TRACER_NAME = "galileo_protect"
+INVOKE_SPAN_NAME = "protect.invoke"
+REQUEST_SPAN_NAME = "protect.request"
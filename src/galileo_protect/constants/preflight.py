@@ -0,0 +1,12 @@
+from galileo_protect.schemas.rule import RuleMetrics
+
+# Prefix of the metrics computed on the payload's input.
+INPUT_PREFIX = "input_"
+# Other metrics computed on the payload's input.
+INPUT_METRICS = frozenset([RuleMetrics.prompt_injection.value])
+# Metrics computed on the payload's output, the fields other metrics need are unknown.
+OUTPUT_METRICS = frozenset(
+    metric.value
+    for metric in RuleMetrics
+    if not metric.value.startswith(INPUT_PREFIX) and metric.value not in INPUT_METRICS
+)
@@ -0,0 +1,2 @@
+# Number of most recent calls to keep the profiles of.
+MAX_CALLS = 1000
@@ -0,0 +1,49 @@
+from typing import Dict, Tuple
+
+# PII patterns by label, in the order they're reported. Card numbers are also checked
+# with the Luhn checksum.
+PII_PATTERNS: Dict[str, str] = {
+    "email": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b",
+    "ssn": r"\b(?!000|666|9\d\d)\d{3}-(?!00)\d{2}-(?!0000)\d{4}\b",
+    "credit_card_info": r"\b\d(?:[ -]?\d){12,18}\b",
+    "phone_number": r"(?<![\d-])(?:\+?1[-. ]?)?(?:\(\d{3}\)\s?|\d{3}[-. ])\d{3}[-. ]\d{4}\b",
+    "network_info": r"\b(?:(?:25[0-5]|2[0-4]\d|1?\d?\d)\.){3}(?:25[0-5]|2[0-4]\d|1?\d?\d)\b",
+}
+CREDIT_CARD_LABEL = "credit_card_info"
+
+# Toxicity score of terms, the score of a text is the highest of the terms it contains.
+TOXIC_TERMS: Dict[str, float] = {
+    "dumb": 0.6,
+    "stupid": 0.6,
+    "shut up": 0.6,
+    "loser": 0.7,
+    "pathetic": 0.7,
+    "idiot": 0.8,
+    "moron": 0.8,
+    "worthless": 0.8,
+    "i hate you": 0.9,
+    "kill yourself": 1.0,
+}
+
+# Prompt injection patterns by category, in the order they're checked.
+PROMPT_INJECTION_PATTERNS: Tuple[Tuple[str, str], ...] = (
+    (
+        "simple_instruction",
+        r"\b(?:ignore|disregard|forget|override)\b.{0,30}\b(?:previous|prior|above|earlier|all|your)\b.{0,20}"
+        r"\b(?:instructions?|prompts?|rules|directions|guidelines)\b",
+    ),
+    (
+        "impersonation",
+        r"\b(?:you are now|from now on,? you are|pretend (?:to be|you are)|act as (?:an? )?(?:unrestricted|unfiltered|"
+        r"jailbroken)|roleplay as|DAN mode|developer mode)\b",
+    ),
+    (
+        "new_context",
+        r"(?:^|\n)\s*(?:#{2,}|\[)?\s*(?:system|new instructions?)\s*(?:\]|:)|\b(?:reveal|print|show|repeat)\b.{0,20}"
+        r"\b(?:system prompt|hidden instructions|initial instructions)\b",
+    ),
+    (
+        "obfuscation",
+        r"\b(?:decode|base64|rot13)\b.{0,40}\b(?:follow|execute|run|instructions?)\b|[A-Za-z0-9+/]{60,}={0,2}",
+    ),
+)
@@ -0,0 +1,6 @@
+from datetime import timedelta
+
+# How long resolved project and stage IDs are trusted for.
+RESOLUTION_TTL = timedelta(minutes=5).total_seconds()
+# How many project and stage names are resolved at most, per kind of entry.
+RESOLUTION_MAX_ENTRIES = 4096
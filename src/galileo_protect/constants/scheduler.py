@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+# Maximum number of invocations waiting for a token, across all priorities.
+MAX_QUEUE_SIZE = 1000
+# Maximum number of retries for rate limited or unavailable responses.
+MAX_RETRIES = 3
+# Backoff before the first retry if the response has no `Retry-After` header, doubled for
+# every further retry.
+BACKOFF = timedelta(milliseconds=500).total_seconds()
+MAX_BACKOFF = timedelta(seconds=30).total_seconds()
+# Default weights of the priority classes, i.e. interactive invocations get 4 tokens for
+# every token batch invocations get when both are waiting.
+INTERACTIVE_WEIGHT = 4
+BATCH_WEIGHT = 1
+# HTTP status codes that are retried after backing off.
+RETRYABLE_STATUS_CODES = frozenset([429, 503])
@@ -0,0 +1,5 @@
+from datetime import timedelta
+
+# Default window sizes for `ProtectStreamGuard`.
+WINDOW_TOKENS = 32
+WINDOW_SECONDS = timedelta(seconds=1).total_seconds()
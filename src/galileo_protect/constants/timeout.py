@@ -0,0 +1,10 @@
+from datetime import timedelta
+
+# Target percentile of the observed latency for adaptive timeouts.
+PERCENTILE = 99.0
+# Multiplier applied to the target percentile, so that normal slow calls don't time out.
+MULTIPLIER = 2.0
+# Bounds for the adaptive server-side timeout.
+FLOOR = timedelta(milliseconds=500).total_seconds()
+# Minimum margin between the server-side timeout and the client read timeout.
+MIN_READ_MARGIN = timedelta(milliseconds=500).total_seconds()
@@ -0,0 +1,13 @@
+from datetime import timedelta
+
+from galileo_protect.constants.client import MAX_CONNECTIONS
+
+# Time to wait for more payloads before dispatching a batch that isn't full. Batches
+# already form while the loop is busy, waiting only adds latency in our benchmarks.
+BATCH_WINDOW = timedelta(milliseconds=0).total_seconds()
+# Maximum number of payloads dispatched together.
+MAX_BATCH_SIZE = 64
+# Maximum number of submitted payloads waiting to be dispatched.
+MAX_QUEUE_SIZE = 10_000
+# Maximum number of requests in flight, i.e. one per pooled connection.
+MAX_IN_FLIGHT = MAX_CONNECTIONS
@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from time import time
+from typing import Any, Dict, Iterator, Optional, Union
+
+from galileo_core.helpers.api_client import DEFAULT_TIMEOUT_SECONDS
+from galileo_protect.exceptions import DeadlineExceededError
+
+# Absolute deadline of the current request, as a Unix timestamp in seconds.
+_deadline: ContextVar[Optional[float]] = ContextVar("protect_deadline", default=None)
+
+
+@contextmanager
+def protect_deadline(deadline: Union[float, datetime]) -> Iterator[float]:
+    """
+    Propagate an absolute deadline to all Protect calls made in this context.
+
+    Invocations, the LangChain tool and the stage helpers derive the server timeout and
+    the client read timeout from the time remaining until the deadline, and fail with
+    `DeadlineExceededError` without sending a request once it has passed. Deadlines
+    can be nested, the earliest one applies.
+
+    The deadline is a context variable, so it follows the call through `asyncio` tasks
+    and Protect's synchronous wrappers, but not into threads started in the context.
+
+    Parameters
+    ----------
+    deadline : Union[float, datetime]
+        Absolute deadline, as a Unix timestamp in seconds or a datetime.
+
+    Yields
+    ------
+    float
+        The deadline that applies in the context, as a Unix timestamp in seconds.
+    """
+    if isinstance(deadline, datetime):
+        deadline = deadline.timestamp()
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(current, deadline)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def use_deadline(deadline: Optional[float]) -> Iterator[None]:
+    """
+    Use a deadline captured from another context, e.g. with `get_deadline`, as is.
+
+    Unlike `protect_deadline`, this replaces the current deadline instead of nesting,
+    so that work handed off to another task runs with its submitter's deadline, or
+    without one.
+
+    Parameters
+    ----------
+    deadline : Optional[float]
+        Deadline as a Unix timestamp in seconds, or None for no deadline.
+    """
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def get_deadline() -> Optional[float]:
+    """Get the deadline of the current context, as a Unix timestamp in seconds, if any."""
+    return _deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Get the time remaining until the deadline of the current context.
+
+    Returns
+    -------
+    Optional[float]
+        Remaining time in seconds, or None if there is no deadline.
+
+    Raises
+    ------
+    DeadlineExceededError
+        If the deadline has passed.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    remaining = deadline - time()
+    if remaining <= 0:
+        raise DeadlineExceededError(deadline)
+    return remaining
+
+
+def read_timeout_kwargs() -> Dict[str, Any]:
+    """Get the read timeout for API requests bounded by the deadline, as request kwargs."""
+    remaining = remaining_time()
+    return dict() if remaining is None else dict(read_timeout=min(remaining, DEFAULT_TIMEOUT_SECONDS))
@@ -0,0 +1,4 @@
+# flake8: noqa: F401
+# ruff: noqa: F401
+from galileo_protect.emulator.server import EmulatorServer, serve
+from galileo_protect.emulator.settings import EmulatorSettings, EmulatorStage, LatencyDistribution
@@ -0,0 +1,88 @@
+from argparse import ArgumentParser, ArgumentTypeError
+from json import JSONDecodeError, loads
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from galileo_protect.constants.emulator import DEFAULT_HOST, DEFAULT_PORT
+from galileo_protect.emulator.server import serve
+from galileo_protect.emulator.settings import EmulatorSettings, LatencyDistribution
+
+
+def _metric(value: str) -> Tuple[str, Any]:
+    name, separator, raw = value.partition("=")
+    if not separator or not name:
+        raise ArgumentTypeError(f"Expected NAME=VALUE, got {value}.")
+    try:
+        return name, loads(raw)
+    except JSONDecodeError:
+        # Plain strings, e.g. `prompt_injection=impersonation`.
+        return name, raw
+
+
+def _latency(value: str) -> LatencyDistribution:
+    try:
+        return LatencyDistribution.parse(value)
+    except ValueError as error:
+        raise ArgumentTypeError(str(error))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = ArgumentParser(prog="python -m galileo_protect.emulator", description="Run a local Protect emulator.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Host to listen on.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on, 0 for any free port.")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes sharing the port.")
+    parser.add_argument(
+        "--latency",
+        type=_latency,
+        default=LatencyDistribution(),
+        help="Latency of the invocations in seconds, e.g. 0.05, uniform:0.01,0.1, normal:0.05,0.01, "
+        "lognormal:-3,0.5 or exponential:0.05.",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of invocations that fail with a 500.")
+    parser.add_argument(
+        "--metric",
+        type=_metric,
+        action="append",
+        default=list(),
+        metavar="NAME=VALUE",
+        help="Fixed value of a metric, as JSON or a plain string, e.g. toxicity=0.9 or pii='[\"email\"]'.",
+    )
+    parser.add_argument(
+        "--no-local-providers", action="store_true", help="Don't compute metrics with the local metric providers."
+    )
+    parser.add_argument(
+        "--no-auto-create", action="store_true", help="Don't create the projects and stages invocations refer to."
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Seed of the latency and error sampling.")
+    parser.add_argument(
+        "--stages",
+        type=Path,
+        default=None,
+        help="JSON file with the stages every worker starts with, a list of objects with project_name, name, "
+        "and optionally description, type, rulesets and paused. Stages can't be created or changed through the "
+        "API with multiple workers.",
+    )
+    args = parser.parse_args(argv)
+    try:
+        settings = EmulatorSettings(
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            latency=args.latency,
+            error_rate=args.error_rate,
+            metrics=dict(args.metric),
+            local_providers=not args.no_local_providers,
+            auto_create=not args.no_auto_create,
+            seed=args.seed,
+            stages=loads(args.stages.read_text()) if args.stages is not None else list(),
+        )
+    except ValidationError as error:
+        parser.error("; ".join(detail["msg"] for detail in error.errors()))
+    print(f"Protect emulator listening on http://{settings.host}:{settings.port}/ with {settings.workers} worker(s).")
+    serve(settings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+import socket
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import JSONDecodeError, dumps, loads
+from multiprocessing import get_context
+from random import Random
+from re import Match, Pattern, compile
+from threading import Thread
+from time import sleep, time, time_ns
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+from uuid import UUID
+
+from jwt import encode
+from pydantic import ValidationError
+
+from galileo_core.constants.routes import Routes as CoreRoutes
+from galileo_core.helpers.logger import logger
+from galileo_core.schemas.core.project import CreateProjectRequest
+from galileo_core.schemas.core.user import User
+from galileo_core.schemas.core.user_role import UserRole
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.request import Request
+from galileo_core.schemas.protect.ruleset import RulesetsMixin
+from galileo_core.schemas.protect.stage import StageWithRulesets
+from galileo_protect.constants.emulator import JWT_LIFETIME, JWT_SECRET, REQUEST_QUEUE_SIZE
+from galileo_protect.constants.routes import Routes
+from galileo_protect.emulator.settings import EmulatorSettings
+from galileo_protect.emulator.state import EmulatorState, RouteError, passthrough, stable_id
+
+Handler = Callable[["EmulatorHandler", Match, Dict[str, str], Any], Any]
+
+
+def _route(template: str) -> Pattern:
+    return compile("/" + template.format(project_id="(?P<project_id>[^/]+)", stage_id="(?P<stage_id>[^/]+)") + "/?$")
+
+
+def _uuid(value: str) -> UUID:
+    try:
+        return UUID(value)
+    except ValueError:
+        raise RouteError(422, f"Invalid ID {value}.")
+
+
+class EmulatorHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections, like the real API.
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, avoid the delayed ACK stall on reused
+    # connections.
+    disable_nagle_algorithm = True
+    server: "EmulatorServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"Emulator: {format % args}")
+
+    def _respond(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        content = dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        for name, value in (headers or dict()).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        content = self.rfile.read(length) if length else b""
+        self.response_headers: Dict[str, str] = dict()
+        try:
+            for route_method, pattern, handler in ROUTES:
+                match = pattern.match(url.path) if route_method == method else None
+                if match is not None:
+                    break
+            else:
+                raise RouteError(404, "Not Found")
+            try:
+                body = loads(content) if content else None
+            except JSONDecodeError:
+                # Form-encoded bodies, e.g. the username login.
+                body = dict(parse_qsl(content.decode()))
+            result = handler(self, match, dict(parse_qsl(url.query)), body)
+        except RouteError as error:
+            self._respond(error.status_code, dict(detail=error.detail))
+        except ValidationError as error:
+            self._respond(422, dict(detail=loads(error.json(include_url=False))))
+        except Exception as error:
+            logger.exception(f"Emulator failed to handle {method} {url.path}.")
+            self._respond(500, dict(detail=f"Internal Server Error: {error!r}"))
+        else:
+            self._respond(200, result, self.response_headers)
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:
+        self._dispatch("PUT")
+
+    def _check_mutable(self) -> None:
+        # Changes would only apply to the worker that handled them, and the next requests
+        # are balanced to other workers.
+        if self.server.settings.workers > 1:
+            raise RouteError(
+                405,
+                "Projects and stages can't be changed with multiple workers, each worker has its own state. "
+                "Seed the stages with the emulator's settings instead.",
+            )
+
+    def healthcheck(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        return dict(api_version="emulator", message="ok")
+
+    def login(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        token = encode(dict(exp=int(time()) + JWT_LIFETIME), JWT_SECRET, algorithm="HS256")
+        return dict(access_token=token, token_type="bearer")
+
+    def current_user(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        user = User(id=stable_id("user"), email="emulator@example.com", role=UserRole.user)
+        return user.model_dump(mode="json")
+
+    def get_projects(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        return [
+            project.model_dump(mode="json") for project in self.server.state.get_projects(params.get("project_name"))
+        ]
+
+    def create_project(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        self._check_mutable()
+        request = CreateProjectRequest.model_validate(body)
+        return self.server.state.create_project(request.name).model_dump(mode="json")
+
+    def get_project(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        return self.server.state.get_project(_uuid(match["project_id"])).model_dump(mode="json")
+
+    def create_stage(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        self._check_mutable()
+        stage = StageWithRulesets.model_validate(body)
+        return self.server.state.create_stage(_uuid(match["project_id"]), stage).model_dump(mode="json")
+
+    def get_stage(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        stage_id = params.get("stage_id")
+        return self.server.state.get_stage(
+            _uuid(match["project_id"]),
+            stage_id=_uuid(stage_id) if stage_id else None,
+            stage_name=params.get("stage_name"),
+        ).model_dump(mode="json")
+
+    def update_stage(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        self._check_mutable()
+        rulesets = RulesetsMixin.model_validate(body).rulesets
+        return self.server.state.update_stage(
+            _uuid(match["project_id"]), _uuid(match["stage_id"]), list(rulesets)
+        ).model_dump(mode="json")
+
+    def pause_stage(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        self._check_mutable()
+        paused = params.get("pause", "").lower() == "true"
+        return self.server.state.set_paused(_uuid(match["project_id"]), _uuid(match["stage_id"]), paused).model_dump(
+            mode="json"
+        )
+
+    def invoke(self, match: Match, params: Dict[str, str], body: Any) -> Any:
+        received_at = time_ns()
+        request = Request.model_validate(body)
+        settings, random = self.server.settings, self.server.random
+        latency = settings.latency.sample(random)
+        if random.random() < settings.error_rate:
+            sleep(latency)
+            raise RouteError(500, "Emulated error.")
+        if latency >= request.timeout:
+            sleep(request.timeout)
+            response = passthrough(request.payload, ExecutionStatus.timeout, received_at)
+        else:
+            response = self.server.state.invoke(request, received_at)
+            # The latency includes the processing time.
+            sleep(max(latency - (time_ns() - received_at) * 1e-9, 0))
+        if request.headers:
+            self.response_headers.update(request.headers)
+        data = response.model_dump(mode="json")
+        if request.metadata:
+            data["metadata"] = request.metadata
+        return data
+
+
+ROUTES: List[Tuple[str, Pattern, Handler]] = [
+    ("POST", _route(Routes.invoke), EmulatorHandler.invoke),
+    ("GET", _route(CoreRoutes.healthcheck), EmulatorHandler.healthcheck),
+    ("GET", _route(CoreRoutes.current_user), EmulatorHandler.current_user),
+    ("POST", _route(CoreRoutes.username_login), EmulatorHandler.login),
+    ("POST", _route(CoreRoutes.api_key_login), EmulatorHandler.login),
+    ("POST", _route(CoreRoutes.social_login), EmulatorHandler.login),
+    ("POST", _route(CoreRoutes.refresh_token), EmulatorHandler.login),
+    ("GET", _route(CoreRoutes.projects), EmulatorHandler.get_projects),
+    ("POST", _route(CoreRoutes.projects), EmulatorHandler.create_project),
+    ("GET", _route(CoreRoutes.project), EmulatorHandler.get_project),
+    ("GET", _route(Routes.stages), EmulatorHandler.get_stage),
+    ("POST", _route(Routes.stages), EmulatorHandler.create_stage),
+    ("POST", _route(Routes.stage), EmulatorHandler.update_stage),
+    ("PUT", _route(Routes.stage), EmulatorHandler.pause_stage),
+]
+
+
+class EmulatorServer(ThreadingHTTPServer):
+    """
+    Local emulator of the Protect API, for development and load testing.
+
+    It serves `protect/invoke`, the stage routes, pause and resume, and the healthcheck,
+    auth and project routes the client needs, from memory. Invocations evaluate the
+    rulesets with the local rule evaluator, on metric values that are either fixed in
+    the settings or computed by the local metric providers, after a latency sampled from
+    the settings' distribution. Each request is handled in its own thread. Stages can be
+    created through the API, or seeded from the settings.
+
+    The server can be used as a context manager, which serves it in a background
+    thread, e.g. in tests.
+
+    Parameters
+    ----------
+    settings : Optional[EmulatorSettings], optional
+        Settings of the emulator, by default None, i.e. the default settings.
+    reuse_port : bool, optional
+        Share the port with other processes, for multi-worker emulators, by default False.
+    """
+
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+    def __init__(self, settings: Optional[EmulatorSettings] = None, reuse_port: bool = False) -> None:
+        self.settings = settings or EmulatorSettings()
+        self.state = EmulatorState(self.settings)
+        self.random = Random(self.settings.seed)
+        self.reuse_port = reuse_port
+        self._thread: Optional[Thread] = None
+        super().__init__((self.settings.host, self.settings.port), EmulatorHandler)
+
+    def server_bind(self) -> None:
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/"
+
+    def __enter__(self) -> "EmulatorServer":
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+def _serve_worker(settings: EmulatorSettings, index: int) -> None:
+    # Workers sample different latencies and errors, reproducibly if seeded.
+    seed = None if settings.seed is None else settings.seed + index
+    server = EmulatorServer(settings.model_copy(update=dict(seed=seed)), reuse_port=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def serve(settings: EmulatorSettings) -> None:
+    """
+    Run the emulator until interrupted.
+
+    With more than one worker, each worker is a process listening on the same port, and
+    the kernel balances the connections between them. Every worker starts from the
+    stages of the settings, and the routes that create or change projects and stages
+    are rejected, so that all workers give the same verdicts.
+
+    Parameters
+    ----------
+    settings : EmulatorSettings
+        Settings of the emulator.
+
+    Raises
+    ------
+    ValueError
+        If there's more than one worker and the platform doesn't support sharing ports.
+    """
+    if settings.workers == 1:
+        _serve_worker(settings, 0)
+        return
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise ValueError("Multiple workers need `SO_REUSEPORT`, which this platform doesn't support.")
+    context = get_context("spawn")
+    processes = [
+        context.Process(target=_serve_worker, args=(settings, index), daemon=True) for index in range(settings.workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
@@ -0,0 +1,124 @@
+from enum import Enum
+from random import Random
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, model_validator
+
+from galileo_core.schemas.protect.ruleset import Ruleset
+from galileo_core.schemas.protect.stage import StageType
+from galileo_protect.constants.emulator import DEFAULT_HOST, DEFAULT_PORT
+
+
+class LatencyKind(str, Enum):
+    # `seconds`.
+    fixed = "fixed"
+    # `low, high`, in seconds.
+    uniform = "uniform"
+    # `mean, stddev`, in seconds.
+    normal = "normal"
+    # `mu, sigma` of the natural logarithm of the latency in seconds.
+    lognormal = "lognormal"
+    # `mean`, in seconds.
+    exponential = "exponential"
+
+
+_PARAMETERS = {
+    LatencyKind.fixed: 1,
+    LatencyKind.uniform: 2,
+    LatencyKind.normal: 2,
+    LatencyKind.lognormal: 2,
+    LatencyKind.exponential: 1,
+}
+
+
+class LatencyDistribution(BaseModel):
+    kind: LatencyKind = Field(default=LatencyKind.fixed, description="Kind of distribution.")
+    parameters: Tuple[float, ...] = Field(default=(0.0,), description="Parameters of the distribution.")
+
+    @model_validator(mode="after")
+    def validate_parameters(self) -> "LatencyDistribution":
+        expected = _PARAMETERS[self.kind]
+        if len(self.parameters) != expected:
+            raise ValueError(f"A {self.kind.value} latency takes {expected} parameter(s).")
+        return self
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """
+        Parse a latency distribution from `kind:parameters`.
+
+        Parameters
+        ----------
+        spec : str
+            Distribution, e.g. `0.05` for a fixed latency of 50ms, `uniform:0.01,0.1` or
+            `lognormal:-3,0.5`.
+
+        Returns
+        -------
+        LatencyDistribution
+            Parsed distribution.
+
+        Raises
+        ------
+        ValueError
+            If the kind is unknown or the parameters aren't valid.
+        """
+        kind, _, parameters = spec.rpartition(":")
+        return cls(
+            kind=LatencyKind(kind or LatencyKind.fixed),
+            parameters=tuple(float(parameter) for parameter in parameters.split(",")),
+        )
+
+    def sample(self, random: Random) -> float:
+        """Sample a latency, in seconds."""
+        if self.kind == LatencyKind.uniform:
+            value = random.uniform(*self.parameters)
+        elif self.kind == LatencyKind.normal:
+            value = random.gauss(*self.parameters)
+        elif self.kind == LatencyKind.lognormal:
+            value = random.lognormvariate(*self.parameters)
+        elif self.kind == LatencyKind.exponential:
+            value = random.expovariate(1 / self.parameters[0]) if self.parameters[0] > 0 else 0.0
+        else:
+            value = self.parameters[0]
+        return max(value, 0.0)
+
+
+class EmulatorStage(BaseModel):
+    project_name: str = Field(description="Name of the project of the stage, created if it doesn't exist.")
+    name: str = Field(description="Name of the stage.")
+    description: Optional[str] = Field(default=None, description="Description of the stage.")
+    type: StageType = Field(default=StageType.central, description="Type of the stage.")
+    rulesets: List[Ruleset] = Field(default_factory=list, description="Rulesets of central stages, in priority order.")
+    paused: bool = Field(default=False, description="Whether the stage is paused.")
+
+
+class EmulatorSettings(BaseModel):
+    host: str = Field(default=DEFAULT_HOST, description="Host to listen on.")
+    port: int = Field(default=DEFAULT_PORT, ge=0, description="Port to listen on, 0 for any free port.")
+    workers: int = Field(default=1, ge=1, description="Number of worker processes sharing the port.")
+    latency: LatencyDistribution = Field(default_factory=LatencyDistribution, description="Latency of the invocations.")
+    error_rate: float = Field(default=0.0, ge=0, le=1, description="Fraction of invocations that fail with a 500.")
+    metrics: Dict[str, Any] = Field(
+        default_factory=dict, description="Fixed values of metrics, e.g. to trigger rulesets deterministically."
+    )
+    local_providers: bool = Field(
+        default=True, description="Compute the other metrics with the local metric providers, if they have one."
+    )
+    auto_create: bool = Field(
+        default=True, description="Create the projects and stages that invocations refer to if they don't exist."
+    )
+    seed: Optional[int] = Field(default=None, description="Seed of the latency and error sampling.")
+    stages: List[EmulatorStage] = Field(
+        default_factory=list,
+        description="Stages that every worker starts with, the only way to set up stages with multiple workers.",
+    )
+
+    @model_validator(mode="after")
+    def validate_workers(self) -> "EmulatorSettings":
+        if self.workers > 1 and self.port == 0:
+            raise ValueError("Multiple workers need a fixed port to share.")
+        names = [(stage.project_name, stage.name) for stage in self.stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Stage names must be unique within each project.")
+        return self
@@ -0,0 +1,193 @@
+from threading import Lock
+from typing import Dict, List, Optional
+from uuid import UUID, uuid5
+
+from pydantic import UUID4
+
+from galileo_core.schemas.core.project import ProjectResponse, ProjectType
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.payload import Payload
+from galileo_core.schemas.protect.request import Request
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_core.schemas.protect.ruleset import Ruleset
+from galileo_core.schemas.protect.stage import StageType, StageWithRulesets
+from galileo_core.schemas.shared.metric import MetricValueType
+from galileo_protect.constants.emulator import ID_NAMESPACE
+from galileo_protect.emulator.settings import EmulatorSettings
+from galileo_protect.evaluation import RuleEvaluator, decision_response
+from galileo_protect.providers import compute_metrics
+from galileo_protect.schemas.stage import StageResponse
+
+
+class RouteError(Exception):
+    """Error answered with an HTTP status code, like the API's errors."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def passthrough(payload: Payload, status: ExecutionStatus, received_at: int) -> Response:
+    """Response passing the payload text through without evaluating the rulesets."""
+    return Response(
+        text=payload.output or payload.input or "",
+        status=status,
+        trace_metadata=TraceMetadata(received_at=received_at),
+    )
+
+
+def stable_id(*parts: object) -> UUID:
+    """Derive a version 4 UUID from names, so that all the workers agree on the IDs."""
+    return UUID(bytes=uuid5(ID_NAMESPACE, "/".join(str(part) for part in parts)).bytes, version=4)
+
+
+class _Stage:
+    __slots__ = ("response", "rulesets", "evaluator")
+
+    def __init__(self, response: StageResponse, rulesets: List[Ruleset]) -> None:
+        self.response = response
+        self.rulesets = rulesets
+        # Rulesets of central stages are compiled once per version.
+        self.evaluator = RuleEvaluator(rulesets)
+
+
+class EmulatorState:
+    """
+    In-memory projects and stages of the emulator, and the invocation logic.
+
+    IDs are derived from the names, so that the workers of a multi-worker emulator agree
+    on them. Each worker has its own state, so with multiple workers, the stages are
+    seeded from the settings, and the server rejects the routes that change them.
+
+    Parameters
+    ----------
+    settings : EmulatorSettings
+        Settings of the emulator.
+    """
+
+    def __init__(self, settings: EmulatorSettings) -> None:
+        self.settings = settings
+        self._lock = Lock()
+        self._projects: Dict[UUID, ProjectResponse] = dict()
+        self._stages: Dict[UUID, _Stage] = dict()
+        for stage in settings.stages:
+            project_id = stable_id("project", stage.project_name)
+            if project_id not in self._projects:
+                self.create_project(stage.project_name)
+            self.create_stage(
+                project_id,
+                StageWithRulesets(
+                    name=stage.name,
+                    project_id=project_id,
+                    description=stage.description,
+                    type=stage.type,
+                    rulesets=stage.rulesets,
+                    paused=stage.paused,
+                ),
+            )
+
+    def create_project(self, name: str) -> ProjectResponse:
+        with self._lock:
+            project = ProjectResponse(id=stable_id("project", name), name=name, type=ProjectType.protect)
+            if project.id in self._projects:
+                raise RouteError(409, f"Project {name} already exists.")
+            self._projects[project.id] = project
+            return project
+
+    def get_projects(self, name: Optional[str] = None) -> List[ProjectResponse]:
+        with self._lock:
+            return [project for project in self._projects.values() if name is None or project.name == name]
+
+    def get_project(self, project_id: UUID) -> ProjectResponse:
+        project = self._projects.get(project_id)
+        if project is None:
+            raise RouteError(404, f"Project {project_id} not found.")
+        return project
+
+    def create_stage(
+        self, project_id: UUID, stage: StageWithRulesets, stage_id: Optional[UUID] = None
+    ) -> StageResponse:
+        with self._lock:
+            response = StageResponse(
+                id=stage_id or stable_id("stage", project_id, stage.name),
+                name=stage.name,
+                project_id=project_id,
+                description=stage.description,
+                type=stage.type,
+                paused=stage.paused,
+                version=0 if stage.type == StageType.central else None,
+            )
+            if response.id in self._stages:
+                raise RouteError(409, f"Stage {stage.name} already exists.")
+            self._stages[response.id] = _Stage(response, list(stage.rulesets))
+            return response
+
+    def get_stage(
+        self, project_id: UUID, stage_id: Optional[UUID] = None, stage_name: Optional[str] = None
+    ) -> StageResponse:
+        stage_id = stage_id or (stable_id("stage", project_id, stage_name) if stage_name else None)
+        stage = self._stages.get(stage_id) if stage_id is not None else None
+        if stage is None or stage.response.project_id != project_id:
+            raise RouteError(404, f"Stage {stage_id or stage_name} not found.")
+        return stage.response
+
+    def update_stage(self, project_id: UUID, stage_id: UUID, rulesets: List[Ruleset]) -> StageResponse:
+        with self._lock:
+            response = self.get_stage(project_id, stage_id=stage_id)
+            response = response.model_copy(update=dict(version=(response.version or 0) + 1))
+            self._stages[stage_id] = _Stage(response, rulesets)
+            return response
+
+    def set_paused(self, project_id: UUID, stage_id: UUID, paused: bool) -> StageResponse:
+        with self._lock:
+            stage = self._stages[self.get_stage(project_id, stage_id=stage_id).id]
+            stage.response = stage.response.model_copy(update=dict(paused=paused))
+            return stage.response
+
+    def _resolve_stage(self, request: Request) -> _Stage:
+        project_id: Optional[UUID4] = request.project_id
+        if project_id is None and request.project_name:
+            project_id = stable_id("project", request.project_name)
+            if project_id not in self._projects:
+                if not self.settings.auto_create:
+                    raise RouteError(404, f"Project {request.project_name} not found.")
+                try:
+                    self.create_project(request.project_name)
+                except RouteError:
+                    # Created concurrently.
+                    pass
+        stage_id = request.stage_id or stable_id("stage", project_id, request.stage_name)
+        stage = self._stages.get(stage_id)
+        if stage is None:
+            if not self.settings.auto_create or project_id is None:
+                raise RouteError(404, f"Stage {request.stage_id or request.stage_name} not found.")
+            name = request.stage_name or str(stage_id)
+            try:
+                self.create_stage(project_id, StageWithRulesets(name=name, project_id=project_id), stage_id=stage_id)
+            except RouteError:
+                # Created concurrently.
+                pass
+            stage = self._stages[stage_id]
+        return stage
+
+    def metrics(self, payload: Payload, metrics: List[str]) -> Dict[str, MetricValueType]:
+        """Get the values of metrics, the fixed ones first, then the local providers."""
+        fixed = self.settings.metrics
+        computed = [metric for metric in metrics if metric not in fixed]
+        values = compute_metrics(payload, computed) if self.settings.local_providers else dict()
+        values.update((metric, fixed[metric]) for metric in metrics if metric in fixed)
+        return values
+
+    def invoke(self, request: Request, received_at: int) -> Response:
+        """
+        Process an invocation like the Protect API, without the latency and errors.
+
+        Local stages use the rulesets of the request, central stages their own.
+        """
+        stage = self._resolve_stage(request)
+        if stage.response.paused:
+            return passthrough(request.payload, ExecutionStatus.paused, received_at)
+        evaluator = stage.evaluator if stage.response.type == StageType.central else RuleEvaluator(request.rulesets)
+        values = self.metrics(request.payload, sorted(evaluator.metrics))
+        return decision_response(request.payload, evaluator.triggered(values), received_at)
@@ -0,0 +1,203 @@
+from operator import eq, ge, gt, le, lt, ne
+from time import time_ns
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple, Union
+
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.payload import Payload
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_core.schemas.protect.rule import Rule, RuleOperator
+from galileo_core.schemas.protect.ruleset import Ruleset
+from galileo_core.schemas.shared.metric import MetricValueType
+from galileo_protect.schemas.rule import RuleMetrics
+
+Predicate = Callable[[MetricValueType], bool]
+
+_COMPARISONS: Dict[RuleOperator, Callable[[Any, Any], bool]] = {
+    RuleOperator.gt: gt,
+    RuleOperator.lt: lt,
+    RuleOperator.gte: ge,
+    RuleOperator.lte: le,
+    RuleOperator.eq: eq,
+    RuleOperator.neq: ne,
+}
+
+
+def _never(value: MetricValueType) -> bool:
+    return False
+
+
+def compile_rule(rule: Rule) -> Predicate:
+    """
+    Compile a rule into a predicate on the metric value.
+
+    The predicate gives the same result as `Rule.evaluate`, but the operator and the type
+    of the target value are dispatched once, when compiling, instead of on every call.
+    Missing (`None`) values and operators that don't apply to the types of the value
+    and target never trigger.
+
+    Parameters
+    ----------
+    rule : Rule
+        Rule to compile.
+
+    Returns
+    -------
+    Callable[[MetricValueType], bool]
+        Whether the rule is met for a metric value.
+    """
+    operator, target = rule.operator, rule.target_value
+    if isinstance(target, (float, int)):
+        compare = _COMPARISONS.get(operator)
+        if compare is not None:
+            return lambda value: isinstance(value, (float, int)) and compare(value, target)
+    elif isinstance(target, str):
+        if operator == RuleOperator.eq:
+            return lambda value: isinstance(value, str) and value == target
+        elif operator == RuleOperator.neq:
+            return lambda value: isinstance(value, str) and value != target
+        elif operator == RuleOperator.contains:
+            return lambda value: isinstance(value, list) and target in value
+    elif isinstance(target, list):
+        targets = list(target)
+        # Strings are only ever equal to strings, so they can be looked up in a set.
+        strings = frozenset(item for item in targets if isinstance(item, str))
+        if operator == RuleOperator.any:
+            return lambda value: (isinstance(value, str) and value in strings) or (
+                isinstance(value, list) and any(item in value for item in targets)
+            )
+        elif operator == RuleOperator.all:
+            return lambda value: isinstance(value, list) and all(item in value for item in targets)
+    elif target is None:
+        if operator == RuleOperator.empty:
+            return lambda value: isinstance(value, list) and len(value) == 0
+        elif operator == RuleOperator.not_empty:
+            return lambda value: isinstance(value, list) and len(value) > 0
+    return _never
+
+
+def decision_response(
+    payload: Payload, ruleset: Optional[Ruleset], received_at: int, metadata: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Build the response for a decision, as the Protect API would.
+
+    Like the API, the request's metadata, if any, is echoed back in the response.
+
+    Parameters
+    ----------
+    payload : Payload
+        Payload the decision was made on.
+    ruleset : Optional[Ruleset]
+        Triggered ruleset, or None if no ruleset was triggered.
+    received_at : int
+        Time the decision started, in nanoseconds.
+    metadata : Optional[Dict[str, str]], optional
+        Metadata of the request, by default None.
+
+    Returns
+    -------
+    Response
+        `triggered` response with the text of the ruleset's action, or `not_triggered`
+        response with the payload text, i.e. the output, or the input if there's no
+        output.
+    """
+    text = payload.output or payload.input or ""
+    extra = dict(metadata=metadata) if metadata else dict()
+    if ruleset is None:
+        return Response(
+            text=text,
+            status=ExecutionStatus.not_triggered,
+            trace_metadata=TraceMetadata(received_at=received_at),
+            **extra,
+        )
+    return Response(
+        text=ruleset.action.apply(text).value,
+        status=ExecutionStatus.triggered,
+        trace_metadata=TraceMetadata(received_at=received_at),
+        **extra,
+    )
+
+
+class RuleEvaluator:
+    """
+    Evaluate rulesets locally, from metric values that are already known.
+
+    The rulesets are compiled once, so deciding on a set of metric values only runs the
+    rule predicates, e.g. to re-decide on cached metrics without a round trip to the
+    Protect API. A ruleset is triggered when all of its rules are met, and the rulesets
+    are evaluated in priority order: the first triggered ruleset decides the response,
+    and the remaining rules and rulesets aren't evaluated.
+
+    Parameters
+    ----------
+    rulesets : Sequence[Ruleset]
+        Rulesets to evaluate, in priority order.
+    """
+
+    def __init__(self, rulesets: Sequence[Ruleset]) -> None:
+        self.rulesets = list(rulesets)
+        self._compiled: List[Tuple[Tuple[str, Predicate], ...]] = [
+            tuple((rule.metric, compile_rule(rule)) for rule in ruleset.rules) for ruleset in self.rulesets
+        ]
+        self.metrics: FrozenSet[str] = frozenset(rule.metric for ruleset in self.rulesets for rule in ruleset.rules)
+
+    def triggered(self, metrics: Mapping[Union[RuleMetrics, str], MetricValueType]) -> Optional[Ruleset]:
+        """
+        Get the first ruleset triggered by the metric values.
+
+        Parameters
+        ----------
+        metrics : Mapping[Union[RuleMetrics, str], MetricValueType]
+            Metric values by metric name. Missing metrics don't meet any rule.
+
+        Returns
+        -------
+        Optional[Ruleset]
+            First triggered ruleset in priority order, or None if none is.
+        """
+        for index, ruleset in enumerate(self.rulesets):
+            if self.is_triggered(index, metrics):
+                return ruleset
+        return None
+
+    def is_triggered(self, index: int, metrics: Mapping[Union[RuleMetrics, str], MetricValueType]) -> bool:
+        """
+        Whether a ruleset is triggered by the metric values.
+
+        The rules are evaluated in order, and the metrics of the rules after the first one
+        that isn't met aren't looked up.
+
+        Parameters
+        ----------
+        index : int
+            Index of the ruleset in priority order.
+        metrics : Mapping[Union[RuleMetrics, str], MetricValueType]
+            Metric values by metric name. Missing metrics don't meet any rule.
+
+        Returns
+        -------
+        bool
+            Whether all the rules of the ruleset are met.
+        """
+        return all(predicate(metrics.get(metric)) for metric, predicate in self._compiled[index])
+
+    def evaluate(self, payload: Payload, metrics: Mapping[Union[RuleMetrics, str], MetricValueType]) -> Response:
+        """
+        Decide the response for a payload, as the Protect API would.
+
+        Parameters
+        ----------
+        payload : Payload
+            Payload the metrics were computed on.
+        metrics : Mapping[Union[RuleMetrics, str], MetricValueType]
+            Metric values by metric name. Missing metrics don't meet any rule.
+
+        Returns
+        -------
+        Response
+            `triggered` response with the text of the action of the first triggered
+            ruleset, or `not_triggered` response with the payload text, i.e. the
+            output, or the input if there's no output.
+        """
+        received_at = time_ns()
+        return decision_response(payload, self.triggered(metrics), received_at)
@@ -0,0 +1,39 @@
+from typing import Optional
+
+from galileo_core.exceptions.http import GalileoHTTPException
+
+
+class CircuitOpenError(Exception):
+    """Raised when a Protect invocation is rejected because its circuit is open."""
+
+    def __init__(self, project: Optional[str], stage: Optional[str], retry_after: float) -> None:
+        self.project = project
+        self.stage = stage
+        self.retry_after = retry_after
+        super().__init__(
+            f"Circuit for project {project} and stage {stage} is open, retry after {retry_after:.1f} seconds."
+        )
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a Protect call is made, or times out, after the deadline of its context."""
+
+    def __init__(self, deadline: float) -> None:
+        self.deadline = deadline
+        super().__init__(f"Deadline {deadline:.3f} exceeded.")
+
+
+class RateLimitedError(GalileoHTTPException):
+    """Raised when the Protect API rejects a request because it is rate limited or unavailable."""
+
+    def __init__(self, message: str, status_code: int, response_text: str, retry_after: Optional[float]) -> None:
+        super().__init__(message, status_code, response_text)
+        self.retry_after = retry_after
+
+
+class SchedulerQueueFullError(Exception):
+    """Raised when a Protect invocation can't be queued because the scheduler's queue is full."""
+
+
+class WorkerPoolFullError(Exception):
+    """Raised when a payload can't be submitted because the worker pool's queue is full."""
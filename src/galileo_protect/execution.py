@@ -0,0 +1,56 @@
+from contextvars import Context, copy_context
+from threading import current_thread
+from typing import Any, Coroutine
+
+from galileo_core.helpers.event_loop_thread_pool import EventLoopThreadPool
+
+# A single, long-lived event loop for all of Protect's synchronous calls. Using one loop
+# (instead of a pool of loops) means that the async HTTP client, and hence its
+# keep-alive connections, are reused across calls. The pool is started lazily and
+# re-created in forked processes.
+_event_loop = EventLoopThreadPool(name="galileo_protect", num_threads=1)
+
+
+async def _run_in_context(context: Context, coroutine: Coroutine) -> Any:
+    # The task running this already has its own copy of the loop's context, so setting
+    # the caller's values here doesn't leak them into other tasks.
+    for var, value in context.items():
+        var.set(value)
+    return await coroutine
+
+
+def async_run(coroutine: Coroutine, wait_for_result: bool = True) -> Any:
+    """
+    Run an async coroutine synchronously on Protect's background event loop.
+
+    The coroutine is submitted to the loop with `asyncio.run_coroutine_threadsafe`, so
+    this is safe to call from any thread. It runs with a copy of the caller's context, so
+    context variables such as the Protect deadline are propagated.
+
+    Parameters
+    ----------
+    coroutine : Coroutine
+        The coroutine to run.
+    wait_for_result : bool, optional
+        If True, the function will block until the coroutine is complete and return
+        its result. If False, the function will return a concurrent.futures.Future
+        object immediately.
+
+    Returns
+    -------
+    Any
+        The result of the coroutine.
+
+    Raises
+    ------
+    RuntimeError
+        If waiting for the result from Protect's background event loop itself, e.g. in a
+        callback of an async invocation, which would block the loop forever.
+    """
+    if wait_for_result and current_thread() in _event_loop.threads:
+        coroutine.close()
+        raise RuntimeError(
+            "Can't wait for a synchronous Protect call on Protect's event loop, it would block forever. "
+            "Use the async API (e.g. `ainvoke`) or `wait_for_result=False` instead."
+        )
+    return _event_loop.submit(_run_in_context(copy_context(), coroutine), wait_for_result=wait_for_result)
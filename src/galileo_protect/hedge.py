@@ -0,0 +1,158 @@
+from asyncio import FIRST_COMPLETED, Future, ensure_future, wait
+from threading import Lock
+from time import monotonic
+from typing import Awaitable, Callable, Optional, Set, TypeVar
+
+from pydantic import BaseModel, Field
+
+from galileo_core.helpers.logger import logger
+from galileo_protect.constants.hedge import MAX_HEDGE_BURST, MAX_HEDGE_RATIO
+from galileo_protect.constants.latency import MIN_SAMPLES, WINDOW_SAMPLES
+from galileo_protect.latency import LatencyWindow
+
+T = TypeVar("T")
+
+
+class HedgeStats(BaseModel):
+    requests: int = Field(default=0, description="Number of primary requests.")
+    hedges: int = Field(default=0, description="Number of hedged requests sent.")
+    hedge_wins: int = Field(default=0, description="Number of hedged requests that returned first.")
+    throttled: int = Field(default=0, description="Number of hedges skipped because of the hedge budget.")
+
+    @property
+    def hedge_rate(self) -> float:
+        """Fraction of requests that were hedged."""
+        return self.hedges / self.requests if self.requests else 0.0
+
+
+class HedgePolicy:
+    """
+    Opt-in request hedging, to cut tail latency.
+
+    If the primary request hasn't returned after the hedge delay, a duplicate request is
+    sent, the first one to succeed is used and the other one is cancelled. The delay is
+    either fixed, or a percentile of the observed latencies, with the fixed delay used
+    until enough latencies have been observed.
+
+    Hedges are paid for from a budget that grows by `max_hedge_ratio` for every request,
+    up to `max_hedge_burst`, so hedging can't amplify load by more than that ratio during
+    incidents. The same policy should be shared by all invocations it applies to, it is
+    safe to share across threads and event loops.
+
+    Parameters
+    ----------
+    delay : Optional[float], optional
+        Fixed delay before hedging, in seconds, by default None.
+    percentile : Optional[float], optional
+        Percentile of the observed latencies to use as the delay, e.g. 95, by default None.
+    max_hedge_ratio : float, optional
+        Maximum number of hedges per request, by default 0.1.
+    max_hedge_burst : float, optional
+        Maximum number of hedges that can be sent in a burst, by default 10.
+    max_samples : int, optional
+        Number of most recent latencies to estimate the percentile from, by default 1024.
+    min_samples : int, optional
+        Minimum number of latencies before using the percentile, by default 20.
+
+    Raises
+    ------
+    ValueError
+        If neither the delay nor the percentile is set, or the ratio is invalid.
+    """
+
+    def __init__(
+        self,
+        delay: Optional[float] = None,
+        percentile: Optional[float] = None,
+        max_hedge_ratio: float = MAX_HEDGE_RATIO,
+        max_hedge_burst: float = MAX_HEDGE_BURST,
+        max_samples: int = WINDOW_SAMPLES,
+        min_samples: int = MIN_SAMPLES,
+    ) -> None:
+        if delay is None and percentile is None:
+            raise ValueError("Either a hedge delay or a latency percentile must be set.")
+        if percentile is not None and not 0 < percentile < 100:
+            raise ValueError("Hedge percentile must be between 0 and 100.")
+        if not 0 <= max_hedge_ratio <= 1:
+            raise ValueError("Max hedge ratio must be between 0 and 1.")
+        self.delay = delay
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.max_hedge_burst = max_hedge_burst
+        self.latencies = LatencyWindow(max_samples=max_samples, min_samples=min_samples)
+        self._lock = Lock()
+        self._budget = 0.0
+        self._stats = HedgeStats()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Get the current delay before hedging, or None if requests can't be hedged yet."""
+        if self.percentile is not None:
+            observed = self.latencies.percentile(self.percentile)
+            if observed is not None:
+                return observed
+        return self.delay
+
+    @property
+    def stats(self) -> HedgeStats:
+        with self._lock:
+            return self._stats.model_copy()
+
+    def _start(self) -> None:
+        with self._lock:
+            self._stats.requests += 1
+            self._budget = min(self._budget + self.max_hedge_ratio, self.max_hedge_burst)
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._budget < 1:
+                self._stats.throttled += 1
+                return False
+            self._budget -= 1
+            self._stats.hedges += 1
+            return True
+
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn`, and hedge it with a second call if it is slow.
+
+        Parameters
+        ----------
+        fn : Callable[[], Awaitable[T]]
+            Function sending the request. It is called again for the hedge.
+
+        Returns
+        -------
+        T
+            Result of the first call to succeed, or the exception of the last one to fail.
+        """
+        self._start()
+        started_at = monotonic()
+        primary = ensure_future(fn())
+        pending: Set[Future] = {primary}
+        try:
+            done, pending = await wait(pending, timeout=self.hedge_delay())
+            if not done and self._acquire():
+                logger.debug("Hedging slow Protect request.")
+                hedge = ensure_future(fn())
+                pending.add(hedge)
+                while pending:
+                    done, pending = await wait(pending, return_when=FIRST_COMPLETED)
+                    succeeded = [task for task in done if not task.cancelled() and task.exception() is None]
+                    if succeeded:
+                        winner = hedge if hedge in succeeded else succeeded[0]
+                        if winner is hedge:
+                            with self._lock:
+                                self._stats.hedge_wins += 1
+                        # A primary that lost took at least this long, recording only the
+                        # hedge's latency would bias the delay down, and hedge more and more.
+                        self.latencies.add(monotonic() - started_at)
+                        return winner.result()
+                    if not pending:
+                        # Both failed, raise the last failure.
+                        return done.pop().result()
+            result = await primary
+            self.latencies.add(monotonic() - started_at)
+            return result
+        finally:
+            for task in pending:
+                task.cancel()
@@ -1,15 +1,463 @@
-from typing import Dict, Optional, Sequence
+from asyncio import FIRST_COMPLETED, Future, Semaphore, ensure_future, gather, wait
+from time import monotonic, perf_counter_ns, time_ns
+from typing import Any, Awaitable, Dict, Iterable, List, Literal, Optional, Sequence, Set, TypeVar, Union, overload
 
+from httpx import TimeoutException
 from pydantic import UUID4
 
 from galileo_core.constants.request_method import RequestMethod
-from galileo_core.helpers.execution import async_run
+from galileo_core.helpers.api_client import ApiClient
 from galileo_core.helpers.logger import logger
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
 from galileo_core.schemas.protect.response import Response
-from galileo_protect.constants.invoke import TIMEOUT, TIMEOUT_MARGIN
+from galileo_protect.budget import InvocationBudget
+from galileo_protect.cache import ResponseCache, request_key, stage_key
+from galileo_protect.circuit_breaker import CircuitBreaker
+from galileo_protect.client import ProtectClient
+from galileo_protect.coalesce import SingleFlight
+from galileo_protect.constants.invoke import MAX_CONCURRENCY, TIMEOUT, TIMEOUT_MARGIN
 from galileo_protect.constants.routes import Routes
-from galileo_protect.schemas import Payload, Request, Ruleset
+from galileo_protect.constants.scheduler import RETRYABLE_STATUS_CODES
+from galileo_protect.constants.timeout import MIN_READ_MARGIN
+from galileo_protect.deadline import get_deadline, remaining_time
+from galileo_protect.evaluation import decision_response
+from galileo_protect.exceptions import CircuitOpenError, DeadlineExceededError, RateLimitedError
+from galileo_protect.execution import async_run
+from galileo_protect.hedge import HedgePolicy
+from galileo_protect.metrics import MetricsRecorder, get_metrics_recorder
+from galileo_protect.preflight import Preflight
+from galileo_protect.profiling import NetworkTrace, Phase, current_call, end_call, start_call
+from galileo_protect.providers import decide_locally
+from galileo_protect.resolution import resolution_cache
+from galileo_protect.scheduler import InvocationScheduler, Priority, retry_after_seconds, scheduler_key
+from galileo_protect.schemas import Payload, RawResponse, Request, ResultMode, Ruleset
 from galileo_protect.schemas.config import ProtectConfig
+from galileo_protect.timeout import AdaptiveTimeout
+
+R = TypeVar("R", bound=Union[Response, RawResponse])
+
+# In-flight invocations, shared by all coalescing callers in this process.
+_in_flight = SingleFlight()
+
+
+@overload
+async def _asend(
+    config: ProtectConfig,
+    request_json: Dict,
+    read_timeout: float,
+    client: Optional[ProtectClient] = None,
+    raw: Literal[False] = False,
+) -> Response: ...
+
+
+@overload
+async def _asend(
+    config: ProtectConfig, request_json: Dict, read_timeout: float, client: Optional[ProtectClient], raw: Literal[True]
+) -> RawResponse: ...
+
+
+@overload
+async def _asend(
+    config: ProtectConfig, request_json: Dict, read_timeout: float, client: Optional[ProtectClient], raw: bool
+) -> Union[Response, RawResponse]: ...
+
+
+async def _asend(
+    config: ProtectConfig,
+    request_json: Dict,
+    read_timeout: float,
+    client: Optional[ProtectClient] = None,
+    raw: bool = False,
+) -> Union[Response, RawResponse]:
+    call = current_call()
+    started_at = perf_counter_ns() if call is not None else 0
+    # Validates, and refreshes if needed, the JWT.
+    api_client = config.api_client
+    if call is not None:
+        started_at = call.add(Phase.auth, started_at)
+    request_kwargs: Dict[str, Any] = dict(
+        json=request_json,
+        read_timeout=read_timeout,
+        # Decode the response body ourselves, directly from bytes, instead of parsing it
+        # into dicts first and then validating those.
+        return_raw_response=True,
+    )
+    trace: Optional[NetworkTrace] = None
+    if call is not None:
+        trace = NetworkTrace()
+        request_kwargs["extensions"] = dict(trace=trace)
+    if client is not None:
+        http_response = await client.arequest(
+            RequestMethod.POST, Routes.invoke, api_client=api_client, **request_kwargs
+        )
+    else:
+        http_response = await api_client.arequest(RequestMethod.POST, Routes.invoke, **request_kwargs)
+    if call is not None and trace is not None:
+        started_at = trace.add(call, started_at)
+    if http_response.status_code in RETRYABLE_STATUS_CODES:
+        ApiClient.validate_response(http_response, raise_on_error=False)
+        raise RateLimitedError(
+            f"Galileo API returned HTTP status code {http_response.status_code}. Error was: {http_response.text}",
+            http_response.status_code,
+            http_response.text,
+            retry_after=retry_after_seconds(http_response.headers.get("Retry-After")),
+        )
+    ApiClient.validate_response(http_response)
+    logger.debug("Protect invocation completed.")
+    response: Union[Response, RawResponse]
+    if raw:
+        response = RawResponse.from_json(http_response.content)
+    else:
+        response = Response.model_validate_json(http_response.content)
+    if call is not None:
+        call.add(Phase.decode, started_at)
+    return response
+
+
+async def _asend_observed(
+    adaptive_timeout: AdaptiveTimeout,
+    config: ProtectConfig,
+    request_json: Dict,
+    read_timeout: float,
+    client: Optional[ProtectClient],
+    raw: bool,
+    observe_timeouts: bool = True,
+) -> Union[Response, RawResponse]:
+    started_at = monotonic()
+    try:
+        response = await _asend(config, request_json, read_timeout, client, raw)
+    except TimeoutException:
+        if observe_timeouts:
+            adaptive_timeout.observe_timeout(request_json, read_timeout)
+        raise
+    adaptive_timeout.observe(request_json, response, monotonic() - started_at)
+    return response
+
+
+async def _asend_before_deadline(
+    remaining: float,
+    adaptive_timeout: Optional[AdaptiveTimeout],
+    config: ProtectConfig,
+    request_json: Dict,
+    read_timeout: float,
+    client: Optional[ProtectClient],
+    raw: bool,
+) -> Union[Response, RawResponse]:
+    bounded = remaining < read_timeout
+    if bounded:
+        # Leave the server enough time to respond before the deadline, so that it
+        # responds with a timeout status instead of the request timing out.
+        request_json = {
+            **request_json,
+            "timeout": min(request_json["timeout"], remaining - min(MIN_READ_MARGIN, remaining / 2)),
+        }
+        read_timeout = remaining
+    try:
+        if adaptive_timeout is not None:
+            # Timeouts caused by the deadline don't say anything about the latency.
+            return await _asend_observed(
+                adaptive_timeout, config, request_json, read_timeout, client, raw, observe_timeouts=not bounded
+            )
+        return await _asend(config, request_json, read_timeout, client, raw)
+    except TimeoutException as error:
+        deadline = get_deadline()
+        if bounded and deadline is not None:
+            raise DeadlineExceededError(deadline) from error
+        raise
+
+
+async def _arecord_request(
+    recorder: MetricsRecorder, request_json: Dict, attempt: Awaitable[Union[Response, RawResponse]]
+) -> Union[Response, RawResponse]:
+    started_at = monotonic()
+    response = await attempt
+    latency = monotonic() - started_at
+    if isinstance(response, RawResponse):
+        execution_time = response.execution_time
+    else:
+        execution_time = response.trace_metadata.execution_time
+    project, stage = stage_key(request_json)
+    recorder.record_request(project, stage, latency, execution_time if execution_time > 0 else None)
+    return response
+
+
+def _request_json(
+    config: ProtectConfig,
+    payload: Payload,
+    prioritized_rulesets: Optional[Sequence[Ruleset]] = None,
+    project_id: Optional[UUID4] = None,
+    project_name: Optional[str] = None,
+    stage_id: Optional[UUID4] = None,
+    stage_name: Optional[str] = None,
+    timeout: Union[float, AdaptiveTimeout] = TIMEOUT,
+    metadata: Optional[Dict[str, str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Dict[str, Any]:
+    project_id = project_id or config.project_id
+    project_name = project_name or config.project_name
+    stage_id = stage_id or config.stage_id
+    stage_name = stage_name or config.stage_name
+    if stage_id is None and stage_name:
+        # Send the stage ID if we already know it, so that the server doesn't need to
+        # look it up.
+        if project_id is None and project_name:
+            project_id = resolution_cache.get_project_id(project_name)
+        if project_id is not None:
+            stage_id = resolution_cache.get_stage_id(project_id, stage_name)
+    return Request(
+        payload=payload,
+        rulesets=prioritized_rulesets or [],
+        project_id=project_id,
+        project_name=project_name,
+        stage_name=stage_name,
+        stage_id=stage_id,
+        # Adaptive timeouts are set per request, when sending it.
+        timeout=timeout.ceiling if isinstance(timeout, AdaptiveTimeout) else timeout,
+        metadata=metadata,
+        headers=headers,
+    ).model_dump(mode="json")
+
+
+@overload
+async def _ainvoke_request(
+    config: ProtectConfig,
+    request_json: Dict[str, Any],
+    timeout: Union[float, AdaptiveTimeout],
+    cache: Optional[ResponseCache] = None,
+    coalesce: bool = False,
+    client: Optional[ProtectClient] = None,
+    raw: Literal[False] = False,
+    hedge: Optional[HedgePolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    scheduler: Optional[InvocationScheduler] = None,
+    priority: Union[Priority, str] = Priority.interactive,
+    budget: Optional[InvocationBudget] = None,
+    record: bool = True,
+) -> Response: ...
+
+
+@overload
+async def _ainvoke_request(
+    config: ProtectConfig,
+    request_json: Dict[str, Any],
+    timeout: Union[float, AdaptiveTimeout],
+    cache: Optional[ResponseCache],
+    coalesce: bool,
+    client: Optional[ProtectClient],
+    raw: Literal[True],
+    hedge: Optional[HedgePolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    scheduler: Optional[InvocationScheduler] = None,
+    priority: Union[Priority, str] = Priority.interactive,
+    budget: Optional[InvocationBudget] = None,
+    record: bool = True,
+) -> RawResponse: ...
+
+
+@overload
+async def _ainvoke_request(
+    config: ProtectConfig,
+    request_json: Dict[str, Any],
+    timeout: Union[float, AdaptiveTimeout],
+    cache: Optional[ResponseCache],
+    coalesce: bool,
+    client: Optional[ProtectClient],
+    raw: bool,
+    hedge: Optional[HedgePolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    scheduler: Optional[InvocationScheduler] = None,
+    priority: Union[Priority, str] = Priority.interactive,
+    budget: Optional[InvocationBudget] = None,
+    record: bool = True,
+) -> Union[Response, RawResponse]: ...
+
+
+async def _ainvoke_request(
+    config: ProtectConfig,
+    request_json: Dict[str, Any],
+    timeout: Union[float, AdaptiveTimeout],
+    cache: Optional[ResponseCache] = None,
+    coalesce: bool = False,
+    client: Optional[ProtectClient] = None,
+    raw: bool = False,
+    hedge: Optional[HedgePolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    scheduler: Optional[InvocationScheduler] = None,
+    priority: Union[Priority, str] = Priority.interactive,
+    budget: Optional[InvocationBudget] = None,
+    record: bool = True,
+) -> Union[Response, RawResponse]:
+    recorder = get_metrics_recorder()
+    pipeline = _ainvoke_pipeline(
+        config,
+        request_json,
+        timeout,
+        cache,
+        coalesce,
+        client,
+        raw,
+        hedge,
+        circuit_breaker,
+        scheduler,
+        priority,
+        budget,
+        recorder,
+    )
+    if recorder is None or not record:
+        return await pipeline
+    return await _arecord_invocation(recorder, request_json, pipeline)
+
+
+async def _arecord_invocation(recorder: MetricsRecorder, request_json: Dict, invocation: Awaitable[R]) -> R:
+    project, stage = stage_key(request_json)
+    started_at = monotonic()
+    try:
+        response = await invocation
+    except Exception as error:
+        recorder.record_invocation(project, stage, monotonic() - started_at, error=error)
+        raise
+    recorder.record_invocation(project, stage, monotonic() - started_at, status=response.status)
+    return response
+
+
+async def _ainvoke_pipeline(
+    config: ProtectConfig,
+    request_json: Dict[str, Any],
+    timeout: Union[float, AdaptiveTimeout],
+    cache: Optional[ResponseCache],
+    coalesce: bool,
+    client: Optional[ProtectClient],
+    raw: bool,
+    hedge: Optional[HedgePolicy],
+    circuit_breaker: Optional[CircuitBreaker],
+    scheduler: Optional[InvocationScheduler],
+    priority: Union[Priority, str],
+    budget: Optional[InvocationBudget],
+    recorder: Optional[MetricsRecorder] = None,
+) -> Union[Response, RawResponse]:
+    # Fail fast if the deadline has already passed.
+    remaining_time()
+    if budget is not None:
+        # The budget covers the whole invocation, the request keeps going in the
+        # background if it runs out.
+        budgeted = await budget.run(
+            request_json,
+            lambda: _ainvoke_pipeline(
+                config,
+                request_json,
+                timeout,
+                cache,
+                coalesce,
+                client,
+                raw,
+                hedge,
+                circuit_breaker,
+                scheduler,
+                priority,
+                None,
+                recorder,
+            ),
+        )
+        return RawResponse.from_response(budgeted) if raw and isinstance(budgeted, Response) else budgeted
+    key = ""
+    if cache is not None or coalesce:
+        key = request_key(request_json, stage_version=config.stage_version)
+    if cache is not None:
+        cached_response = cache.get(key)
+        if cached_response is not None:
+            logger.debug("Protect invocation served from cache.")
+            return RawResponse.from_response(cached_response) if raw else cached_response
+    # The cache stores full responses, so we need to build one anyway when caching.
+    send_raw = raw and cache is None
+    adaptive_timeout: Optional[AdaptiveTimeout] = None
+    if isinstance(timeout, AdaptiveTimeout):
+        adaptive_timeout = timeout
+        timeouts = adaptive_timeout.timeouts(request_json)
+        request_json = {**request_json, "timeout": timeouts.timeout}
+        read_timeout = timeouts.read_timeout
+    else:
+        # Set the read timeout to the maximum of the timeout plus the timeout margin.
+        read_timeout = timeout + TIMEOUT_MARGIN
+
+    def send_attempt() -> Awaitable[Union[Response, RawResponse]]:
+        attempt: Awaitable[Union[Response, RawResponse]]
+        # Checked for every attempt, since retries and hedges are sent later.
+        remaining = remaining_time()
+        if remaining is not None:
+            attempt = _asend_before_deadline(
+                remaining, adaptive_timeout, config, request_json, read_timeout, client, send_raw
+            )
+        elif adaptive_timeout is not None:
+            attempt = _asend_observed(adaptive_timeout, config, request_json, read_timeout, client, send_raw)
+        else:
+            attempt = _asend(config, request_json, read_timeout, client, send_raw)
+        if recorder is not None:
+            return _arecord_request(recorder, request_json, attempt)
+        return attempt
+
+    def send_once() -> Awaitable[Union[Response, RawResponse]]:
+        # Every request, including hedges, is rate limited.
+        if scheduler is not None:
+            return scheduler.run(scheduler_key(config, request_json), send_attempt, priority)
+        return send_attempt()
+
+    def send() -> Awaitable[Union[Response, RawResponse]]:
+        if hedge is not None:
+            return hedge.run(send_once)
+        return send_once()
+
+    def call() -> Awaitable[Union[Response, RawResponse]]:
+        if coalesce:
+            # Raw and full results can't be shared, so they're coalesced separately.
+            return _in_flight.run(f"{ResultMode.raw if send_raw else ResultMode.model}:{key}", send)
+        return send()
+
+    response: Union[Response, RawResponse]
+    if circuit_breaker is None:
+        response = await call()
+    else:
+        try:
+            response = await circuit_breaker.run(request_json, call)
+        except CircuitOpenError as error:
+            # Fallback responses aren't cached, they don't come from the backend.
+            fallback = circuit_breaker.fallback(request_json, error)
+            return RawResponse.from_response(fallback) if raw else fallback
+    if isinstance(response, Response):
+        if cache is not None:
+            cache.set(key, response, request_json=request_json)
+        if raw:
+            return RawResponse.from_response(response)
+    return response
+
+
+async def _ainvoke_parallel(invocations: Sequence[Awaitable[Response]]) -> Response:
+    """
+    Run the sub-invocations of prioritized rulesets concurrently, in priority order.
+
+    The response of a sub-invocation is returned once all the higher priority ones were
+    not triggered, like a single request would: the first triggered one, or the first
+    degraded one, e.g. a timeout, whose ruleset could have been triggered. The remaining
+    sub-invocations are then cancelled. An exception is only raised if it comes from a
+    sub-invocation that could still decide the response.
+    """
+    tasks: List[Future] = [ensure_future(invocation) for invocation in invocations]
+    pending: Set[Future] = set(tasks)
+    try:
+        decided = 0
+        while True:
+            while decided < len(tasks) and tasks[decided].done():
+                response = tasks[decided].result()
+                if response.status != ExecutionStatus.not_triggered or decided == len(tasks) - 1:
+                    return response
+                decided += 1
+            _, pending = await wait(pending, return_when=FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # Failures of lower priority rulesets don't matter, mark them as retrieved.
+                task.exception()
 
 
 async def ainvoke(
@@ -19,9 +467,20 @@ async def ainvoke(
     project_name: Optional[str] = None,
     stage_id: Optional[UUID4] = None,
     stage_name: Optional[str] = None,
-    timeout: float = TIMEOUT,
+    timeout: Union[float, AdaptiveTimeout] = TIMEOUT,
     metadata: Optional[Dict[str, str]] = None,
     headers: Optional[Dict[str, str]] = None,
+    cache: Optional[ResponseCache] = None,
+    coalesce: bool = False,
+    client: Optional[ProtectClient] = None,
+    hedge: Optional[HedgePolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    scheduler: Optional[InvocationScheduler] = None,
+    priority: Union[Priority, str] = Priority.interactive,
+    budget: Optional[InvocationBudget] = None,
+    local_metrics: bool = False,
+    preflight: Optional[Preflight] = None,
+    parallel_rulesets: bool = False,
 ) -> Response:
     """
     Asynchronously invoke Protect with the given payload.
@@ -32,6 +491,10 @@ async def ainvoke(
 
     Project ID and stage name, or stage ID should be provided for all invocations.
 
+    Within `protect_deadline`, the timeouts are bounded by the time remaining until the
+    deadline, and `DeadlineExceededError` is raised without sending a request once it
+    has passed.
+
     Parameters
     ----------
     payload : Payload
@@ -47,39 +510,140 @@ async def ainvoke(
         Stage ID to be used for processing, by default None.
     stage_name : Optional[str], optional
         Stage name to be used for processing, by default None.
-    timeout : float, optional
-        Timeout for the request, by default 10 seconds.
+    timeout : Union[float, AdaptiveTimeout], optional
+        Timeout for the request, or an adaptive timeout derived from the observed
+        latency, by default 10 seconds.
     metadata : Optional[Dict[str, str]], optional
         Metadata to be added when responding, by default None.
     headers : Optional[Dict[str, str]], optional
         Headers to be added to the response, by default None.
+    cache : Optional[ResponseCache], optional
+        Cache to serve repeated invocations from, by default None, i.e. no caching.
+    coalesce : bool, optional
+        Share a single in-flight request between concurrent identical invocations, even
+        across threads, by default False.
+    client : Optional[ProtectClient], optional
+        Pooled client to send the request with, by default None, i.e. the API client
+        from the config.
+    hedge : Optional[HedgePolicy], optional
+        Policy to hedge slow requests with, by default None, i.e. no hedging.
+    circuit_breaker : Optional[CircuitBreaker], optional
+        Circuit breaker to reject requests with while the backend is degraded, by default
+        None.
+    scheduler : Optional[InvocationScheduler], optional
+        Scheduler to rate limit and prioritize requests with, by default None.
+    priority : Union[Priority, str], optional
+        Priority class of the invocation for the scheduler, by default
+        `Priority.interactive`.
+    budget : Optional[InvocationBudget], optional
+        Time budget for the invocation, by default None. If it runs out, the budget's
+        fallback response is returned and the request completes in the background.
+    local_metrics : bool, optional
+        Compute the metrics of the prioritized rulesets that have a local provider
+        in-process, and only send the rulesets that need the Protect API, by default
+        False. Invocations decided locally don't send a request, they're still recorded
+        in the invocation metrics.
+    preflight : Optional[Preflight], optional
+        Preflight to drop the prioritized rulesets that can't apply to the payload from
+        the request with, by default None. Invocations where none can apply don't send a
+        request, they're still recorded in the invocation metrics.
+    parallel_rulesets : bool, optional
+        Invoke each prioritized ruleset concurrently, in its own request, by default
+        False. The response of the first triggered ruleset is returned as soon as all the
+        higher priority rulesets have passed, and the other requests are cancelled, so
+        slow metrics of lower priority rulesets don't delay the response. The other
+        options apply to each request.
 
     Returns
     -------
     Response
-        Response from the Protect API.
+        Response from the Protect API, or from the local decision.
     """
     logger.debug("Invoking Protect.")
-    config = ProtectConfig.get()
-    response_json = await config.api_client.arequest(
-        RequestMethod.POST,
-        Routes.invoke,
-        json=Request(
-            payload=payload,
-            rulesets=prioritized_rulesets or [],
-            project_id=project_id or config.project_id,
-            project_name=project_name or config.project_name,
-            stage_name=stage_name or config.stage_name,
-            stage_id=stage_id or config.stage_id,
-            timeout=timeout,
-            metadata=metadata,
-            headers=headers,
-        ).model_dump(mode="json"),
-        # Set the read timeout to the maximum of the timeout plus the timeout margin.
-        read_timeout=timeout + TIMEOUT_MARGIN,
-    )
-    logger.debug("Protect invocation completed.")
-    return Response.model_validate(response_json)
+    call = start_call()
+    invoked_at = monotonic()
+    try:
+        decision: Optional[Response] = None
+        if preflight is not None and prioritized_rulesets:
+            report = preflight.check(payload, prioritized_rulesets)
+            if report.skip:
+                decision = decision_response(payload, None, time_ns(), metadata)
+            else:
+                prioritized_rulesets = report.rulesets
+        if decision is None and local_metrics and prioritized_rulesets:
+            local_decision = decide_locally(payload, prioritized_rulesets, metadata=metadata)
+            if isinstance(local_decision, Response):
+                decision = local_decision
+            else:
+                prioritized_rulesets = local_decision
+        if decision is not None:
+            recorder = get_metrics_recorder()
+            if recorder is not None:
+                # Recorded for the project and stage the request would have been sent to.
+                project, stage = stage_key(
+                    _request_json(
+                        ProtectConfig.get(),
+                        payload=payload,
+                        project_id=project_id,
+                        project_name=project_name,
+                        stage_id=stage_id,
+                        stage_name=stage_name,
+                    )
+                )
+                recorder.record_invocation(project, stage, monotonic() - invoked_at, status=decision.status)
+            return decision
+        started_at = perf_counter_ns() if call is not None else 0
+        config = ProtectConfig.get()
+        if call is not None:
+            started_at = call.add(Phase.config, started_at)
+        ruleset_groups: List[Optional[Sequence[Ruleset]]] = (
+            [[ruleset] for ruleset in prioritized_rulesets]
+            if parallel_rulesets and prioritized_rulesets and len(prioritized_rulesets) > 1
+            else [prioritized_rulesets]
+        )
+        requests_json = [
+            _request_json(
+                config,
+                payload=payload,
+                prioritized_rulesets=rulesets,
+                project_id=project_id,
+                project_name=project_name,
+                stage_id=stage_id,
+                stage_name=stage_name,
+                timeout=timeout,
+                metadata=metadata,
+                headers=headers,
+            )
+            for rulesets in ruleset_groups
+        ]
+        if call is not None:
+            call.add(Phase.request, started_at)
+        invocations = [
+            _ainvoke_request(
+                config,
+                request_json,
+                timeout,
+                cache=cache,
+                coalesce=coalesce,
+                client=client,
+                hedge=hedge,
+                circuit_breaker=circuit_breaker,
+                scheduler=scheduler,
+                priority=priority,
+                budget=budget,
+                # A parallel invocation is recorded once, its requests are recorded each.
+                record=len(requests_json) == 1,
+            )
+            for request_json in requests_json
+        ]
+        if len(invocations) == 1:
+            return await invocations[0]
+        recorder = get_metrics_recorder()
+        if recorder is None:
+            return await _ainvoke_parallel(invocations)
+        return await _arecord_invocation(recorder, requests_json[0], _ainvoke_parallel(invocations))
+    finally:
+        end_call(call)
 
 
 def invoke(
@@ -89,9 +653,20 @@ def invoke(
     project_name: Optional[str] = None,
     stage_id: Optional[UUID4] = None,
     stage_name: Optional[str] = None,
-    timeout: float = TIMEOUT,
+    timeout: Union[float, AdaptiveTimeout] = TIMEOUT,
     metadata: Optional[Dict[str, str]] = None,
     headers: Optional[Dict[str, str]] = None,
+    cache: Optional[ResponseCache] = None,
+    coalesce: bool = False,
+    client: Optional[ProtectClient] = None,
+    hedge: Optional[HedgePolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    scheduler: Optional[InvocationScheduler] = None,
+    priority: Union[Priority, str] = Priority.interactive,
+    budget: Optional[InvocationBudget] = None,
+    local_metrics: bool = False,
+    preflight: Optional[Preflight] = None,
+    parallel_rulesets: bool = False,
 ) -> Response:
     """
     Invoke Protect with the given payload.
@@ -102,6 +677,10 @@ def invoke(
 
     Project ID and stage name, or stage ID should be provided for all invocations.
 
+    Within `protect_deadline`, the timeouts are bounded by the time remaining until the
+    deadline, and `DeadlineExceededError` is raised without sending a request once it
+    has passed.
+
     Parameters
     ----------
     payload : Payload
@@ -117,17 +696,54 @@ def invoke(
         Stage ID to be used for processing, by default None.
     stage_name : Optional[str], optional
         Stage name to be used for processing, by default None.
-    timeout : float, optional
-        Timeout for the request, by default 10 seconds.
+    timeout : Union[float, AdaptiveTimeout], optional
+        Timeout for the request, or an adaptive timeout derived from the observed
+        latency, by default 10 seconds.
     metadata : Optional[Dict[str, str]], optional
         Metadata to be added when responding, by default None.
     headers : Optional[Dict[str, str]], optional
         Headers to be added to the response, by default None.
+    cache : Optional[ResponseCache], optional
+        Cache to serve repeated invocations from, by default None, i.e. no caching.
+    coalesce : bool, optional
+        Share a single in-flight request between concurrent identical invocations, even
+        across threads, by default False.
+    client : Optional[ProtectClient], optional
+        Pooled client to send the request with, by default None, i.e. the API client
+        from the config.
+    hedge : Optional[HedgePolicy], optional
+        Policy to hedge slow requests with, by default None, i.e. no hedging.
+    circuit_breaker : Optional[CircuitBreaker], optional
+        Circuit breaker to reject requests with while the backend is degraded, by default
+        None.
+    scheduler : Optional[InvocationScheduler], optional
+        Scheduler to rate limit and prioritize requests with, by default None.
+    priority : Union[Priority, str], optional
+        Priority class of the invocation for the scheduler, by default
+        `Priority.interactive`.
+    budget : Optional[InvocationBudget], optional
+        Time budget for the invocation, by default None. If it runs out, the budget's
+        fallback response is returned and the request completes in the background.
+    local_metrics : bool, optional
+        Compute the metrics of the prioritized rulesets that have a local provider
+        in-process, and only send the rulesets that need the Protect API, by default
+        False. Invocations decided locally don't send a request, they're still recorded
+        in the invocation metrics.
+    preflight : Optional[Preflight], optional
+        Preflight to drop the prioritized rulesets that can't apply to the payload from
+        the request with, by default None. Invocations where none can apply don't send a
+        request, they're still recorded in the invocation metrics.
+    parallel_rulesets : bool, optional
+        Invoke each prioritized ruleset concurrently, in its own request, by default
+        False. The response of the first triggered ruleset is returned as soon as all the
+        higher priority rulesets have passed, and the other requests are cancelled, so
+        slow metrics of lower priority rulesets don't delay the response. The other
+        options apply to each request.
 
     Returns
     -------
     Response
-        Response from the Protect API.
+        Response from the Protect API, or from the local decision.
     """
     return async_run(
         ainvoke(
@@ -140,5 +756,238 @@ def invoke(
             timeout=timeout,
             metadata=metadata,
             headers=headers,
+            cache=cache,
+            coalesce=coalesce,
+            client=client,
+            hedge=hedge,
+            circuit_breaker=circuit_breaker,
+            scheduler=scheduler,
+            priority=priority,
+            budget=budget,
+            local_metrics=local_metrics,
+            preflight=preflight,
+            parallel_rulesets=parallel_rulesets,
+        )
+    )
+
+
+async def ainvoke_many(
+    payloads: Iterable[Payload],
+    prioritized_rulesets: Optional[Sequence[Ruleset]] = None,
+    project_id: Optional[UUID4] = None,
+    project_name: Optional[str] = None,
+    stage_id: Optional[UUID4] = None,
+    stage_name: Optional[str] = None,
+    timeout: Union[float, AdaptiveTimeout] = TIMEOUT,
+    metadata: Optional[Dict[str, str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    cache: Optional[ResponseCache] = None,
+    coalesce: bool = False,
+    client: Optional[ProtectClient] = None,
+    hedge: Optional[HedgePolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    scheduler: Optional[InvocationScheduler] = None,
+    priority: Union[Priority, str] = Priority.batch,
+) -> List[Union[Response, Exception]]:
+    """
+    Asynchronously invoke Protect with multiple payloads.
+
+    All payloads share the same project, stage and rulesets. The invocations are run
+    concurrently on the same event loop (and hence the same connection pool), with at
+    most `max_concurrency` requests in flight at any time.
+
+    A failure for one payload does not fail the whole batch. Instead, the exception
+    raised for that payload is returned in its position in the results.
+
+    Parameters
+    ----------
+    payloads : Iterable[Payload]
+        Payloads to be processed.
+    prioritized_rulesets : Optional[Sequence[Ruleset]], optional
+        Prioritized rulesets to be used for processing. These should only be provided if
+        using a local stage, by default None, i.e. empty list.
+    project_id : Optional[UUID4], optional
+        Project ID to be used for processing, by default None.
+    project_name : Optional[str], optional
+        Project name to be used for processing, by default None.
+    stage_id : Optional[UUID4], optional
+        Stage ID to be used for processing, by default None.
+    stage_name : Optional[str], optional
+        Stage name to be used for processing, by default None.
+    timeout : Union[float, AdaptiveTimeout], optional
+        Timeout for each request, or an adaptive timeout derived from the observed
+        latency, by default 10 seconds.
+    metadata : Optional[Dict[str, str]], optional
+        Metadata to be added when responding, by default None.
+    headers : Optional[Dict[str, str]], optional
+        Headers to be added to the response, by default None.
+    max_concurrency : int, optional
+        Maximum number of concurrent requests, by default 16.
+    cache : Optional[ResponseCache], optional
+        Cache to serve repeated invocations from, by default None, i.e. no caching.
+    coalesce : bool, optional
+        Share a single in-flight request between concurrent identical invocations, even
+        across threads, by default False.
+    client : Optional[ProtectClient], optional
+        Pooled client to send the request with, by default None, i.e. the API client
+        from the config.
+    hedge : Optional[HedgePolicy], optional
+        Policy to hedge slow requests with, by default None, i.e. no hedging.
+    circuit_breaker : Optional[CircuitBreaker], optional
+        Circuit breaker to reject requests with while the backend is degraded, by default
+        None.
+    scheduler : Optional[InvocationScheduler], optional
+        Scheduler to rate limit and prioritize requests with, by default None.
+    priority : Union[Priority, str], optional
+        Priority class of the invocations for the scheduler, by default `Priority.batch`.
+
+    Returns
+    -------
+    List[Union[Response, Exception]]
+        Responses from the Protect API, or the exception raised for that payload, in the
+        same order as the input payloads.
+
+    Raises
+    ------
+    ValueError
+        If `max_concurrency` is less than 1.
+    """
+    if max_concurrency < 1:
+        raise ValueError("Max concurrency must be at least 1.")
+    semaphore = Semaphore(max_concurrency)
+
+    async def invoke_one(payload: Payload) -> Union[Response, Exception]:
+        async with semaphore:
+            try:
+                return await ainvoke(
+                    payload=payload,
+                    prioritized_rulesets=prioritized_rulesets,
+                    project_id=project_id,
+                    project_name=project_name,
+                    stage_id=stage_id,
+                    stage_name=stage_name,
+                    timeout=timeout,
+                    metadata=metadata,
+                    headers=headers,
+                    cache=cache,
+                    coalesce=coalesce,
+                    client=client,
+                    hedge=hedge,
+                    circuit_breaker=circuit_breaker,
+                    scheduler=scheduler,
+                    priority=priority,
+                )
+            except Exception as exc:
+                logger.debug(f"Protect invocation failed with {exc!r}.")
+                return exc
+
+    logger.debug("Invoking Protect for multiple payloads.")
+    responses = await gather(*[invoke_one(payload) for payload in payloads])
+    logger.debug("Protect invocations completed.")
+    return list(responses)
+
+
+def invoke_many(
+    payloads: Iterable[Payload],
+    prioritized_rulesets: Optional[Sequence[Ruleset]] = None,
+    project_id: Optional[UUID4] = None,
+    project_name: Optional[str] = None,
+    stage_id: Optional[UUID4] = None,
+    stage_name: Optional[str] = None,
+    timeout: Union[float, AdaptiveTimeout] = TIMEOUT,
+    metadata: Optional[Dict[str, str]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    cache: Optional[ResponseCache] = None,
+    coalesce: bool = False,
+    client: Optional[ProtectClient] = None,
+    hedge: Optional[HedgePolicy] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    scheduler: Optional[InvocationScheduler] = None,
+    priority: Union[Priority, str] = Priority.batch,
+) -> List[Union[Response, Exception]]:
+    """
+    Invoke Protect with multiple payloads.
+
+    All payloads share the same project, stage and rulesets. The invocations are run
+    concurrently on a single event loop (and hence the same connection pool), with at
+    most `max_concurrency` requests in flight at any time.
+
+    A failure for one payload does not fail the whole batch. Instead, the exception
+    raised for that payload is returned in its position in the results.
+
+    Parameters
+    ----------
+    payloads : Iterable[Payload]
+        Payloads to be processed.
+    prioritized_rulesets : Optional[Sequence[Ruleset]], optional
+        Prioritized rulesets to be used for processing. These should only be provided if
+        using a local stage, by default None, i.e. empty list.
+    project_id : Optional[UUID4], optional
+        Project ID to be used for processing, by default None.
+    project_name : Optional[str], optional
+        Project name to be used for processing, by default None.
+    stage_id : Optional[UUID4], optional
+        Stage ID to be used for processing, by default None.
+    stage_name : Optional[str], optional
+        Stage name to be used for processing, by default None.
+    timeout : Union[float, AdaptiveTimeout], optional
+        Timeout for each request, or an adaptive timeout derived from the observed
+        latency, by default 10 seconds.
+    metadata : Optional[Dict[str, str]], optional
+        Metadata to be added when responding, by default None.
+    headers : Optional[Dict[str, str]], optional
+        Headers to be added to the response, by default None.
+    max_concurrency : int, optional
+        Maximum number of concurrent requests, by default 16.
+    cache : Optional[ResponseCache], optional
+        Cache to serve repeated invocations from, by default None, i.e. no caching.
+    coalesce : bool, optional
+        Share a single in-flight request between concurrent identical invocations, even
+        across threads, by default False.
+    client : Optional[ProtectClient], optional
+        Pooled client to send the request with, by default None, i.e. the API client
+        from the config.
+    hedge : Optional[HedgePolicy], optional
+        Policy to hedge slow requests with, by default None, i.e. no hedging.
+    circuit_breaker : Optional[CircuitBreaker], optional
+        Circuit breaker to reject requests with while the backend is degraded, by default
+        None.
+    scheduler : Optional[InvocationScheduler], optional
+        Scheduler to rate limit and prioritize requests with, by default None.
+    priority : Union[Priority, str], optional
+        Priority class of the invocations for the scheduler, by default `Priority.batch`.
+
+    Returns
+    -------
+    List[Union[Response, Exception]]
+        Responses from the Protect API, or the exception raised for that payload, in the
+        same order as the input payloads.
+
+    Raises
+    ------
+    ValueError
+        If `max_concurrency` is less than 1.
+    """
+    return async_run(
+        ainvoke_many(
+            payloads=payloads,
+            prioritized_rulesets=prioritized_rulesets,
+            project_id=project_id,
+            project_name=project_name,
+            stage_id=stage_id,
+            stage_name=stage_name,
+            timeout=timeout,
+            metadata=metadata,
+            headers=headers,
+            max_concurrency=max_concurrency,
+            cache=cache,
+            coalesce=coalesce,
+            client=client,
+            hedge=hedge,
+            circuit_breaker=circuit_breaker,
+            scheduler=scheduler,
+            priority=priority,
         )
     )
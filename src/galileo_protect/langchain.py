@@ -1,14 +1,17 @@
-from typing import Optional, Sequence, Type
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple, Type, Union
 
 from langchain_core.runnables.base import Runnable
+from langchain_core.runnables.config import RunnableConfig, get_config_list
 from langchain_core.tools import BaseTool
 from pydantic import UUID4, BaseModel, ConfigDict, Field
 from pydantic.v1 import BaseModel as BaseModelV1
 
 from galileo_core.schemas.protect.execution_status import ExecutionStatus
 from galileo_core.schemas.protect.response import Response
-from galileo_protect.constants.invoke import TIMEOUT
-from galileo_protect.invocation import ainvoke, invoke
+from galileo_protect.client import ProtectClient
+from galileo_protect.constants.invoke import MAX_CONCURRENCY, TIMEOUT
+from galileo_protect.invocation import ainvoke, ainvoke_many, invoke, invoke_many
+from galileo_protect.scheduler import InvocationScheduler, Priority
 from galileo_protect.schemas import Payload, Ruleset
 
 
@@ -34,6 +37,9 @@ class ProtectTool(BaseTool):
     stage_name: Optional[str] = None
     stage_id: Optional[UUID4] = None
     timeout: float = TIMEOUT
+    client: Optional[ProtectClient] = None
+    scheduler: Optional[InvocationScheduler] = None
+    priority: Priority = Priority.interactive
 
     def _run(self, input: Optional[str] = None, output: Optional[str] = None) -> str:
         """
@@ -51,6 +57,9 @@ class ProtectTool(BaseTool):
             stage_name=self.stage_name,
             stage_id=self.stage_id,
             timeout=self.timeout,
+            client=self.client,
+            scheduler=self.scheduler,
+            priority=self.priority,
         ).model_dump_json()
 
     async def _arun(self, input: Optional[str] = None, output: Optional[str] = None) -> str:
@@ -65,12 +74,127 @@ class ProtectTool(BaseTool):
             prioritized_rulesets=self.prioritized_rulesets,
             payload=payload,
             project_id=self.project_id,
+            project_name=self.project_name,
             stage_name=self.stage_name,
             stage_id=self.stage_id,
             timeout=self.timeout,
+            client=self.client,
+            scheduler=self.scheduler,
+            priority=self.priority,
         )
         return response.model_dump_json()
 
+    def _batch_payloads(
+        self, inputs: List[Any], config: Optional[Union[RunnableConfig, List[RunnableConfig]]]
+    ) -> Optional[Tuple[List[Union[Payload, Exception]], int]]:
+        """
+        Get the payloads and concurrency for a native batch.
+
+        Returns None if the batch needs LangChain's per-item execution instead, i.e. if
+        any of the inputs is a tool call or callbacks are configured, since those are
+        handled per item by `BaseTool.run`.
+        """
+        configs = get_config_list(config, len(inputs))
+        if any(c.get("callbacks") for c in configs):
+            return None
+        payloads: List[Union[Payload, Exception]] = []
+        for tool_input in inputs:
+            if isinstance(tool_input, dict) and tool_input.get("type") == "tool_call":
+                return None
+            try:
+                if isinstance(tool_input, str):
+                    payloads.append(Payload(input=tool_input))
+                else:
+                    payloads.append(Payload(**PayloadV1.parse_obj(tool_input).dict()))
+            except Exception as exception:
+                payloads.append(exception)
+        max_concurrency = configs[0].get("max_concurrency") if configs else None
+        return payloads, max_concurrency or MAX_CONCURRENCY
+
+    @staticmethod
+    def _batch_outputs(
+        payloads: List[Union[Payload, Exception]],
+        responses: List[Union[Response, Exception]],
+        return_exceptions: bool,
+    ) -> List[Any]:
+        results = iter(responses)
+        outputs: List[Any] = []
+        for payload in payloads:
+            result = payload if isinstance(payload, Exception) else next(results)
+            if isinstance(result, Exception):
+                if not return_exceptions:
+                    raise result
+                outputs.append(result)
+            else:
+                outputs.append(result.model_dump_json())
+        return outputs
+
+    def batch(
+        self,
+        inputs: List[Any],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Optional[Any],
+    ) -> List[Any]:
+        """
+        Apply the tool to multiple inputs, with bounded concurrency.
+
+        All payloads are sent concurrently, at most `max_concurrency` from the config at a
+        time, instead of one at a time.
+        """
+        batch = self._batch_payloads(inputs, config)
+        if batch is None:
+            return super().batch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+        payloads, max_concurrency = batch
+        responses = invoke_many(
+            [payload for payload in payloads if isinstance(payload, Payload)],
+            prioritized_rulesets=self.prioritized_rulesets,
+            project_id=self.project_id,
+            project_name=self.project_name,
+            stage_name=self.stage_name,
+            stage_id=self.stage_id,
+            timeout=self.timeout,
+            max_concurrency=max_concurrency,
+            client=self.client,
+            scheduler=self.scheduler,
+            priority=self.priority,
+        )
+        return self._batch_outputs(payloads, responses, return_exceptions)
+
+    async def abatch(
+        self,
+        inputs: List[Any],
+        config: Optional[Union[RunnableConfig, List[RunnableConfig]]] = None,
+        *,
+        return_exceptions: bool = False,
+        **kwargs: Optional[Any],
+    ) -> List[Any]:
+        """
+        Apply the tool to multiple inputs asynchronously, with bounded concurrency.
+
+        All payloads are sent concurrently, at most `max_concurrency` from the config at a
+        time, instead of one at a time.
+        """
+        batch = self._batch_payloads(inputs, config)
+        if batch is None:
+            return await super().abatch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+        payloads, max_concurrency = batch
+        responses = await ainvoke_many(
+            [payload for payload in payloads if isinstance(payload, Payload)],
+            prioritized_rulesets=self.prioritized_rulesets,
+            project_id=self.project_id,
+            project_name=self.project_name,
+            stage_name=self.stage_name,
+            stage_id=self.stage_id,
+            timeout=self.timeout,
+            max_concurrency=max_concurrency,
+            client=self.client,
+            scheduler=self.scheduler,
+            priority=self.priority,
+        )
+        return self._batch_outputs(payloads, responses, return_exceptions)
+
 
 class ProtectParser(BaseModel):
     chain: Runnable = Field(..., description="The chain to trigger if the Protect invocation is not triggered.")
@@ -82,15 +206,40 @@ class ProtectParser(BaseModel):
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    def parser(self, response_raw_json: str) -> str:
+    def _route(self, response_raw_json: str) -> Tuple[str, bool]:
+        """Get the text to return or pass on, and whether to pass it on to the chain."""
         try:
             response = Response.model_validate_json(response_raw_json)
         except Exception:
-            return self.chain.invoke(response_raw_json)
+            return response_raw_json, True
         text = response.text
         if self.echo_output:
             print(f"> Raw response: {text}")
-        if response.status == ExecutionStatus.triggered and not self.ignore_trigger:
-            return text
-        else:
+        return text, response.status != ExecutionStatus.triggered or self.ignore_trigger
+
+    def parser(self, response_raw_json: str) -> str:
+        text, run_chain = self._route(response_raw_json)
+        if run_chain:
             return self.chain.invoke(text)
+        return text
+
+    async def aparser(self, response_raw_json: str) -> str:
+        """Asynchronous version of `parser`, that awaits the chain."""
+        text, run_chain = self._route(response_raw_json)
+        if run_chain:
+            return await self.chain.ainvoke(text)
+        return text
+
+    async def astream(self, response_raw_json: str) -> AsyncIterator[Any]:
+        """
+        Stream the output of the chain.
+
+        If the Protect invocation was triggered, the response text is yielded as the only
+        chunk instead.
+        """
+        text, run_chain = self._route(response_raw_json)
+        if run_chain:
+            async for chunk in self.chain.astream(text):
+                yield chunk
+        else:
+            yield text
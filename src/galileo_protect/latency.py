@@ -0,0 +1,72 @@
+from collections import deque
+from math import ceil
+from threading import Lock
+from typing import Deque, List, Optional
+
+from galileo_protect.constants.latency import MIN_SAMPLES, WINDOW_SAMPLES
+
+
+class LatencyWindow:
+    """
+    Sliding window of the most recent latency samples, for estimating percentiles.
+
+    It is safe to share across threads and event loops. Percentiles are computed on a
+    sorted snapshot of the window, which is only refreshed once enough new samples have
+    been added, so that estimating a percentile on every request stays cheap.
+
+    Parameters
+    ----------
+    max_samples : int, optional
+        Number of most recent samples to keep, by default 1024.
+    min_samples : int, optional
+        Minimum number of samples before percentiles are estimated, by default 20.
+    """
+
+    def __init__(self, max_samples: int = WINDOW_SAMPLES, min_samples: int = MIN_SAMPLES) -> None:
+        if max_samples < 1:
+            raise ValueError("Max samples must be at least 1.")
+        self.min_samples = min_samples
+        self._lock = Lock()
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self._sorted: List[float] = []
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float) -> None:
+        """Add a latency sample, in seconds."""
+        with self._lock:
+            self._samples.append(seconds)
+            self._stale += 1
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Estimate a latency percentile.
+
+        Parameters
+        ----------
+        percentile : float
+            Percentile to estimate, between 0 and 100.
+
+        Returns
+        -------
+        Optional[float]
+            Latency in seconds, or None if there are fewer than `min_samples` samples.
+        """
+        with self._lock:
+            if len(self._samples) < max(self.min_samples, 1):
+                return None
+            # Refresh the snapshot once ~3% of the window is new.
+            if not self._sorted or self._stale > len(self._samples) // 32:
+                self._sorted = sorted(self._samples)
+                self._stale = 0
+            samples = self._sorted
+        rank = ceil(percentile / 100 * len(samples))
+        return samples[min(max(rank - 1, 0), len(samples) - 1)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._sorted = []
+            self._stale = 0
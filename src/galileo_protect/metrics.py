@@ -0,0 +1,320 @@
+from bisect import bisect_left
+from threading import Lock
+from time import time_ns
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from galileo_core.helpers.dependencies import is_dependency_available
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_protect.constants.metrics import (
+    INVOKE_SPAN_NAME,
+    LATENCY_BUCKETS,
+    METRIC_PREFIX,
+    REQUEST_SPAN_NAME,
+    TRACER_NAME,
+)
+
+# Status label for invocations that raised instead of returning a response.
+EXCEPTION_STATUS = "exception"
+
+
+class MetricsRecorder:
+    """
+    Interface for recording invocation metrics.
+
+    Two kinds of events are recorded: invocations, from the caller's point of view, and
+    the requests they send to the Protect API. An invocation can be served without a
+    request, e.g. from the cache or a fallback, or send more than one, e.g. retries and
+    hedges. Comparing both latencies shows the time spent in the client, e.g. queueing
+    in the scheduler, and comparing the request latency with the server execution time
+    shows the time spent on the network and queueing on the server.
+
+    Both methods are no-ops, so recorders only need to override the events they use.
+    They're called on the event loop sending the requests, so they shouldn't block.
+    """
+
+    def record_invocation(
+        self,
+        project: str,
+        stage: str,
+        latency: float,
+        status: Optional[ExecutionStatus] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Record a completed invocation.
+
+        Parameters
+        ----------
+        project : str
+            Project ID or name.
+        stage : str
+            Stage ID or name.
+        latency : float
+            Total latency of the invocation, in seconds.
+        status : Optional[ExecutionStatus], optional
+            Status of the response, by default None if the invocation raised.
+        error : Optional[BaseException], optional
+            Exception raised by the invocation, by default None.
+        """
+
+    def record_request(self, project: str, stage: str, latency: float, execution_time: Optional[float]) -> None:
+        """
+        Record a successful request to the Protect API.
+
+        Parameters
+        ----------
+        project : str
+            Project ID or name.
+        stage : str
+            Stage ID or name.
+        latency : float
+            Round-trip latency of the request, in seconds.
+        execution_time : Optional[float]
+            Server execution time from the response's trace metadata, in seconds, or
+            None if unknown.
+        """
+
+
+class CompositeRecorder(MetricsRecorder):
+    """Record metrics to several recorders, e.g. Prometheus and OpenTelemetry."""
+
+    def __init__(self, *recorders: MetricsRecorder) -> None:
+        self.recorders = recorders
+
+    def record_invocation(
+        self,
+        project: str,
+        stage: str,
+        latency: float,
+        status: Optional[ExecutionStatus] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        for recorder in self.recorders:
+            recorder.record_invocation(project, stage, latency, status=status, error=error)
+
+    def record_request(self, project: str, stage: str, latency: float, execution_time: Optional[float]) -> None:
+        for recorder in self.recorders:
+            recorder.record_request(project, stage, latency, execution_time)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        # Non-cumulative counts, the last one is for the `+Inf` bucket.
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+_HISTOGRAM_DESCRIPTIONS = {
+    "invocation_latency_seconds": "Total latency of Protect invocations, in seconds.",
+    "request_latency_seconds": "Round-trip latency of Protect API requests, in seconds.",
+    "execution_time_seconds": "Server execution time of Protect API requests, in seconds.",
+    "overhead_seconds": "Network and server queueing time of Protect API requests, in seconds.",
+}
+
+
+class PrometheusRecorder(MetricsRecorder):
+    """
+    Aggregate invocation metrics in memory, and render them in the Prometheus text format.
+
+    All metrics are labeled by project and stage:
+
+    - `galileo_protect_invocations_total`, by response status, or `exception`.
+    - `galileo_protect_invocation_errors_total`, by exception class.
+    - `galileo_protect_invocation_latency_seconds`, total latency seen by the caller.
+    - `galileo_protect_request_latency_seconds`, round-trip latency of API requests.
+    - `galileo_protect_execution_time_seconds`, server execution time.
+    - `galileo_protect_overhead_seconds`, request latency minus server execution time,
+      i.e. network and server queueing.
+
+    `render` can be served from a metrics endpoint, or its output appended to the one
+    of another registry.
+
+    Parameters
+    ----------
+    buckets : Sequence[float], optional
+        Upper bounds of the latency histogram buckets, in seconds, by default from 5ms to
+        10s.
+
+    Raises
+    ------
+    ValueError
+        If the buckets aren't sorted.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        if list(buckets) != sorted(buckets):
+            raise ValueError("Histogram buckets must be sorted.")
+        self.buckets = tuple(buckets)
+        self._lock = Lock()
+        self._invocations: Dict[Tuple[str, str, str], int] = dict()
+        self._errors: Dict[Tuple[str, str, str], int] = dict()
+        self._histograms: Dict[str, Dict[Tuple[str, str], _Histogram]] = {
+            "invocation_latency_seconds": dict(),
+            "request_latency_seconds": dict(),
+            "execution_time_seconds": dict(),
+            "overhead_seconds": dict(),
+        }
+
+    def _observe(self, name: str, key: Tuple[str, str], value: float) -> None:
+        histograms = self._histograms[name]
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = _Histogram(self.buckets)
+        histogram.observe(value)
+
+    def record_invocation(
+        self,
+        project: str,
+        stage: str,
+        latency: float,
+        status: Optional[ExecutionStatus] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        status_label = status.value if status is not None else EXCEPTION_STATUS
+        with self._lock:
+            key = (project, stage, status_label)
+            self._invocations[key] = self._invocations.get(key, 0) + 1
+            if error is not None:
+                key = (project, stage, type(error).__name__)
+                self._errors[key] = self._errors.get(key, 0) + 1
+            self._observe("invocation_latency_seconds", (project, stage), latency)
+
+    def record_request(self, project: str, stage: str, latency: float, execution_time: Optional[float]) -> None:
+        with self._lock:
+            self._observe("request_latency_seconds", (project, stage), latency)
+            if execution_time is not None:
+                self._observe("execution_time_seconds", (project, stage), execution_time)
+                # Clock skew between the client and the server can't make this negative.
+                self._observe("overhead_seconds", (project, stage), max(latency - execution_time, 0.0))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._invocations.clear()
+            self._errors.clear()
+            for histograms in self._histograms.values():
+                histograms.clear()
+
+    def render(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines: List[str] = list()
+        with self._lock:
+            for name, description, counters, label in (
+                ("invocations_total", "Number of Protect invocations.", self._invocations, "status"),
+                ("invocation_errors_total", "Number of failed Protect invocations.", self._errors, "error"),
+            ):
+                metric = f"{METRIC_PREFIX}_{name}"
+                lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+                for (project, stage, value), count in counters.items():
+                    lines.append(f"{metric}{_labels(project=project, stage=stage, **{label: value})} {count}")
+            for name, histograms in self._histograms.items():
+                metric = f"{METRIC_PREFIX}_{name}"
+                lines += [f"# HELP {metric} {_HISTOGRAM_DESCRIPTIONS[name]}", f"# TYPE {metric} histogram"]
+                for (project, stage), histogram in histograms.items():
+                    cumulative = 0
+                    for bound, count in zip((*self.buckets, "+Inf"), histogram.counts):
+                        cumulative += count
+                        labels = _labels(project=project, stage=stage, le=str(bound))
+                        lines.append(f"{metric}_bucket{labels} {cumulative}")
+                    labels = _labels(project=project, stage=stage)
+                    lines.append(f"{metric}_sum{labels} {histogram.sum}")
+                    lines.append(f"{metric}_count{labels} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryRecorder(MetricsRecorder):
+    """
+    Record invocations and API requests as OpenTelemetry spans.
+
+    Spans are recorded once the invocation or request completes, with their actual start
+    and end times, as children of the span that is current in the caller's context.
+
+    Parameters
+    ----------
+    tracer_provider : Optional[Any], optional
+        Tracer provider to get the tracer from, by default None, i.e. the global one.
+
+    Raises
+    ------
+    ImportError
+        If the `opentelemetry-api` package isn't installed.
+    """
+
+    def __init__(self, tracer_provider: Optional[Any] = None) -> None:
+        if not is_dependency_available("opentelemetry"):
+            raise ImportError(
+                "OpenTelemetry spans require the `opentelemetry-api` package, install it with "
+                "`pip install opentelemetry-api`."
+            )
+        from opentelemetry import trace  # type: ignore[import-not-found]
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(TRACER_NAME, tracer_provider=tracer_provider)
+
+    def _span(self, name: str, latency: float, attributes: Dict[str, Any], error: Optional[BaseException]) -> None:
+        end_time = time_ns()
+        span = self._tracer.start_span(name, start_time=end_time - int(latency * 1e9), attributes=attributes)
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, str(error)))
+        span.end(end_time=end_time)
+
+    def record_invocation(
+        self,
+        project: str,
+        stage: str,
+        latency: float,
+        status: Optional[ExecutionStatus] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        attributes = {
+            "galileo_protect.project": project,
+            "galileo_protect.stage": stage,
+            "galileo_protect.status": status.value if status is not None else EXCEPTION_STATUS,
+        }
+        self._span(INVOKE_SPAN_NAME, latency, attributes, error)
+
+    def record_request(self, project: str, stage: str, latency: float, execution_time: Optional[float]) -> None:
+        attributes: Dict[str, Any] = {"galileo_protect.project": project, "galileo_protect.stage": stage}
+        if execution_time is not None:
+            attributes["galileo_protect.execution_time"] = execution_time
+            attributes["galileo_protect.overhead"] = max(latency - execution_time, 0.0)
+        self._span(REQUEST_SPAN_NAME, latency, attributes, None)
+
+
+# Recorder for all invocations in this process, None when metrics are disabled.
+_recorder: Optional[MetricsRecorder] = None
+
+
+def set_metrics_recorder(recorder: Optional[MetricsRecorder]) -> None:
+    """
+    Set the recorder for the metrics of all invocations in this process.
+
+    Parameters
+    ----------
+    recorder : Optional[MetricsRecorder]
+        Recorder to use, or None to disable metrics, which is the default.
+    """
+    global _recorder
+    _recorder = recorder
+
+
+def get_metrics_recorder() -> Optional[MetricsRecorder]:
+    """Get the recorder for the metrics of all invocations, if metrics are enabled."""
+    return _recorder
@@ -0,0 +1,134 @@
+from threading import Lock
+from typing import Any, Callable, List, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from galileo_core.helpers.logger import logger
+from galileo_core.schemas.protect.payload import Payload
+from galileo_core.schemas.protect.ruleset import Ruleset
+from galileo_protect.constants.preflight import INPUT_METRICS, INPUT_PREFIX, OUTPUT_METRICS
+
+
+def metric_field(metric: str) -> Optional[str]:
+    """
+    Get the payload field a metric is computed on.
+
+    Parameters
+    ----------
+    metric : str
+        Name of the metric.
+
+    Returns
+    -------
+    Optional[str]
+        `input` for `input_*` metrics and `prompt_injection`, `output` for the other
+        built-in metrics, or None for unknown metrics.
+    """
+    if metric.startswith(INPUT_PREFIX) or metric in INPUT_METRICS:
+        return "input"
+    if metric in OUTPUT_METRICS:
+        return "output"
+    return None
+
+
+class PrunedRuleset(BaseModel):
+    index: int = Field(description="Index of the ruleset in the prioritized rulesets.")
+    missing_fields: List[str] = Field(description="Payload fields needed by the ruleset's metrics that are missing.")
+
+
+class PreflightReport(BaseModel):
+    rulesets: List[Ruleset] = Field(description="Rulesets that can apply to the payload, in priority order.")
+    pruned: List[PrunedRuleset] = Field(default_factory=list, description="Rulesets that can't apply to the payload.")
+
+    @property
+    def skip(self) -> bool:
+        """Whether no ruleset can apply, so the invocation doesn't need a request."""
+        return not self.rulesets and bool(self.pruned)
+
+
+class PreflightStats(BaseModel):
+    invocations: int = Field(default=0, description="Number of invocations checked.")
+    skipped: int = Field(default=0, description="Number of invocations answered without a request.")
+    pruned_rulesets: int = Field(default=0, description="Number of rulesets dropped from requests.")
+
+
+class Preflight:
+    """
+    Check which prioritized rulesets can apply to a payload before invoking Protect.
+
+    A ruleset is triggered only when all of its rules are met, and a rule on a metric
+    that can't be computed is never met. `input_*` metrics and `prompt_injection` need
+    the payload's input, the other built-in metrics need its output, so a ruleset with a
+    rule on a metric whose field is missing can't apply. Such rulesets are dropped from
+    the request, and if none is left, the invocation is answered with a `not_triggered`
+    response without a round trip, e.g. output checks on a payload with only an input.
+
+    Rules on unknown metrics are assumed to apply. Invocations without prioritized
+    rulesets use the rulesets of their stage, which are only known to the server, so
+    they're always sent.
+
+    The same preflight can be shared by all invocations it applies to, it is safe to
+    share across threads.
+
+    Parameters
+    ----------
+    on_prune : Optional[Callable[[PreflightReport], Any]], optional
+        Callback for the reports of the invocations where rulesets were pruned, by
+        default None, i.e. the decisions are only logged.
+    """
+
+    def __init__(self, on_prune: Optional[Callable[[PreflightReport], Any]] = None) -> None:
+        self.on_prune = on_prune
+        self._lock = Lock()
+        self._stats = PreflightStats()
+
+    @property
+    def stats(self) -> PreflightStats:
+        with self._lock:
+            return self._stats.model_copy()
+
+    def check(self, payload: Payload, rulesets: Sequence[Ruleset]) -> PreflightReport:
+        """
+        Check which rulesets can apply to a payload.
+
+        Parameters
+        ----------
+        payload : Payload
+            Payload to invoke Protect with.
+        rulesets : Sequence[Ruleset]
+            Prioritized rulesets of the invocation.
+
+        Returns
+        -------
+        PreflightReport
+            Rulesets that can apply, and the ones that were pruned with the reason.
+        """
+        report = PreflightReport(rulesets=list())
+        for index, ruleset in enumerate(rulesets):
+            missing_fields = sorted(
+                {
+                    field
+                    for field in (metric_field(rule.metric) for rule in ruleset.rules)
+                    if field is not None and getattr(payload, field) is None
+                }
+            )
+            if missing_fields:
+                report.pruned.append(PrunedRuleset(index=index, missing_fields=missing_fields))
+            else:
+                report.rulesets.append(ruleset)
+        with self._lock:
+            self._stats.invocations += 1
+            self._stats.skipped += report.skip
+            self._stats.pruned_rulesets += len(report.pruned)
+        if report.pruned:
+            logger.debug(
+                f"Preflight pruned {len(report.pruned)} of {len(rulesets)} rulesets: "
+                + ", ".join(f"#{pruned.index} needs {'/'.join(pruned.missing_fields)}" for pruned in report.pruned)
+                + "."
+            )
+            if self.on_prune is not None:
+                try:
+                    self.on_prune(report)
+                except Exception as error:
+                    logger.warning(f"Preflight callback failed: {error!r}")
+        return report
@@ -0,0 +1,228 @@
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from enum import Enum
+from math import ceil
+from time import perf_counter_ns
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from pydantic import BaseModel, Field
+
+from galileo_protect.constants.profiling import MAX_CALLS
+
+
+class Phase(str, Enum):
+    # Getting the global config, `ProtectConfig.get()`.
+    config = "config"
+    # Building and serializing the request.
+    request = "request"
+    # Getting the API client, which validates and refreshes the JWT if needed.
+    auth = "auth"
+    # Connecting, if needed, and sending the request, for every request including retries
+    # and hedges.
+    send = "send"
+    # Waiting for the response headers once the request was sent. Transports that don't
+    # report the network events, e.g. mocked ones, count the whole round trip as waiting.
+    wait = "wait"
+    # Receiving the response body.
+    receive = "receive"
+    # Decoding and validating the response.
+    decode = "decode"
+    # Whole call, the time not spent in the other phases is reported as `other`.
+    total = "total"
+
+
+class CallProfile:
+    """Timings of the phases of a single invocation, in nanoseconds."""
+
+    __slots__ = ("durations", "started_at", "_token")
+
+    def __init__(self) -> None:
+        self.durations: Dict[Phase, int] = dict()
+        self.started_at = perf_counter_ns()
+        self._token: Optional[Token] = None
+
+    def add(self, phase: Phase, started_at: int, ended_at: Optional[int] = None) -> int:
+        """Add the time from `started_at` to `ended_at`, by default now, to a phase, and return the end."""
+        if ended_at is None:
+            ended_at = perf_counter_ns()
+        self.durations[phase] = self.durations.get(phase, 0) + ended_at - started_at
+        return ended_at
+
+
+class NetworkTrace:
+    """
+    Trace of the network events of a request, to split its round trip into phases.
+
+    It's passed as the `trace` request extension of `httpx`, which reports when the
+    request was sent and when the response headers were received.
+    """
+
+    __slots__ = ("sent_at", "headers_at")
+
+    def __init__(self) -> None:
+        self.sent_at: Optional[int] = None
+        self.headers_at: Optional[int] = None
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name.endswith(".send_request_body.complete"):
+            self.sent_at = perf_counter_ns()
+        elif event_name.endswith(".receive_response_headers.complete"):
+            self.headers_at = perf_counter_ns()
+
+    def add(self, call: CallProfile, started_at: int) -> int:
+        """Add the network phases of the request sent at `started_at` to a call, and return the current time."""
+        if self.sent_at is None or self.headers_at is None:
+            return call.add(Phase.wait, started_at)
+        call.add(Phase.send, started_at, self.sent_at)
+        call.add(Phase.wait, self.sent_at, self.headers_at)
+        return call.add(Phase.receive, self.headers_at)
+
+
+class PhaseStats(BaseModel):
+    calls: int = Field(description="Number of calls with the phase.")
+    mean: float = Field(description="Mean duration of the phase, in seconds.")
+    p50: float = Field(description="Median duration of the phase, in seconds.")
+    p99: float = Field(description="99th percentile of the duration of the phase, in seconds.")
+    max: float = Field(description="Maximum duration of the phase, in seconds.")
+
+
+def _percentile(durations: List[int], percentile: float) -> int:
+    return durations[max(ceil(len(durations) * percentile / 100) - 1, 0)]
+
+
+class Profiler:
+    """
+    Collect per-phase timings of invocations.
+
+    The profiles of the most recent calls are kept in a ring buffer, so profiling a
+    long-running process uses bounded memory. Profilers are usually created with
+    `protect_profile`.
+
+    Parameters
+    ----------
+    max_calls : int, optional
+        Number of most recent calls to keep, by default 1000.
+
+    Raises
+    ------
+    ValueError
+        If `max_calls` is not positive.
+    """
+
+    def __init__(self, max_calls: int = MAX_CALLS) -> None:
+        if max_calls < 1:
+            raise ValueError("Max calls must be at least 1.")
+        # Appending to a bounded deque is thread-safe, so recording doesn't need a lock.
+        self.calls: Deque[CallProfile] = deque(maxlen=max_calls)
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def clear(self) -> None:
+        self.calls.clear()
+
+    def summary(self) -> Dict[str, PhaseStats]:
+        """
+        Summarize the timings of the recorded calls.
+
+        Returns
+        -------
+        Dict[str, PhaseStats]
+            Statistics for each phase that was recorded, in the order of the phases,
+            followed by `other`, the time spent outside of the phases, e.g. in the
+            cache, scheduler or event loop.
+        """
+        samples: Dict[str, List[int]] = {phase.value: list() for phase in Phase}
+        samples["other"] = list()
+        for call in list(self.calls):
+            call_durations = dict(call.durations)
+            for phase, duration in call_durations.items():
+                samples[phase.value].append(duration)
+            total = call_durations.get(Phase.total)
+            if total is not None:
+                # Concurrent phases, e.g. hedged requests, can add up to more than the total.
+                samples["other"].append(max(total - (sum(call_durations.values()) - total), 0))
+        summary: Dict[str, PhaseStats] = dict()
+        for name, durations in samples.items():
+            if not durations:
+                continue
+            durations.sort()
+            summary[name] = PhaseStats(
+                calls=len(durations),
+                mean=sum(durations) / len(durations) / 1e9,
+                p50=_percentile(durations, 50) / 1e9,
+                p99=_percentile(durations, 99) / 1e9,
+                max=durations[-1] / 1e9,
+            )
+        return summary
+
+    def dump(self) -> str:
+        """Format the summary as a table, with the durations in milliseconds."""
+        lines = [f"{'phase':<10}{'calls':>8}{'mean':>10}{'p50':>10}{'p99':>10}{'max':>10}"]
+        for name, stats in self.summary().items():
+            lines.append(
+                f"{name:<10}{stats.calls:>8}"
+                + "".join(f"{value * 1e3:>10.3f}" for value in (stats.mean, stats.p50, stats.p99, stats.max))
+            )
+        return "\n".join(lines)
+
+
+# Profiler of the current context, and the profile of the call in progress.
+_profiler: ContextVar[Optional[Profiler]] = ContextVar("protect_profiler", default=None)
+_call: ContextVar[Optional[CallProfile]] = ContextVar("protect_call_profile", default=None)
+
+
+@contextmanager
+def protect_profile(max_calls: int = MAX_CALLS, profiler: Optional[Profiler] = None) -> Iterator[Profiler]:
+    """
+    Profile the invocations made in this context.
+
+    The profiler is a context variable, so it follows the calls through `asyncio` tasks
+    and Protect's synchronous wrappers. Outside of a profiled context, profiling costs a
+    single context variable lookup per phase.
+
+    Parameters
+    ----------
+    max_calls : int, optional
+        Number of most recent calls to keep, by default 1000.
+    profiler : Optional[Profiler], optional
+        Profiler to record to, e.g. to aggregate several contexts, by default None, i.e.
+        a new one.
+
+    Yields
+    ------
+    Profiler
+        Profiler with the timings of the calls made in the context.
+    """
+    if profiler is None:
+        profiler = Profiler(max_calls=max_calls)
+    token = _profiler.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _profiler.reset(token)
+
+
+def current_call() -> Optional[CallProfile]:
+    """Get the profile of the call in progress, if it is profiled."""
+    return _call.get()
+
+
+def start_call() -> Optional[CallProfile]:
+    """Start profiling a call, if the context is profiled."""
+    profiler = _profiler.get()
+    if profiler is None:
+        return None
+    call = CallProfile()
+    call._token = _call.set(call)
+    profiler.calls.append(call)
+    return call
+
+
+def end_call(call: Optional[CallProfile]) -> None:
+    """End profiling a call started with `start_call`."""
+    if call is not None:
+        call.add(Phase.total, call.started_at)
+        if call._token is not None:
+            _call.reset(call._token)
@@ -11,6 +11,7 @@ from galileo_core.schemas.core.project import (
     ProjectResponse,
     ProjectType,
 )
+from galileo_protect.resolution import resolution_cache
 from galileo_protect.schemas.config import ProtectConfig
 
 
@@ -31,6 +32,7 @@ def create_project(name: str = DEFAULT_PROJECT_NAME) -> ProjectResponse:
     config = ProtectConfig.get()
     project = core_create_project(request=CreateProjectRequest(name=name, type=ProjectType.protect), config=config)
     config.project_id = project.id
+    resolution_cache.set_project(project)
     return project
 
 
@@ -54,6 +56,8 @@ def get_project(
     Get a Protect project by either ID or name.
 
     If both project_id and project_name are provided, project_id will take precedence.
+    Projects that were recently created or fetched are served from the name resolution
+    cache.
 
     Parameters
     ----------
@@ -74,11 +78,17 @@ def get_project(
     ValueError
         If neither project_id nor project_name is provided.
     """
+    cached_project = resolution_cache.get_project(project_id=project_id, project_name=project_name)
+    if cached_project is not None:
+        return cached_project
     config = ProtectConfig.get()
-    return core_get_project(
+    project = core_get_project(
         project_id=project_id,
         project_name=project_name,
         project_type=ProjectType.protect,
         raise_if_missing=raise_if_missing,
         config=config,
     )
+    if project is not None:
+        resolution_cache.set_project(project)
+    return project
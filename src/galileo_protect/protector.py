@@ -0,0 +1,270 @@
+from time import perf_counter_ns
+from typing import Any, Dict, Literal, Optional, Sequence, Union, overload
+
+from pydantic import UUID4
+
+from galileo_core.helpers.logger import logger
+from galileo_core.schemas.protect.response import Response
+from galileo_protect.budget import InvocationBudget
+from galileo_protect.cache import ResponseCache
+from galileo_protect.circuit_breaker import CircuitBreaker
+from galileo_protect.client import ProtectClient
+from galileo_protect.constants.invoke import TIMEOUT
+from galileo_protect.execution import async_run
+from galileo_protect.hedge import HedgePolicy
+from galileo_protect.invocation import _ainvoke_request, _request_json
+from galileo_protect.profiling import Phase, end_call, start_call
+from galileo_protect.scheduler import InvocationScheduler, Priority
+from galileo_protect.schemas import Payload, RawResponse, ResultMode, Ruleset
+from galileo_protect.schemas.config import ProtectConfig
+from galileo_protect.timeout import AdaptiveTimeout
+
+# Placeholder used to validate the static parts of the request once, since a request
+# can't be validated without a payload.
+_PLACEHOLDER_PAYLOAD = Payload(input="placeholder")
+
+
+class Protector:
+    """
+    Invocation handle bound to a project, stage, rulesets and timeout.
+
+    The rulesets and the project and stage identity are validated and serialized once,
+    when the protector is created. Each invocation then only serializes the payload,
+    metadata and headers, which saves re-validating and re-serializing every rule on
+    every call.
+
+    Parameters
+    ----------
+    prioritized_rulesets : Optional[Sequence[Ruleset]], optional
+        Prioritized rulesets to be used for processing. These should only be provided if
+        using a local stage, by default None, i.e. empty list.
+    project_id : Optional[UUID4], optional
+        Project ID to be used for processing, by default None.
+    project_name : Optional[str], optional
+        Project name to be used for processing, by default None.
+    stage_id : Optional[UUID4], optional
+        Stage ID to be used for processing, by default None.
+    stage_name : Optional[str], optional
+        Stage name to be used for processing, by default None.
+    timeout : Union[float, AdaptiveTimeout], optional
+        Timeout for the request, or an adaptive timeout derived from the observed
+        latency, by default 10 seconds.
+    cache : Optional[ResponseCache], optional
+        Cache to serve repeated invocations from, by default None, i.e. no caching.
+    coalesce : bool, optional
+        Share a single in-flight request between concurrent identical invocations, even
+        across threads, by default False.
+    client : Optional[ProtectClient], optional
+        Pooled client to send the requests with, by default None, i.e. the API client
+        from the config.
+    hedge : Optional[HedgePolicy], optional
+        Policy to hedge slow requests with, by default None, i.e. no hedging.
+    circuit_breaker : Optional[CircuitBreaker], optional
+        Circuit breaker to reject requests with while the backend is degraded, by default
+        None.
+    scheduler : Optional[InvocationScheduler], optional
+        Scheduler to rate limit and prioritize requests with, by default None.
+    priority : Union[Priority, str], optional
+        Priority class of the invocations for the scheduler, by default
+        `Priority.interactive`.
+    budget : Optional[InvocationBudget], optional
+        Time budget for the invocations, by default None. If it runs out, the budget's
+        fallback response is returned and the request completes in the background.
+
+    Raises
+    ------
+    ValueError
+        If the rulesets or the project and stage identity are invalid.
+    """
+
+    def __init__(
+        self,
+        prioritized_rulesets: Optional[Sequence[Ruleset]] = None,
+        project_id: Optional[UUID4] = None,
+        project_name: Optional[str] = None,
+        stage_id: Optional[UUID4] = None,
+        stage_name: Optional[str] = None,
+        timeout: Union[float, AdaptiveTimeout] = TIMEOUT,
+        cache: Optional[ResponseCache] = None,
+        coalesce: bool = False,
+        client: Optional[ProtectClient] = None,
+        hedge: Optional[HedgePolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        scheduler: Optional[InvocationScheduler] = None,
+        priority: Union[Priority, str] = Priority.interactive,
+        budget: Optional[InvocationBudget] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.cache = cache
+        self.coalesce = coalesce
+        self.client = client
+        self.hedge = hedge
+        self.circuit_breaker = circuit_breaker
+        self.scheduler = scheduler
+        self.priority = Priority(priority)
+        self.budget = budget
+        self._static_json = _request_json(
+            ProtectConfig.get(),
+            payload=_PLACEHOLDER_PAYLOAD,
+            prioritized_rulesets=prioritized_rulesets,
+            project_id=project_id,
+            project_name=project_name,
+            stage_id=stage_id,
+            stage_name=stage_name,
+            timeout=timeout,
+        )
+        for field in ("payload", "metadata", "headers"):
+            self._static_json.pop(field)
+
+    def request_json(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Get the serialized request for a payload."""
+        return {
+            **self._static_json,
+            "payload": payload.model_dump(mode="json"),
+            "metadata": metadata,
+            "headers": headers,
+        }
+
+    @overload
+    async def ainvoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        result_mode: Literal[ResultMode.model, "model"] = ResultMode.model,
+    ) -> Response: ...
+
+    @overload
+    async def ainvoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        *,
+        result_mode: Literal[ResultMode.raw, "raw"],
+    ) -> RawResponse: ...
+
+    @overload
+    async def ainvoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        result_mode: Union[ResultMode, str] = ResultMode.model,
+    ) -> Union[Response, RawResponse]: ...
+
+    async def ainvoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        result_mode: Union[ResultMode, str] = ResultMode.model,
+    ) -> Union[Response, RawResponse]:
+        """
+        Asynchronously invoke Protect with the given payload.
+
+        Parameters
+        ----------
+        payload : Payload
+            Payload to be processed.
+        metadata : Optional[Dict[str, str]], optional
+            Metadata to be added when responding, by default None.
+        headers : Optional[Dict[str, str]], optional
+            Headers to be added to the response, by default None.
+        result_mode : Union[ResultMode, str], optional
+            Whether to return the full `Response` model, or a lightweight `RawResponse`
+            that only builds the model on demand, by default `ResultMode.model`.
+
+        Returns
+        -------
+        Union[Response, RawResponse]
+            Response from the Protect API.
+        """
+        logger.debug("Invoking Protect.")
+        call = start_call()
+        try:
+            started_at = perf_counter_ns() if call is not None else 0
+            config = ProtectConfig.get()
+            if call is not None:
+                started_at = call.add(Phase.config, started_at)
+            request_json = self.request_json(payload, metadata=metadata, headers=headers)
+            if call is not None:
+                call.add(Phase.request, started_at)
+            return await _ainvoke_request(
+                config,
+                request_json,
+                self.timeout,
+                cache=self.cache,
+                coalesce=self.coalesce,
+                client=self.client,
+                raw=ResultMode(result_mode) == ResultMode.raw,
+                hedge=self.hedge,
+                circuit_breaker=self.circuit_breaker,
+                scheduler=self.scheduler,
+                priority=self.priority,
+                budget=self.budget,
+            )
+        finally:
+            end_call(call)
+
+    @overload
+    def invoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        result_mode: Literal[ResultMode.model, "model"] = ResultMode.model,
+    ) -> Response: ...
+
+    @overload
+    def invoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        *,
+        result_mode: Literal[ResultMode.raw, "raw"],
+    ) -> RawResponse: ...
+
+    @overload
+    def invoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        result_mode: Union[ResultMode, str] = ResultMode.model,
+    ) -> Union[Response, RawResponse]: ...
+
+    def invoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        result_mode: Union[ResultMode, str] = ResultMode.model,
+    ) -> Union[Response, RawResponse]:
+        """
+        Invoke Protect with the given payload.
+
+        Parameters
+        ----------
+        payload : Payload
+            Payload to be processed.
+        metadata : Optional[Dict[str, str]], optional
+            Metadata to be added when responding, by default None.
+        headers : Optional[Dict[str, str]], optional
+            Headers to be added to the response, by default None.
+        result_mode : Union[ResultMode, str], optional
+            Whether to return the full `Response` model, or a lightweight `RawResponse`
+            that only builds the model on demand, by default `ResultMode.model`.
+
+        Returns
+        -------
+        Union[Response, RawResponse]
+            Response from the Protect API.
+        """
+        return async_run(self.ainvoke(payload=payload, metadata=metadata, headers=headers, result_mode=result_mode))
@@ -0,0 +1,262 @@
+from re import IGNORECASE, compile, escape
+from time import time_ns
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from galileo_core.schemas.protect.payload import Payload
+from galileo_core.schemas.protect.response import Response
+from galileo_core.schemas.protect.ruleset import Ruleset
+from galileo_core.schemas.shared.metric import MetricValueType
+from galileo_protect.constants.providers import (
+    CREDIT_CARD_LABEL,
+    PII_PATTERNS,
+    PROMPT_INJECTION_PATTERNS,
+    TOXIC_TERMS,
+)
+from galileo_protect.evaluation import RuleEvaluator, decision_response
+from galileo_protect.preflight import metric_field
+from galileo_protect.schemas.rule import RuleMetrics
+
+
+class MetricProvider:
+    """
+    Interface for computing a metric locally, in-process.
+
+    Providers compute the same kind of values as the Protect API does for their metric,
+    so that the same rules apply to them. They're called on the event loop, so they
+    should be fast and CPU-bound.
+    """
+
+    def compute(self, text: str) -> MetricValueType:
+        """
+        Compute the metric for a text.
+
+        Parameters
+        ----------
+        text : str
+            Input or output of the payload, depending on the metric.
+
+        Returns
+        -------
+        MetricValueType
+            Value of the metric.
+        """
+        raise NotImplementedError
+
+
+def _luhn(number: str) -> bool:
+    digits = [int(digit) for digit in number if digit.isdigit()]
+    checksum = sum(digits[-1::-2]) + sum(sum(divmod(digit * 2, 10)) for digit in digits[-2::-2])
+    return checksum % 10 == 0
+
+
+class PIIProvider(MetricProvider):
+    """
+    Detect PII with regular expressions, for the `pii` and `input_pii` metrics.
+
+    The value is the list of the PII types found, e.g. `["email", "ssn"]`. Card numbers
+    are validated with the Luhn checksum, to avoid flagging other long numbers.
+
+    Parameters
+    ----------
+    patterns : Mapping[str, str], optional
+        Regular expressions by PII type, by default emails, SSNs, card numbers, phone
+        numbers and IP addresses.
+    """
+
+    def __init__(self, patterns: Mapping[str, str] = PII_PATTERNS) -> None:
+        self._patterns = [(label, compile(pattern)) for label, pattern in patterns.items()]
+
+    def compute(self, text: str) -> MetricValueType:
+        found: List[Optional[Union[float, int, str]]] = list()
+        for label, pattern in self._patterns:
+            if label == CREDIT_CARD_LABEL:
+                if any(_luhn(match.group()) for match in pattern.finditer(text)):
+                    found.append(label)
+            elif pattern.search(text) is not None:
+                found.append(label)
+        return found
+
+
+class ToxicityProvider(MetricProvider):
+    """
+    Score toxicity with a lexicon, for the `toxicity` and `input_toxicity` metrics.
+
+    The value is the highest score of the terms found in the text, between 0 and 1.
+    Terms are matched as whole words, case-insensitively.
+
+    Parameters
+    ----------
+    terms : Mapping[str, float], optional
+        Score of each term, by default a small lexicon of insults.
+    """
+
+    def __init__(self, terms: Mapping[str, float] = TOXIC_TERMS) -> None:
+        self._scores = {term.lower(): score for term, score in terms.items()}
+        # Longest terms first, so that phrases win over the words they contain.
+        alternatives = "|".join(escape(term) for term in sorted(self._scores, key=len, reverse=True))
+        self._pattern = compile(rf"\b(?:{alternatives})\b", IGNORECASE) if self._scores else None
+
+    def compute(self, text: str) -> MetricValueType:
+        if self._pattern is None:
+            return 0.0
+        return max((self._scores[match.group().lower()] for match in self._pattern.finditer(text)), default=0.0)
+
+
+class PromptInjectionProvider(MetricProvider):
+    """
+    Classify prompt injections with heuristics, for the `prompt_injection` metric.
+
+    The value is the category of the first pattern found, e.g. `simple_instruction` or
+    `impersonation`, or None if no pattern is found.
+
+    Parameters
+    ----------
+    patterns : Sequence[Tuple[str, str]], optional
+        Categories and their regular expressions, in the order they're checked, by
+        default instruction overrides, impersonation, context switches and obfuscation.
+    """
+
+    def __init__(self, patterns: Sequence[Tuple[str, str]] = PROMPT_INJECTION_PATTERNS) -> None:
+        self._patterns = [(category, compile(pattern, IGNORECASE)) for category, pattern in patterns]
+
+    def compute(self, text: str) -> MetricValueType:
+        for category, pattern in self._patterns:
+            if pattern.search(text) is not None:
+                return category
+        return None
+
+
+def _metric_name(metric: Union[RuleMetrics, str]) -> str:
+    return metric.value if isinstance(metric, RuleMetrics) else metric
+
+
+# Local providers by metric name, shared by all invocations in this process.
+_providers: Dict[str, MetricProvider] = {
+    RuleMetrics.pii.value: PIIProvider(),
+    RuleMetrics.input_pii.value: PIIProvider(),
+    RuleMetrics.toxicity.value: ToxicityProvider(),
+    RuleMetrics.input_toxicity.value: ToxicityProvider(),
+    RuleMetrics.prompt_injection.value: PromptInjectionProvider(),
+}
+
+
+def register_metric_provider(metric: Union[RuleMetrics, str], provider: Optional[MetricProvider]) -> None:
+    """
+    Set the local provider of a metric, for the invocations with local metrics.
+
+    `pii`, `input_pii`, `toxicity`, `input_toxicity` and `prompt_injection` have built-in
+    providers, which can be replaced or removed.
+
+    Parameters
+    ----------
+    metric : Union[RuleMetrics, str]
+        Metric computed by the provider.
+    provider : Optional[MetricProvider]
+        Provider to use, or None to always compute the metric with the Protect API.
+    """
+    name = _metric_name(metric)
+    if provider is None:
+        _providers.pop(name, None)
+    else:
+        _providers[name] = provider
+
+
+def get_metric_provider(metric: Union[RuleMetrics, str]) -> Optional[MetricProvider]:
+    """Get the local provider of a metric, if it has one."""
+    return _providers.get(_metric_name(metric))
+
+
+def compute_metrics(payload: Payload, metrics: Iterable[Union[RuleMetrics, str]]) -> Dict[str, MetricValueType]:
+    """
+    Compute metrics locally for a payload.
+
+    Metrics named `input_*` and `prompt_injection` are computed on the payload's input,
+    the others on its output. Metrics without a provider, or without the text they're
+    computed on, are None.
+
+    Parameters
+    ----------
+    payload : Payload
+        Payload to compute the metrics for.
+    metrics : Iterable[Union[RuleMetrics, str]]
+        Metrics to compute.
+
+    Returns
+    -------
+    Dict[str, MetricValueType]
+        Values by metric name.
+    """
+    values: Dict[str, MetricValueType] = dict()
+    for metric in metrics:
+        name = _metric_name(metric)
+        provider = _providers.get(name)
+        text = payload.input if metric_field(name) == "input" else payload.output
+        values[name] = provider.compute(text) if provider is not None and text is not None else None
+    return values
+
+
+class _LocalMetrics(Mapping[Union[RuleMetrics, str], MetricValueType]):
+    # Metric values computed on first lookup, so that each metric is computed at most
+    # once, and only if a rule needs it.
+    def __init__(self, payload: Payload) -> None:
+        self.payload = payload
+        self._values: Dict[str, MetricValueType] = dict()
+
+    def __getitem__(self, metric: Union[RuleMetrics, str]) -> MetricValueType:
+        name = _metric_name(metric)
+        if name not in self._values:
+            self._values.update(compute_metrics(self.payload, [name]))
+        return self._values[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+def decide_locally(
+    payload: Payload, rulesets: Sequence[Ruleset], metadata: Optional[Dict[str, str]] = None
+) -> Union[Response, List[Ruleset]]:
+    """
+    Decide as much of an invocation as possible with the local metric providers.
+
+    Rulesets whose metrics all have a local provider are evaluated locally, in priority
+    order, and each metric is computed at most once. The invocation is decided locally
+    if a local ruleset is triggered before any ruleset that needs the Protect API, or if
+    every ruleset is local. Otherwise, the rulesets that still need the API are returned:
+    local rulesets that weren't triggered are left out, and the rulesets after a
+    triggered local one, which can't apply anymore, are dropped.
+
+    Parameters
+    ----------
+    payload : Payload
+        Payload to decide on.
+    rulesets : Sequence[Ruleset]
+        Rulesets to apply, in priority order.
+    metadata : Optional[Dict[str, str]], optional
+        Metadata of the request, echoed back in a local response, by default None.
+
+    Returns
+    -------
+    Union[Response, List[Ruleset]]
+        Response if the invocation was decided locally, or the rulesets to send to the
+        Protect API.
+    """
+    received_at = time_ns()
+    evaluator = RuleEvaluator(rulesets)
+    values = _LocalMetrics(payload)
+    remote: List[Ruleset] = list()
+    for index, ruleset in enumerate(evaluator.rulesets):
+        if any(rule.metric not in _providers for rule in ruleset.rules):
+            remote.append(ruleset)
+            continue
+        if evaluator.is_triggered(index, values):
+            if not remote:
+                return decision_response(payload, ruleset, received_at, metadata)
+            # The API decides between the rulesets before it and this one.
+            remote.append(ruleset)
+            return remote
+    if not remote:
+        return decision_response(payload, None, received_at, metadata)
+    return remote
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Generic, Hashable, Iterator, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from galileo_core.schemas.core.project import ProjectResponse
+from galileo_protect.constants.resolution import RESOLUTION_MAX_ENTRIES, RESOLUTION_TTL
+from galileo_protect.schemas.stage import StageResponse
+
+V = TypeVar("V")
+
+
+class _TTLMap(Generic[V]):
+    # LRU map with expiring entries, bounded so that names that are never read again
+    # don't pile up.
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items: OrderedDict[Hashable, Tuple[V, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at < monotonic():
+            self._items.pop(key, None)
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        self._items.pop(key, None)
+        self._items[key] = (value, monotonic() + self.ttl)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def items(self) -> Iterator[Tuple[Any, V]]:
+        now = monotonic()
+        return iter([(key, value) for key, (value, expires_at) in self._items.items() if expires_at >= now])
+
+    def pop(self, key: Hashable) -> None:
+        self._items.pop(key, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class NameResolutionCache:
+    """
+    Cache of project and stage names to their IDs.
+
+    This saves the round trips to look up projects and stages by name. It's populated
+    whenever a project or stage is created or fetched, and entries expire after `ttl`
+    seconds. The least recently used entries are evicted beyond `max_entries`.
+
+    Parameters
+    ----------
+    ttl : float, optional
+        Time to live for each entry in seconds, by default 5 minutes.
+    max_entries : int, optional
+        Maximum number of projects, and of stages, to keep, by default 4096.
+    """
+
+    def __init__(self, ttl: float = RESOLUTION_TTL, max_entries: int = RESOLUTION_MAX_ENTRIES) -> None:
+        if max_entries < 1:
+            raise ValueError("Max entries must be at least 1.")
+        self._lock = Lock()
+        self._projects_by_name: _TTLMap[ProjectResponse] = _TTLMap(ttl, max_entries)
+        self._projects_by_id: _TTLMap[ProjectResponse] = _TTLMap(ttl, max_entries)
+        self._stage_ids: _TTLMap[UUID] = _TTLMap(ttl, max_entries)
+
+    @property
+    def ttl(self) -> float:
+        return self._stage_ids.ttl
+
+    @ttl.setter
+    def ttl(self, value: float) -> None:
+        with self._lock:
+            for items in (self._projects_by_name, self._projects_by_id, self._stage_ids):
+                items.ttl = value
+
+    def get_project(
+        self, project_id: Optional[UUID] = None, project_name: Optional[str] = None
+    ) -> Optional[ProjectResponse]:
+        """Get a cached project by ID or name, with the ID taking precedence."""
+        with self._lock:
+            if project_id is not None:
+                return self._projects_by_id.get(str(project_id))
+            if project_name is not None:
+                return self._projects_by_name.get(project_name)
+        return None
+
+    def get_project_id(self, project_name: str) -> Optional[UUID]:
+        """Get the cached ID for a project name."""
+        project = self.get_project(project_name=project_name)
+        return project.id if project is not None else None
+
+    def set_project(self, project: ProjectResponse) -> None:
+        with self._lock:
+            self._projects_by_id.set(str(project.id), project)
+            self._projects_by_name.set(project.name, project)
+
+    def get_stage_id(self, project_id: UUID, stage_name: str) -> Optional[UUID]:
+        """Get the cached ID for a stage name within a project."""
+        with self._lock:
+            return self._stage_ids.get((str(project_id), stage_name))
+
+    def get_stage_name(self, project_id: UUID, stage_id: UUID) -> Optional[str]:
+        """Get the cached name of a stage ID within a project."""
+        with self._lock:
+            return next(
+                (
+                    stage_name
+                    for (stage_project_id, stage_name), cached_id in self._stage_ids.items()
+                    if stage_project_id == str(project_id) and cached_id == stage_id
+                ),
+                None,
+            )
+
+    def set_stage(self, stage: StageResponse) -> None:
+        with self._lock:
+            self._stage_ids.set((str(stage.project_id), stage.name), stage.id)
+
+    def invalidate(
+        self,
+        project_id: Optional[UUID] = None,
+        project_name: Optional[str] = None,
+        stage_name: Optional[str] = None,
+    ) -> None:
+        """
+        Remove cached entries.
+
+        If a stage name is provided, only that stage's entry is removed from the given
+        project. Otherwise, the project's entry is removed.
+
+        Parameters
+        ----------
+        project_id : Optional[UUID], optional
+            Project ID, by default None.
+        project_name : Optional[str], optional
+            Project name, by default None.
+        stage_name : Optional[str], optional
+            Stage name, by default None.
+        """
+        project = self.get_project(project_id=project_id, project_name=project_name)
+        with self._lock:
+            if stage_name is not None:
+                if project_id is None and project is not None:
+                    project_id = project.id
+                if project_id is not None:
+                    self._stage_ids.pop((str(project_id), stage_name))
+                return
+            if project_id is not None:
+                self._projects_by_id.pop(str(project_id))
+            if project_name is not None:
+                self._projects_by_name.pop(project_name)
+            if project is not None:
+                self._projects_by_id.pop(str(project.id))
+                self._projects_by_name.pop(project.name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._projects_by_name.clear()
+            self._projects_by_id.clear()
+            self._stage_ids.clear()
+
+
+resolution_cache = NameResolutionCache()
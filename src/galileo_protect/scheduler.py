@@ -0,0 +1,308 @@
+from asyncio import wrap_future
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from hashlib import sha256
+from random import uniform
+from threading import Condition, Thread
+from time import monotonic
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Tuple, TypeVar, Union
+
+from pydantic import BaseModel, Field
+
+from galileo_core.helpers.logger import logger
+from galileo_protect.cache import stage_key
+from galileo_protect.constants.scheduler import (
+    BACKOFF,
+    BATCH_WEIGHT,
+    INTERACTIVE_WEIGHT,
+    MAX_BACKOFF,
+    MAX_QUEUE_SIZE,
+    MAX_RETRIES,
+)
+from galileo_protect.exceptions import RateLimitedError, SchedulerQueueFullError
+from galileo_protect.schemas.config import ProtectConfig
+
+T = TypeVar("T")
+
+
+class Priority(str, Enum):
+    # Latency sensitive invocations, e.g. for chat turns.
+    interactive = "interactive"
+    # Background invocations, e.g. for bulk scans.
+    batch = "batch"
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a `Retry-After` header value, in seconds or as an HTTP date.
+
+    Parameters
+    ----------
+    value : Optional[str]
+        Header value.
+
+    Returns
+    -------
+    Optional[float]
+        Seconds to wait, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def scheduler_key(config: ProtectConfig, request_json: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Get the key an invocation is rate limited by, i.e. its credentials and project.
+
+    Parameters
+    ----------
+    config : ProtectConfig
+        Config the invocation is sent with.
+    request_json : Dict[str, Any]
+        Request serialized in JSON mode.
+
+    Returns
+    -------
+    Tuple[str, str]
+        Digest of the credentials, and project ID or name.
+    """
+    credentials = config.api_key.get_secret_value() if config.api_key else (config.username or "")
+    return sha256(credentials.encode()).hexdigest()[:16], stage_key(request_json)[0]
+
+
+class SchedulerStats(BaseModel):
+    admitted: int = Field(default=0, description="Number of requests that were sent.")
+    queued: int = Field(default=0, description="Number of invocations currently waiting for a token.")
+    rejected: int = Field(default=0, description="Number of invocations rejected because the queue was full.")
+    retries: int = Field(default=0, description="Number of requests retried after being rate limited.")
+
+
+class _Bucket:
+    def __init__(self, tokens: float, now: float) -> None:
+        self.tokens = tokens
+        self.updated_at = now
+        self.blocked_until = 0.0
+        self.queues: Dict[Priority, Deque[Future]] = {priority: deque() for priority in Priority}
+        # Virtual finish times of the priority classes, for weighted fair queueing.
+        self.passes: Dict[Priority, float] = {priority: 0.0 for priority in Priority}
+        self.virtual_time = 0.0
+
+    def refill(self, now: float, rate: float, burst: float) -> None:
+        self.tokens = min(burst, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+
+    def waiting(self) -> int:
+        return sum(len(queue) for queue in self.queues.values())
+
+    def next_priority(self) -> Priority:
+        return min((priority for priority, queue in self.queues.items() if queue), key=self.passes.__getitem__)
+
+
+class InvocationScheduler:
+    """
+    Client-side rate limiter and priority scheduler for Protect invocations.
+
+    Each project and set of credentials gets a token bucket that refills at `rate`
+    requests per second, up to `burst` tokens. Requests that can't get a token right away
+    wait in a bounded queue, and are admitted in weighted fair order across the priority
+    classes, so background batch invocations can't starve interactive ones. Requests
+    rejected with 429 or 503 are retried after the `Retry-After` delay, or an exponential
+    backoff if there is none, and the bucket is paused for that long.
+
+    Pass an instance to `invoke`, `ainvoke`, the batch APIs or `ProtectTool` to use it,
+    and share it between invocations. It is safe to share across threads and event loops.
+
+    Parameters
+    ----------
+    rate : float
+        Requests per second, per project and credentials.
+    burst : Optional[float], optional
+        Maximum number of requests that can be sent at once, by default None, i.e. the
+        rate, with a minimum of 1.
+    weights : Optional[Dict[Union[Priority, str], float]], optional
+        Share of the tokens for each priority class when both are waiting, by default 4
+        for interactive and 1 for batch invocations.
+    max_queue_size : int, optional
+        Maximum number of waiting invocations, by default 1000.
+    max_retries : int, optional
+        Maximum number of retries for rate limited requests, by default 3.
+    backoff : float, optional
+        Backoff before the first retry without a `Retry-After`, by default 0.5 seconds.
+    max_backoff : float, optional
+        Maximum backoff, by default 30 seconds.
+
+    Raises
+    ------
+    ValueError
+        If the rate, burst or weights are invalid.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        weights: Optional[Dict[Union[Priority, str], float]] = None,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = BACKOFF,
+        max_backoff: float = MAX_BACKOFF,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        if self.burst < 1:
+            raise ValueError("Burst must be at least 1.")
+        self.weights = {Priority.interactive: float(INTERACTIVE_WEIGHT), Priority.batch: float(BATCH_WEIGHT)}
+        self.weights.update({Priority(priority): weight for priority, weight in (weights or dict()).items()})
+        if any(weight <= 0 for weight in self.weights.values()):
+            raise ValueError("Priority weights must be positive.")
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._condition = Condition()
+        self._buckets: Dict[Hashable, _Bucket] = dict()
+        self._dispatcher: Optional[Thread] = None
+        self._stats = SchedulerStats()
+
+    @property
+    def stats(self) -> SchedulerStats:
+        with self._condition:
+            return self._stats.model_copy()
+
+    def _bucket(self, key: Hashable, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.burst, now)
+        bucket.refill(now, self.rate, self.burst)
+        return bucket
+
+    def _admit(self, bucket: _Bucket, now: float) -> bool:
+        """Admit the next waiting invocation of a bucket, if it can get a token."""
+        if now < bucket.blocked_until or bucket.tokens < 1:
+            return False
+        priority = bucket.next_priority()
+        waiter = bucket.queues[priority].popleft()
+        self._stats.queued -= 1
+        # Skip invocations that were cancelled while waiting.
+        if waiter.set_running_or_notify_cancel():
+            bucket.virtual_time = bucket.passes[priority]
+            bucket.passes[priority] += 1 / self.weights[priority]
+            bucket.tokens -= 1
+            self._stats.admitted += 1
+            waiter.set_result(None)
+        return True
+
+    def _dispatch(self) -> None:
+        with self._condition:
+            while True:
+                now = monotonic()
+                wake_at: Optional[float] = None
+                for bucket in self._buckets.values():
+                    if not bucket.waiting():
+                        continue
+                    bucket.refill(now, self.rate, self.burst)
+                    while bucket.waiting() and self._admit(bucket, now):
+                        pass
+                    if bucket.waiting():
+                        ready_at = max(bucket.blocked_until, now + (1 - bucket.tokens) / self.rate)
+                        wake_at = ready_at if wake_at is None else min(wake_at, ready_at)
+                if wake_at is None:
+                    # Nothing is waiting, the next invocation that has to wait restarts it.
+                    self._dispatcher = None
+                    return
+                self._condition.wait(timeout=wake_at - now)
+
+    async def _acquire(self, key: Hashable, priority: Priority) -> None:
+        with self._condition:
+            now = monotonic()
+            bucket = self._bucket(key, now)
+            if not bucket.waiting() and now >= bucket.blocked_until and bucket.tokens >= 1:
+                bucket.tokens -= 1
+                self._stats.admitted += 1
+                return
+            if self._stats.queued >= self.max_queue_size:
+                self._stats.rejected += 1
+                raise SchedulerQueueFullError(f"Scheduler queue is full with {self.max_queue_size} invocations.")
+            queue = bucket.queues[priority]
+            if not queue:
+                # A class that was idle starts at the current virtual time, so it can't
+                # claim the share it didn't use while idle.
+                bucket.passes[priority] = max(bucket.passes[priority], bucket.virtual_time)
+            waiter: Future = Future()
+            queue.append(waiter)
+            self._stats.queued += 1
+            if self._dispatcher is None:
+                self._dispatcher = Thread(target=self._dispatch, name="galileo_protect_scheduler", daemon=True)
+                self._dispatcher.start()
+            self._condition.notify()
+        await wrap_future(waiter)
+
+    def _back_off(self, key: Hashable, error: RateLimitedError, attempt: int) -> float:
+        delay = error.retry_after
+        if delay is None:
+            # Full jitter, so that retries from many clients don't arrive together.
+            delay = uniform(0, min(self.backoff * 2**attempt, self.max_backoff))
+        delay = min(delay, self.max_backoff)
+        with self._condition:
+            now = monotonic()
+            bucket = self._bucket(key, now)
+            bucket.blocked_until = max(bucket.blocked_until, now + delay)
+            self._stats.retries += 1
+            self._condition.notify()
+        return delay
+
+    async def run(
+        self, key: Hashable, fn: Callable[[], Awaitable[T]], priority: Union[Priority, str] = Priority.interactive
+    ) -> T:
+        """
+        Run `fn` once it gets a token, retrying it if it is rate limited.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key to rate limit by, e.g. from `scheduler_key`.
+        fn : Callable[[], Awaitable[T]]
+            Function sending the request.
+        priority : Union[Priority, str], optional
+            Priority class of the invocation, by default `Priority.interactive`.
+
+        Returns
+        -------
+        T
+            Result of `fn`.
+
+        Raises
+        ------
+        SchedulerQueueFullError
+            If the invocation has to wait, but the queue is full.
+        RateLimitedError
+            If the request is still rate limited after the maximum number of retries.
+        """
+        priority = Priority(priority)
+        attempt = 0
+        while True:
+            await self._acquire(key, priority)
+            try:
+                return await fn()
+            except RateLimitedError as error:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._back_off(key, error, attempt)
+                logger.debug(f"Protect request was rate limited, retrying in {delay:.2f} seconds.")
+                attempt += 1
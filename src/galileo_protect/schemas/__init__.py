@@ -17,4 +17,5 @@ from galileo_core.schemas.protect.response import Response
 from galileo_core.schemas.protect.rule import Rule, RuleOperator
 from galileo_core.schemas.protect.ruleset import Ruleset
 from galileo_core.schemas.protect.stage import Stage
+from galileo_protect.schemas.response import RawResponse, ResultMode
 from galileo_protect.schemas.rule import RuleMetrics
@@ -5,6 +5,7 @@ from typing import Any, Optional
 from pydantic import UUID4
 
 from galileo_core.schemas.base_config import GalileoConfig
+from galileo_protect.resolution import resolution_cache
 
 
 class ProtectConfig(GalileoConfig):
@@ -28,6 +29,9 @@ class ProtectConfig(GalileoConfig):
         global _protect_config
         _protect_config = None
 
+        # Names may resolve to different IDs with different credentials.
+        resolution_cache.clear()
+
         super().reset()
 
     @classmethod
@@ -0,0 +1,66 @@
+from enum import Enum
+from typing import Any, Dict, Optional, Union
+
+from galileo_core.helpers.dependencies import is_dependency_available
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+
+if is_dependency_available("orjson"):
+    from orjson import loads as json_loads
+else:
+    from json import loads as json_loads  # type: ignore[assignment]
+
+
+class ResultMode(str, Enum):
+    # Full `Response` model.
+    model = "model"
+    # Lightweight `RawResponse`, the full model is only built on demand.
+    raw = "raw"
+
+
+class RawResponse:
+    """
+    Lightweight result of a Protect invocation.
+
+    Only the most commonly used fields are extracted from the response JSON. The full
+    `Response` model is built on demand with `to_response`.
+    """
+
+    __slots__ = ("text", "status", "execution_time", "trace_id", "_data", "_response")
+
+    def __init__(self, data: Dict[str, Any], response: Optional[Response] = None) -> None:
+        trace_metadata = data.get("trace_metadata") or dict()
+        self.text: str = data["text"]
+        status = data.get("status")
+        self.status = ExecutionStatus(status.lower()) if status else ExecutionStatus.not_triggered
+        self.execution_time: float = trace_metadata.get("execution_time", -1)
+        self.trace_id: Optional[str] = trace_metadata.get("id")
+        self._data = data
+        self._response = response
+
+    def __repr__(self) -> str:
+        return f"RawResponse(text={self.text!r}, status={self.status.value!r}, trace_id={self.trace_id!r})"
+
+    @classmethod
+    def from_json(cls, content: Union[str, bytes]) -> "RawResponse":
+        return cls(json_loads(content))
+
+    @classmethod
+    def from_response(cls, response: Response) -> "RawResponse":
+        return cls(response.model_dump(mode="json"), response=response)
+
+    def to_response(self) -> Response:
+        """Build (once) and return the full `Response` model."""
+        if self._response is None:
+            self._response = Response.model_validate(self._data)
+        return self._response
+
+
+def passthrough_response(request_json: Dict[str, Any]) -> Response:
+    """Build a skipped response that passes the payload text through, i.e. skips Protect."""
+    payload = request_json.get("payload") or dict()
+    return Response(
+        text=payload.get("output") or payload.get("input") or "",
+        status=ExecutionStatus.skipped,
+        trace_metadata=TraceMetadata(),
+    )
@@ -8,11 +8,31 @@ from galileo_core.helpers.project import get_project_from_name
 from galileo_core.schemas.protect.ruleset import Ruleset, RulesetsMixin
 from galileo_core.schemas.protect.stage import StageType, StageWithRulesets
 from galileo_core.utils.name import ts_name
+from galileo_protect.cache import invalidate_stage
 from galileo_protect.constants.routes import Routes
+from galileo_protect.deadline import read_timeout_kwargs
+from galileo_protect.resolution import resolution_cache
 from galileo_protect.schemas.config import ProtectConfig
 from galileo_protect.schemas.stage import StageResponse
 
 
+def _resolve_project_id(project_name: str, config: ProtectConfig) -> UUID4:
+    project_id = resolution_cache.get_project_id(project_name)
+    if project_id is None:
+        project = get_project_from_name(project_name=project_name, raise_if_missing=True, config=config)
+        assert project is not None, "Project should not be None."
+        resolution_cache.set_project(project)
+        project_id = project.id
+    return project_id
+
+
+def _stage_name(project_id: UUID4, stage_id: UUID4, config: ProtectConfig) -> Optional[str]:
+    # Cached responses may be keyed by the stage name only, when its ID wasn't known.
+    if config.stage_id == stage_id and config.stage_name:
+        return config.stage_name
+    return resolution_cache.get_stage_name(project_id, stage_id)
+
+
 def create_stage(
     project_id: Optional[UUID4] = None,
     name: Optional[str] = None,
@@ -70,12 +90,14 @@ def create_stage(
                     prioritized_rulesets=prioritized_rulesets,
                 )
             ).model_dump(mode="json"),
+            **read_timeout_kwargs(),
         )
     )
     config.project_id = project_id
     config.stage_id = stage.id
     config.stage_name = stage.name
     config.stage_version = stage.version
+    resolution_cache.set_stage(stage)
     logger.debug("Stage created successfully.")
     return stage
 
@@ -120,9 +142,7 @@ def get_stage(
     stage_name = stage_name or config.stage_name
     if project_id is None:
         if project_name:
-            project = get_project_from_name(project_name=project_name, raise_if_missing=True, config=config)
-            assert project is not None, "Project should not be None."
-            project_id = project.id
+            project_id = _resolve_project_id(project_name, config)
         else:
             raise ValueError("Project ID or name must be provided to get a stage.")
     params: Dict[str, str] = dict()
@@ -133,11 +153,17 @@ def get_stage(
     if not params:
         raise ValueError("Stage ID or name must be provided to get a stage.")
     stage = StageResponse.model_validate(
-        config.api_client.request(RequestMethod.GET, Routes.stages.format(project_id=project_id), params=params)
+        config.api_client.request(
+            RequestMethod.GET,
+            Routes.stages.format(project_id=project_id),
+            params=params,
+            **read_timeout_kwargs(),
+        )
     )
     config.project_id = project_id
     config.stage_id = stage.id
     config.stage_name = stage.name
+    resolution_cache.set_stage(stage)
     logger.debug("Stage retrieved successfully.")
     return stage
 
@@ -185,6 +211,11 @@ def update_stage(
     project_id = project_id or config.project_id
     stage_id = stage_id or config.stage_id
     stage_name = stage_name or config.stage_name
+    # Resolve the IDs from the cache if possible, to avoid fetching the stage.
+    if project_id is None and project_name:
+        project_id = resolution_cache.get_project_id(project_name)
+    if stage_id is None and project_id is not None and stage_name:
+        stage_id = resolution_cache.get_stage_id(project_id, stage_name)
     if project_id is None or stage_id is None:
         got_stage = get_stage(
             project_id=project_id, project_name=project_name, stage_id=stage_id, stage_name=stage_name
@@ -197,12 +228,16 @@ def update_stage(
             RequestMethod.POST,
             Routes.stage.format(project_id=project_id, stage_id=stage_id),
             json=RulesetsMixin.model_validate(dict(prioritized_rulesets=prioritized_rulesets)).model_dump(mode="json"),
+            **read_timeout_kwargs(),
         )
     )
     config.project_id = project_id
     config.stage_id = stage.id
     config.stage_name = stage.name
     config.stage_version = stage.version
+    resolution_cache.set_stage(stage)
+    # Cached responses were computed with the previous version's rulesets.
+    invalidate_stage(stage_id=stage.id, stage_name=stage.name, project_id=stage.project_id)
     return stage
 
 
@@ -242,9 +277,11 @@ def pause_stage(project_id: Optional[UUID4] = None, stage_id: Optional[UUID4] =
         RequestMethod.PUT,
         Routes.stage.format(project_id=project_id, stage_id=stage_id),
         params=dict(pause=True),
+        **read_timeout_kwargs(),
     )
     config.project_id = project_id
     config.stage_id = stage_id
+    invalidate_stage(stage_id=stage_id, stage_name=_stage_name(project_id, stage_id, config), project_id=project_id)
     logger.debug("Stage paused successfully.")
 
 
@@ -261,7 +298,9 @@ def resume_stage(project_id: Optional[UUID4] = None, stage_id: Optional[UUID4] =
         RequestMethod.PUT,
         Routes.stage.format(project_id=project_id, stage_id=stage_id),
         params=dict(pause=False),
+        **read_timeout_kwargs(),
     )
     config.project_id = project_id
     config.stage_id = stage_id
+    invalidate_stage(stage_id=stage_id, stage_name=_stage_name(project_id, stage_id, config), project_id=project_id)
     logger.debug("Stage resumed successfully.")
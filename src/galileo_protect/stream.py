@@ -0,0 +1,316 @@
+from asyncio import FIRST_COMPLETED, Task, ensure_future, wait
+from concurrent.futures import Future
+from concurrent.futures import wait as wait_futures
+from enum import Enum
+from re import compile
+from time import monotonic
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, List, Optional, Sequence, Union
+
+from pydantic import UUID4
+
+from galileo_core.helpers.logger import logger
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response
+from galileo_protect.constants.invoke import TIMEOUT
+from galileo_protect.constants.stream import WINDOW_SECONDS, WINDOW_TOKENS
+from galileo_protect.execution import async_run
+from galileo_protect.protector import Protector
+from galileo_protect.schemas import Payload, Ruleset
+
+# A sentence ends with a terminal punctuation mark or a newline, optionally followed by
+# closing quotes or brackets and whitespace.
+_SENTENCE_END = compile(r"[.!?\n][\"')\]]*\s*$")
+# Marks the end of an async token stream.
+_END = object()
+
+
+class WindowPolicy(str, Enum):
+    # Check every `window_tokens` tokens.
+    tokens = "tokens"
+    # Check at every sentence boundary.
+    sentence = "sentence"
+    # Check every `window_seconds` seconds.
+    time = "time"
+
+
+class _Window:
+    def __init__(self, policy: WindowPolicy, tokens: int, seconds: float) -> None:
+        self.policy = policy
+        self.max_tokens = tokens
+        self.max_seconds = seconds
+        self.tokens = 0
+        self.started_at = monotonic()
+
+    def add(self, token: str) -> bool:
+        """Add a token, and return whether the window is complete."""
+        self.tokens += 1
+        if self.policy == WindowPolicy.tokens:
+            complete = self.tokens >= self.max_tokens
+        elif self.policy == WindowPolicy.sentence:
+            complete = _SENTENCE_END.search(token) is not None
+        else:
+            complete = monotonic() - self.started_at >= self.max_seconds
+        if complete:
+            self.reset()
+        return complete
+
+    def remaining(self) -> Optional[float]:
+        """Time left until a time window is complete, or None for the other policies."""
+        if self.policy != WindowPolicy.time:
+            return None
+        return max(self.started_at + self.max_seconds - monotonic(), 0)
+
+    def reset(self) -> None:
+        self.tokens = 0
+        self.started_at = monotonic()
+
+
+async def _anext(tokens: AsyncIterator[str]) -> Any:
+    try:
+        return await tokens.__anext__()
+    except StopAsyncIteration:
+        return _END
+
+
+class ProtectStreamGuard:
+    """
+    Guard a token stream from an LLM with Protect, without buffering the whole output.
+
+    Tokens are forwarded as soon as they arrive. Every time a window of tokens is
+    complete, Protect is invoked in the background on the output so far, and once the
+    stream ends, on the full output. As soon as any of those invocations is triggered,
+    the stream is cut and the response text, i.e. the `OverrideAction`'s text, is emitted
+    instead of the remaining tokens. Async streams are cut, and time windows completed,
+    even while waiting for the next token. Sync streams can only be cut, and time windows
+    are only completed, when a token arrives, see `guard`.
+
+    Invocations that fail, e.g. on network errors, are logged and treated as not
+    triggered, so that a guard failure doesn't break a stream that is already being sent.
+    Set `raise_errors` to raise them in the stream instead.
+
+    A guard can be shared by concurrent streams. The response that cut a stream is passed
+    to that stream's `on_trigger` callback. `triggered_response` is only a convenience
+    for guards used for one stream at a time.
+
+    Parameters
+    ----------
+    prioritized_rulesets : Optional[Sequence[Ruleset]], optional
+        Prioritized rulesets to be used for processing. These should only be provided if
+        using a local stage, by default None, i.e. empty list.
+    project_id : Optional[UUID4], optional
+        Project ID to be used for processing, by default None.
+    project_name : Optional[str], optional
+        Project name to be used for processing, by default None.
+    stage_id : Optional[UUID4], optional
+        Stage ID to be used for processing, by default None.
+    stage_name : Optional[str], optional
+        Stage name to be used for processing, by default None.
+    timeout : float, optional
+        Timeout for each request, by default 10 seconds.
+    input : Optional[str], optional
+        Input (prompt) that the output is generated for, by default None.
+    window_policy : Union[WindowPolicy, str], optional
+        When to invoke Protect on the output so far, by default `WindowPolicy.tokens`.
+    window_tokens : int, optional
+        Number of tokens per window for the `tokens` policy, by default 32.
+    window_seconds : float, optional
+        Duration of each window in seconds for the `time` policy, by default 1 second.
+    raise_errors : bool, optional
+        Raise the errors of the invocations in the stream, by default False, i.e. they're
+        logged and the windows are treated as not triggered.
+    """
+
+    def __init__(
+        self,
+        prioritized_rulesets: Optional[Sequence[Ruleset]] = None,
+        project_id: Optional[UUID4] = None,
+        project_name: Optional[str] = None,
+        stage_id: Optional[UUID4] = None,
+        stage_name: Optional[str] = None,
+        timeout: float = TIMEOUT,
+        input: Optional[str] = None,
+        window_policy: Union[WindowPolicy, str] = WindowPolicy.tokens,
+        window_tokens: int = WINDOW_TOKENS,
+        window_seconds: float = WINDOW_SECONDS,
+        raise_errors: bool = False,
+    ) -> None:
+        if window_tokens < 1:
+            raise ValueError("Window tokens must be at least 1.")
+        self.protector = Protector(
+            prioritized_rulesets=prioritized_rulesets,
+            project_id=project_id,
+            project_name=project_name,
+            stage_id=stage_id,
+            stage_name=stage_name,
+            timeout=timeout,
+        )
+        self.input = input
+        self.window_policy = WindowPolicy(window_policy)
+        self.window_tokens = window_tokens
+        self.window_seconds = window_seconds
+        self.raise_errors = raise_errors
+        # Response that cut the last guarded stream, if any.
+        self.triggered_response: Optional[Response] = None
+
+    def _window(self) -> _Window:
+        self.triggered_response = None
+        return _Window(self.window_policy, self.window_tokens, self.window_seconds)
+
+    def _triggered(
+        self, check: Union[Task, Future], on_trigger: Optional[Callable[[Response], Any]]
+    ) -> Optional[Response]:
+        # Response of a finished check if it was triggered.
+        try:
+            response: Response = check.result()
+        except Exception as error:
+            if self.raise_errors:
+                raise
+            logger.warning(f"Protect stream check failed, continuing the stream: {error!r}")
+            return None
+        if response.status != ExecutionStatus.triggered:
+            return None
+        logger.debug("Protect was triggered, cutting the stream.")
+        self.triggered_response = response
+        if on_trigger is not None:
+            try:
+                on_trigger(response)
+            except Exception as error:
+                logger.warning(f"Protect stream callback failed: {error!r}")
+        return response
+
+    def _poll(self, checks: List[Any], on_trigger: Optional[Callable[[Response], Any]]) -> Optional[Response]:
+        # Drop the finished checks that weren't triggered, so that each check is only
+        # looked at once it's done.
+        pending = list()
+        for check in checks:
+            if not check.done():
+                pending.append(check)
+                continue
+            response = self._triggered(check, on_trigger)
+            if response is not None:
+                return response
+        checks[:] = pending
+        return None
+
+    async def aguard(
+        self, tokens: AsyncIterable[str], on_trigger: Optional[Callable[[Response], Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Guard an async token stream.
+
+        Parameters
+        ----------
+        tokens : AsyncIterable[str]
+            Tokens from the LLM.
+        on_trigger : Optional[Callable[[Response], Any]], optional
+            Callback for the response that cut this stream, by default None.
+
+        Yields
+        ------
+        str
+            Tokens, or the response text if Protect was triggered.
+        """
+        window = self._window()
+        output: List[str] = []
+        checks: List[Task] = []
+        checked_tokens = 0
+        iterator = tokens.__aiter__()
+        next_token: Optional[Task] = None
+        try:
+            while True:
+                timeout = window.remaining()
+                if next_token is None and not checks and timeout is None:
+                    # Nothing to wait for but the next token.
+                    token = await _anext(iterator)
+                else:
+                    # Wait for the next token, a check or the end of a time window,
+                    # whichever comes first, so that a stalled stream is still cut.
+                    if next_token is None:
+                        next_token = ensure_future(_anext(iterator))
+                    await wait([next_token, *checks], timeout=timeout, return_when=FIRST_COMPLETED)
+                    response = self._poll(checks, on_trigger)
+                    if response is not None:
+                        yield response.text
+                        return
+                    if not next_token.done():
+                        # The time window is complete without a new token.
+                        if checked_tokens < len(output):
+                            checks.append(ensure_future(self.protector.ainvoke(self._payload(output))))
+                            checked_tokens = len(output)
+                        window.reset()
+                        continue
+                    token, next_token = next_token.result(), None
+                if token is _END:
+                    break
+                yield token
+                output.append(token)
+                if window.add(token):
+                    checks.append(ensure_future(self.protector.ainvoke(self._payload(output))))
+                    checked_tokens = len(output)
+            if output and checked_tokens < len(output):
+                checks.append(ensure_future(self.protector.ainvoke(self._payload(output))))
+            for check in checks:
+                await wait([check])
+                response = self._triggered(check, on_trigger)
+                if response is not None:
+                    yield response.text
+                    return
+        finally:
+            for check in checks:
+                check.cancel()
+            if next_token is not None:
+                next_token.cancel()
+
+    def guard(self, tokens: Iterable[str], on_trigger: Optional[Callable[[Response], Any]] = None) -> Iterator[str]:
+        """
+        Guard a token stream.
+
+        The invocations run on Protect's background event loop, so they don't block the
+        stream. The finished invocations are only looked at, and time windows are only
+        completed, when a token arrives: a triggered invocation doesn't cut a stream that
+        stalls before its next token, use `aguard` for that.
+
+        Parameters
+        ----------
+        tokens : Iterable[str]
+            Tokens from the LLM.
+        on_trigger : Optional[Callable[[Response], Any]], optional
+            Callback for the response that cut this stream, by default None.
+
+        Yields
+        ------
+        str
+            Tokens, or the response text if Protect was triggered.
+        """
+        window = self._window()
+        output: List[str] = []
+        checks: List[Future] = []
+        checked_tokens = 0
+        try:
+            for token in tokens:
+                response = self._poll(checks, on_trigger)
+                if response is not None:
+                    yield response.text
+                    return
+                yield token
+                output.append(token)
+                if window.add(token):
+                    checks.append(self._submit(output))
+                    checked_tokens = len(output)
+            if output and checked_tokens < len(output):
+                checks.append(self._submit(output))
+            for check in checks:
+                wait_futures([check])
+                response = self._triggered(check, on_trigger)
+                if response is not None:
+                    yield response.text
+                    return
+        finally:
+            for check in checks:
+                check.cancel()
+
+    def _payload(self, output: List[str]) -> Payload:
+        return Payload(input=self.input, output="".join(output))
+
+    def _submit(self, output: List[str]) -> Future:
+        return async_run(self.protector.ainvoke(self._payload(output)), wait_for_result=False)
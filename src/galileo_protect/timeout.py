@@ -0,0 +1,167 @@
+from threading import Lock
+from typing import Any, Dict, NamedTuple, Tuple, Union
+
+from galileo_core.helpers.logger import logger
+from galileo_core.schemas.protect.response import Response
+from galileo_protect.cache import stage_key
+from galileo_protect.constants.invoke import TIMEOUT, TIMEOUT_MARGIN
+from galileo_protect.constants.latency import MIN_SAMPLES, WINDOW_SAMPLES
+from galileo_protect.constants.timeout import FLOOR, MIN_READ_MARGIN, MULTIPLIER, PERCENTILE
+from galileo_protect.latency import LatencyWindow
+from galileo_protect.schemas import RawResponse
+
+
+class Timeouts(NamedTuple):
+    # Timeout sent to the server, for processing the request.
+    timeout: float
+    # Timeout for reading the response on the client.
+    read_timeout: float
+
+
+class _StageLatencies(NamedTuple):
+    # Server-side execution time.
+    execution: LatencyWindow
+    # Time spent outside of the server-side execution, i.e. network and queueing.
+    network: LatencyWindow
+
+
+class AdaptiveTimeout:
+    """
+    Timeouts derived from the observed Protect latency, per project and stage.
+
+    The server-side execution time (from the response's trace metadata) and the network
+    time (the rest of the round trip) are tracked in rolling windows for each project and
+    stage. The server-side timeout is the target percentile of the execution time times
+    the multiplier, bounded by the floor and ceiling, and the client read timeout adds the
+    same percentile of the network time, times the multiplier, to that. Until enough
+    latencies have been observed, the ceiling and the default timeout margin are used.
+
+    Pass an instance as the `timeout` to `invoke` or `ainvoke` to use it, and share it
+    between invocations. It is safe to share across threads and event loops.
+
+    Parameters
+    ----------
+    percentile : float, optional
+        Target percentile of the observed latencies, by default 99.
+    multiplier : float, optional
+        Multiplier applied to the target percentile, by default 2.
+    floor : float, optional
+        Minimum server-side timeout in seconds, by default 0.5 seconds.
+    ceiling : float, optional
+        Maximum server-side timeout in seconds, by default 10 seconds.
+    max_samples : int, optional
+        Number of most recent latencies to keep per project and stage, by default 1024.
+    min_samples : int, optional
+        Minimum number of latencies before adapting the timeouts, by default 20.
+
+    Raises
+    ------
+    ValueError
+        If the percentile, multiplier or bounds are invalid.
+    """
+
+    def __init__(
+        self,
+        percentile: float = PERCENTILE,
+        multiplier: float = MULTIPLIER,
+        floor: float = FLOOR,
+        ceiling: float = TIMEOUT,
+        max_samples: int = WINDOW_SAMPLES,
+        min_samples: int = MIN_SAMPLES,
+    ) -> None:
+        if not 0 < percentile <= 100:
+            raise ValueError("Timeout percentile must be between 0 and 100.")
+        if multiplier < 1:
+            raise ValueError("Timeout multiplier must be at least 1.")
+        if not 0 < floor <= ceiling:
+            raise ValueError("Timeout floor must be positive and at most the ceiling.")
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.floor = floor
+        self.ceiling = ceiling
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self._lock = Lock()
+        self._latencies: Dict[Tuple[str, str], _StageLatencies] = dict()
+
+    def timeouts(self, request_json: Dict[str, Any]) -> Timeouts:
+        """
+        Get the timeouts for a request.
+
+        Parameters
+        ----------
+        request_json : Dict[str, Any]
+            Request serialized in JSON mode.
+
+        Returns
+        -------
+        Timeouts
+            Server-side timeout and client read timeout, in seconds.
+        """
+        latencies = self._latencies.get(stage_key(request_json))
+        execution = latencies.execution.percentile(self.percentile) if latencies else None
+        if latencies is None or execution is None:
+            return Timeouts(self.ceiling, self.ceiling + TIMEOUT_MARGIN)
+        timeout = min(max(execution * self.multiplier, self.floor), self.ceiling)
+        network = latencies.network.percentile(self.percentile) or 0.0
+        margin = min(max(network * self.multiplier, MIN_READ_MARGIN), TIMEOUT_MARGIN)
+        return Timeouts(timeout, timeout + margin)
+
+    def observe(self, request_json: Dict[str, Any], response: Union[Response, RawResponse], elapsed: float) -> None:
+        """
+        Record the latency of a completed request.
+
+        Parameters
+        ----------
+        request_json : Dict[str, Any]
+            Request serialized in JSON mode.
+        response : Union[Response, RawResponse]
+            Response for the request.
+        elapsed : float
+            Round-trip time of the request, in seconds.
+        """
+        execution_time = (
+            response.trace_metadata.execution_time if isinstance(response, Response) else response.execution_time
+        )
+        # The execution time isn't known for every response, count all of it as execution.
+        if execution_time < 0 or execution_time > elapsed:
+            execution_time = elapsed
+        self._add(request_json, execution_time, elapsed)
+        logger.debug(f"Observed Protect latency of {elapsed:.3f}s, with {execution_time:.3f}s of execution.")
+
+    def observe_timeout(self, request_json: Dict[str, Any], read_timeout: float) -> None:
+        """
+        Record a request that timed out on the client.
+
+        The request took at least the read timeout, which is recorded as its latency, with
+        the server-side timeout as the execution time. Otherwise, the requests cut by a
+        timeout that is too short would never raise it.
+
+        Parameters
+        ----------
+        request_json : Dict[str, Any]
+            Request serialized in JSON mode, with the server-side timeout it was sent with.
+        read_timeout : float
+            Read timeout the request was cut by, in seconds.
+        """
+        self._add(request_json, min(request_json.get("timeout", read_timeout), read_timeout), read_timeout)
+        logger.debug(f"Observed Protect request timing out after {read_timeout:.3f}s.")
+
+    def _add(self, request_json: Dict[str, Any], execution_time: float, elapsed: float) -> None:
+        key = stage_key(request_json)
+        latencies = self._latencies.get(key)
+        if latencies is None:
+            with self._lock:
+                latencies = self._latencies.setdefault(
+                    key,
+                    _StageLatencies(
+                        LatencyWindow(self.max_samples, self.min_samples),
+                        LatencyWindow(self.max_samples, self.min_samples),
+                    ),
+                )
+        latencies.execution.add(execution_time)
+        latencies.network.add(elapsed - execution_time)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._latencies.clear()
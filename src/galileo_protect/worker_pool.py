@@ -0,0 +1,340 @@
+from asyncio import AbstractEventLoop, Event, Semaphore, Task, create_task, gather, get_running_loop, sleep, wrap_future
+from collections import deque
+from concurrent.futures import Future
+from copy import copy
+from threading import Lock
+from types import TracebackType
+from typing import Deque, Dict, List, NamedTuple, Optional, Set, Type
+
+from pydantic import BaseModel, Field
+
+from galileo_core.helpers.logger import logger
+from galileo_core.schemas.protect.response import Response
+from galileo_protect.client import ProtectClient
+from galileo_protect.constants.worker_pool import BATCH_WINDOW, MAX_BATCH_SIZE, MAX_IN_FLIGHT, MAX_QUEUE_SIZE
+from galileo_protect.deadline import get_deadline, use_deadline
+from galileo_protect.exceptions import WorkerPoolFullError
+from galileo_protect.execution import async_run
+from galileo_protect.protector import Protector
+from galileo_protect.schemas import Payload
+
+
+class WorkerPoolStats(BaseModel):
+    submitted: int = Field(default=0, description="Number of payloads submitted.")
+    completed: int = Field(default=0, description="Number of invocations that returned a response.")
+    failed: int = Field(default=0, description="Number of invocations that raised an exception.")
+    rejected: int = Field(default=0, description="Number of payloads rejected because the queue was full.")
+    batches: int = Field(default=0, description="Number of batches dispatched.")
+    queued: int = Field(default=0, description="Number of payloads currently waiting to be dispatched.")
+
+
+class _Item(NamedTuple):
+    payload: Payload
+    metadata: Optional[Dict[str, str]]
+    headers: Optional[Dict[str, str]]
+    future: Future
+    # Deadline of the submitting context, the dispatcher runs in its own context.
+    deadline: Optional[float]
+
+
+class ProtectWorkerPool:
+    """
+    Micro-batching worker pool for high volumes of independent Protect invocations.
+
+    Payloads can be submitted from any thread or event loop. They are gathered into
+    batches, and each batch is dispatched together on Protect's background event loop,
+    over a shared connection pool, with at most `max_in_flight` requests in flight. Each
+    caller's future is resolved individually. Gathering payloads means that the
+    background loop is woken up once per batch, instead of once per invocation.
+
+    By default, a batch is whatever was submitted while the loop was busy, so batches
+    grow with the load without delaying any call. A `batch_window` additionally waits
+    for more payloads before dispatching a batch that isn't full, trading latency for
+    larger batches.
+
+    When the queue is full, `submit` raises `WorkerPoolFullError` instead of queueing
+    more work than the backend can keep up with. On shutdown, the queued payloads are
+    still dispatched, unless they are cancelled.
+
+    Examples
+    --------
+    ```python
+    with ProtectWorkerPool(Protector(stage_id=stage_id)) as pool:
+        response = await pool.ainvoke(payload)
+    ```
+
+    Parameters
+    ----------
+    protector : Optional[Protector], optional
+        Protector to invoke with, by default None, i.e. the project and stage from the
+        config. If it doesn't have a client, the pool uses its own `ProtectClient`.
+    batch_window : float, optional
+        Seconds to wait for more payloads before dispatching a batch that isn't full, by
+        default 0, i.e. don't wait.
+    max_batch_size : int, optional
+        Maximum number of payloads dispatched together, by default 64.
+    max_queue_size : int, optional
+        Maximum number of payloads waiting to be dispatched, by default 10,000.
+    max_in_flight : int, optional
+        Maximum number of requests in flight, by default 100.
+
+    Raises
+    ------
+    ValueError
+        If the batch size, queue size or number of requests in flight is less than 1.
+    """
+
+    def __init__(
+        self,
+        protector: Optional[Protector] = None,
+        batch_window: float = BATCH_WINDOW,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_queue_size: int = MAX_QUEUE_SIZE,
+        max_in_flight: int = MAX_IN_FLIGHT,
+    ) -> None:
+        if min(max_batch_size, max_queue_size, max_in_flight) < 1:
+            raise ValueError("Batch size, queue size and requests in flight must be at least 1.")
+        self.protector = protector or Protector()
+        self._client: Optional[ProtectClient] = None
+        if self.protector.client is None:
+            # Don't change the protector that was passed in, it may be used elsewhere.
+            self.protector = copy(self.protector)
+            self._client = self.protector.client = ProtectClient(max_connections=max_in_flight)
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
+        self.max_in_flight = max_in_flight
+        self._lock = Lock()
+        self._queue: Deque[_Item] = deque()
+        self._closed = False
+        # Set by the dispatcher, which runs on the background loop.
+        self._loop: Optional[AbstractEventLoop] = None
+        self._wakeup: Optional[Event] = None
+        self._idle = False
+        self._dispatcher: Optional[Future] = None
+        self._stats = WorkerPoolStats()
+
+    @property
+    def stats(self) -> WorkerPoolStats:
+        with self._lock:
+            return self._stats.model_copy(update=dict(queued=len(self._queue)))
+
+    def _wake(self) -> None:
+        # Called with the lock held.
+        if self._idle and self._loop is not None and self._wakeup is not None:
+            self._idle = False
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def submit(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> "Future[Response]":
+        """
+        Submit a payload to be invoked.
+
+        Parameters
+        ----------
+        payload : Payload
+            Payload to be processed.
+        metadata : Optional[Dict[str, str]], optional
+            Metadata to be added when responding, by default None.
+        headers : Optional[Dict[str, str]], optional
+            Headers to be added to the response, by default None.
+
+        Returns
+        -------
+        Future[Response]
+            Future for the response from the Protect API. Cancelling it before it's
+            dispatched skips the invocation.
+
+        Raises
+        ------
+        WorkerPoolFullError
+            If the queue is full.
+        RuntimeError
+            If the pool is shut down.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Worker pool is shut down.")
+            if len(self._queue) >= self.max_queue_size:
+                self._stats.rejected += 1
+                raise WorkerPoolFullError(f"Worker pool queue is full with {self.max_queue_size} payloads.")
+            self._queue.append(_Item(payload, metadata, headers, future, get_deadline()))
+            self._stats.submitted += 1
+            if self._dispatcher is None:
+                self._dispatcher = async_run(self._dispatch(), wait_for_result=False)
+            self._wake()
+        return future
+
+    async def ainvoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """
+        Asynchronously invoke Protect with the given payload, through the pool.
+
+        Parameters
+        ----------
+        payload : Payload
+            Payload to be processed.
+        metadata : Optional[Dict[str, str]], optional
+            Metadata to be added when responding, by default None.
+        headers : Optional[Dict[str, str]], optional
+            Headers to be added to the response, by default None.
+
+        Returns
+        -------
+        Response
+            Response from the Protect API.
+        """
+        return await wrap_future(self.submit(payload, metadata=metadata, headers=headers))
+
+    def invoke(
+        self,
+        payload: Payload,
+        metadata: Optional[Dict[str, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        """
+        Invoke Protect with the given payload, through the pool.
+
+        Parameters
+        ----------
+        payload : Payload
+            Payload to be processed.
+        metadata : Optional[Dict[str, str]], optional
+            Metadata to be added when responding, by default None.
+        headers : Optional[Dict[str, str]], optional
+            Headers to be added to the response, by default None.
+
+        Returns
+        -------
+        Response
+            Response from the Protect API.
+        """
+        return self.submit(payload, metadata=metadata, headers=headers).result()
+
+    async def _invoke(self, item: _Item, semaphore: Semaphore) -> None:
+        try:
+            with use_deadline(item.deadline):
+                response = await self.protector.ainvoke(item.payload, metadata=item.metadata, headers=item.headers)
+        except Exception as exc:
+            # Only updated on the background loop, so these don't need the lock.
+            self._stats.failed += 1
+            item.future.set_exception(exc)
+        else:
+            self._stats.completed += 1
+            item.future.set_result(response)
+        finally:
+            semaphore.release()
+
+    def _next_batch(self) -> List[_Item]:
+        with self._lock:
+            batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch_size))]
+            self._stats.batches += bool(batch)
+        return batch
+
+    async def _dispatch(self) -> None:
+        semaphore = Semaphore(self.max_in_flight)
+        tasks: Set[Task] = set()
+        with self._lock:
+            self._loop = get_running_loop()
+            self._wakeup = Event()
+        while True:
+            with self._lock:
+                size = len(self._queue)
+                if not size:
+                    if self._closed:
+                        break
+                    # Clear the event while holding the lock, so a submit can't be missed.
+                    self._idle = True
+                    self._wakeup.clear()
+            if not size:
+                await self._wakeup.wait()
+                continue
+            if size < self.max_batch_size and self.batch_window > 0 and not self._closed:
+                await sleep(self.batch_window)
+            batch = self._next_batch()
+            logger.debug(f"Dispatching a batch of {len(batch)} Protect invocations.")
+            for item in batch:
+                # Wait for a free slot, the queue fills up meanwhile, which is the
+                # backpressure for `submit`.
+                await semaphore.acquire()
+                if not item.future.set_running_or_notify_cancel():
+                    semaphore.release()
+                    continue
+                task = create_task(self._invoke(item, semaphore))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        if tasks:
+            await gather(*tasks)
+        if self._client is not None:
+            await self._client.aclose()
+
+    def _close(self, cancel_pending: bool) -> Optional[Future]:
+        with self._lock:
+            self._closed = True
+            if cancel_pending:
+                while self._queue:
+                    self._queue.popleft().future.cancel()
+            self._wake()
+            return self._dispatcher
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """
+        Shut down the pool, after dispatching the queued payloads.
+
+        Don't wait for the shutdown from Protect's background event loop, e.g. inside
+        `invoke`, since that's where the payloads are dispatched.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            Wait for all queued and in-flight invocations to complete, by default True.
+        cancel_pending : bool, optional
+            Cancel the queued payloads instead of dispatching them, by default False.
+        """
+        dispatcher = self._close(cancel_pending)
+        if wait and dispatcher is not None:
+            dispatcher.result()
+
+    async def ashutdown(self, cancel_pending: bool = False) -> None:
+        """
+        Shut down the pool and wait for all queued and in-flight invocations to complete.
+
+        Parameters
+        ----------
+        cancel_pending : bool, optional
+            Cancel the queued payloads instead of dispatching them, by default False.
+        """
+        dispatcher = self._close(cancel_pending)
+        if dispatcher is not None:
+            await wrap_future(dispatcher)
+
+    def __enter__(self) -> "ProtectWorkerPool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self.shutdown()
+
+    async def __aenter__(self) -> "ProtectWorkerPool":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        await self.ashutdown()
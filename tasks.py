@@ -33,3 +33,13 @@ def type_check(ctx: Context) -> None:
 @task
 def docs_build(ctx: Context) -> None:
     ctx.run("poetry run mkdocs build", echo=True)
+
+
+@task
+def benchmark(ctx: Context, output: str = "", compare: str = "") -> None:
+    command = "poetry run python -m benchmarks.suite"
+    if output:
+        command += f" --output {output}"
+    if compare:
+        command += f" --compare {compare}"
+    ctx.run(command, **COMMON_PARAMS)
@@ -1,9 +1,13 @@
+from json import loads
 from pathlib import Path
 from typing import Callable, Generator, List, Optional
 from unittest.mock import Mock, patch
 from uuid import UUID, uuid4
 
+from httpx import Request as HttpxRequest
+from httpx import Response as HttpxResponse
 from pytest import FixtureRequest, MonkeyPatch, fixture
+from respx import MockRouter, Route
 
 from galileo_core.constants.request_method import RequestMethod
 from galileo_core.constants.routes import Routes as CoreRoutes
@@ -14,7 +18,7 @@ from galileo_core.schemas.protect.rule import Rule, RuleOperator
 from galileo_core.schemas.protect.ruleset import Ruleset
 from galileo_protect.constants.routes import Routes
 from galileo_protect.schemas.config import ProtectConfig
-from tests.data import A_CONSOLE_URL, A_JWT_TOKEN, A_PROTECT_INPUT
+from tests.data import A_CONSOLE_URL, A_JWT_TOKEN, A_PROTECT_INPUT, a_response
 
 
 @fixture
@@ -75,6 +79,22 @@ def set_validated_config(
     return
 
 
+@fixture
+def mock_echo_invoke(respx_mock: MockRouter) -> Generator[Callable[..., Route], None, None]:
+    def curry(failing_input: str = "fail") -> Route:
+        """Mock the invoke route to echo the payload input, and fail for `failing_input`."""
+
+        def side_effect(request: HttpxRequest) -> HttpxResponse:
+            payload = loads(request.content)["payload"]
+            if payload["input"] == failing_input:
+                return HttpxResponse(500, text="Internal Server Error")
+            return HttpxResponse(200, json=a_response(payload["input"]).model_dump(mode="json"))
+
+        return respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(side_effect=side_effect)
+
+    yield curry
+
+
 @fixture
 def mock_invoke(mock_request: Mock) -> Generator[None, None, None]:
     matcher = mock_request(
@@ -1,3 +1,11 @@
+from typing import Any, Optional, Union
+
+from galileo_core.schemas.protect.action import OverrideAction
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_core.schemas.protect.rule import Rule, RuleOperator
+from galileo_core.schemas.protect.ruleset import Ruleset
+
 A_CONSOLE_URL = "https://console.test.rungalileo.io/"
 A_PROJECT_NAME = "project_name"
 A_STAGE_NAME = "stage_name"
@@ -11,3 +19,19 @@ A_TRACE_METADATA_DICT = {
         "execution_time": 0.46,
     }
 }
+
+
+def a_rule(metric: str, operator: RuleOperator = RuleOperator.not_empty, target_value: Any = None) -> Rule:
+    return Rule(metric=metric, operator=operator, target_value=target_value)
+
+
+def a_ruleset(*rules: Union[Rule, str], choice: Optional[str] = None) -> Ruleset:
+    """Ruleset of rules, or of `not_empty` rules on metric names, overridden with `choice` if provided."""
+    action = dict(action=OverrideAction(choices=[choice])) if choice is not None else dict()
+    return Ruleset(rules=[rule if isinstance(rule, Rule) else a_rule(rule) for rule in rules], **action)
+
+
+def a_response(
+    text: str = A_PROTECT_INPUT, status: ExecutionStatus = ExecutionStatus.not_triggered, **trace_metadata: Any
+) -> Response:
+    return Response(text=text, status=status, trace_metadata=TraceMetadata(**trace_metadata))
@@ -0,0 +1,39 @@
+from json import dumps
+
+from pytest import mark
+
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response
+from galileo_protect.schemas import RawResponse
+from tests.data import A_TRACE_METADATA_DICT
+
+
+@mark.parametrize(
+    ["status", "expected_status"],
+    [("TRIGGERED", ExecutionStatus.triggered), ("not_triggered", ExecutionStatus.not_triggered)],
+)
+def test_from_json(status: str, expected_status: ExecutionStatus) -> None:
+    content = dumps({"text": "foo", "status": status, **A_TRACE_METADATA_DICT}).encode()
+    raw = RawResponse.from_json(content)
+    assert raw.text == "foo"
+    assert raw.status == expected_status
+    assert raw.execution_time == A_TRACE_METADATA_DICT["trace_metadata"]["execution_time"]
+    assert raw.trace_id == A_TRACE_METADATA_DICT["trace_metadata"]["id"]
+    response = raw.to_response()
+    assert response == Response.model_validate_json(content)
+    # The model is only built once.
+    assert raw.to_response() is response
+
+
+def test_from_response() -> None:
+    response = Response.model_validate({"text": "foo", "status": "TRIGGERED", **A_TRACE_METADATA_DICT})
+    raw = RawResponse.from_response(response)
+    assert raw.text == "foo"
+    assert raw.status == ExecutionStatus.triggered
+    assert raw.to_response() is response
+
+
+def test_slots() -> None:
+    raw = RawResponse.from_json(dumps({"text": "foo", **A_TRACE_METADATA_DICT}))
+    assert not hasattr(raw, "__dict__")
+    assert raw.status == ExecutionStatus.not_triggered
@@ -0,0 +1,159 @@
+from asyncio import CancelledError, create_task, sleep
+from queue import Queue
+from typing import Callable, List
+from uuid import uuid4
+
+from httpx import Request as HttpxRequest
+from httpx import Response as HttpxResponse
+from pytest import mark, raises
+from respx import MockRouter
+
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_protect.budget import InvocationBudget
+from galileo_protect.constants.routes import Routes
+from galileo_protect.invocation import ainvoke, invoke
+from galileo_protect.protector import Protector
+from galileo_protect.schemas import Payload, RawResponse
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME
+
+A_REQUEST_JSON = dict(payload=dict(input=A_PROTECT_INPUT))
+
+
+def a_call(delay: float, cancelled: List[bool], fail: bool = False) -> Callable:
+    async def call() -> Response:
+        try:
+            await sleep(delay)
+        except CancelledError:
+            cancelled.append(True)
+            raise
+        if fail:
+            raise ValueError("failed")
+        return Response(text="late", status=ExecutionStatus.triggered, trace_metadata=TraceMetadata())
+
+    return call
+
+
+def mock_slow_invoke(respx_mock: MockRouter, delay: float) -> None:
+    async def side_effect(request: HttpxRequest) -> HttpxResponse:
+        await sleep(delay)
+        return HttpxResponse(
+            200,
+            json=Response(text="late", status="TRIGGERED", trace_metadata=TraceMetadata()).model_dump(mode="json"),
+        )
+
+    respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(side_effect=side_effect)
+
+
+class TestInvocationBudget:
+    @mark.asyncio
+    async def test_within_budget(self) -> None:
+        budget = InvocationBudget(1)
+        response = await budget.run(A_REQUEST_JSON, a_call(0, []))
+        assert response.text == "late"
+        stats = budget.stats
+        assert (stats.requests, stats.exceeded) == (1, 0)
+
+    @mark.asyncio
+    async def test_exceeded_completes_in_background(self) -> None:
+        responses: List[Response] = []
+        cancelled: List[bool] = []
+        budget = InvocationBudget(0.01, on_complete=responses.append)
+        response = await budget.run(A_REQUEST_JSON, a_call(0.05, cancelled))
+        # The default fallback passes the payload through.
+        assert (response.text, response.status) == (A_PROTECT_INPUT, ExecutionStatus.skipped)
+        assert budget.pending == 1
+        await sleep(0.1)
+        assert not cancelled
+        assert [response.text for response in responses] == ["late"]
+        assert budget.pending == 0
+        stats = budget.stats
+        assert (stats.requests, stats.exceeded, stats.completed_late, stats.failed_late) == (1, 1, 1, 0)
+
+    @mark.asyncio
+    async def test_custom_fallback(self) -> None:
+        fallback = Response(text="blocked", status=ExecutionStatus.triggered, trace_metadata=TraceMetadata())
+        budget = InvocationBudget(0.01, fallback=fallback)
+        response = await budget.run(A_REQUEST_JSON, a_call(0.05, []))
+        assert response == fallback
+        # Callers can't mutate the shared fallback.
+        assert response is not fallback
+
+    @mark.asyncio
+    async def test_failed_late(self) -> None:
+        responses: List[Response] = []
+        budget = InvocationBudget(0.01, on_complete=responses.append)
+        await budget.run(A_REQUEST_JSON, a_call(0.02, [], fail=True))
+        await sleep(0.05)
+        assert not responses
+        assert budget.stats.failed_late == 1
+
+    @mark.asyncio
+    async def test_failure_within_budget(self) -> None:
+        budget = InvocationBudget(1)
+        with raises(ValueError, match="failed"):
+            await budget.run(A_REQUEST_JSON, a_call(0, [], fail=True))
+
+    @mark.asyncio
+    async def test_callback_error(self) -> None:
+        def on_complete(response: Response) -> None:
+            raise ValueError("callback failed")
+
+        budget = InvocationBudget(0.01, on_complete=on_complete)
+        await budget.run(A_REQUEST_JSON, a_call(0.02, []))
+        await sleep(0.05)
+        assert budget.stats.completed_late == 1
+
+    @mark.asyncio
+    async def test_cancelled_caller_cancels_request(self) -> None:
+        cancelled: List[bool] = []
+        budget = InvocationBudget(1)
+        task = create_task(budget.run(A_REQUEST_JSON, a_call(1, cancelled)))
+        await sleep(0.01)
+        task.cancel()
+        with raises(CancelledError):
+            await task
+        await sleep(0)
+        assert cancelled == [True]
+
+    def test_invalid(self) -> None:
+        with raises(ValueError, match="Budget must be positive"):
+            InvocationBudget(0)
+
+
+@mark.asyncio
+async def test_ainvoke_budget(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_slow_invoke(respx_mock, 0.1)
+    responses: List[Response] = []
+    budget = InvocationBudget(0.01, on_complete=responses.append)
+    response = await ainvoke(payload=Payload(input=A_PROTECT_INPUT), budget=budget)
+    assert response.status == ExecutionStatus.skipped
+    await sleep(0.2)
+    assert [(response.text, response.status) for response in responses] == [("late", ExecutionStatus.triggered)]
+
+
+@mark.asyncio
+async def test_protector_budget_raw(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_slow_invoke(respx_mock, 0.1)
+    responses: List[Response] = []
+    protector = Protector(budget=InvocationBudget(0.01, on_complete=responses.append))
+    response = await protector.ainvoke(Payload(input=A_PROTECT_INPUT), result_mode="raw")
+    assert isinstance(response, RawResponse)
+    assert response.text == A_PROTECT_INPUT
+    await sleep(0.2)
+    # Late responses are always delivered as full responses.
+    assert isinstance(responses[0], Response)
+
+
+def test_invoke_budget_queue(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_slow_invoke(respx_mock, 0.1)
+    late: Queue = Queue()
+    response = invoke(
+        payload=Payload(input=A_PROTECT_INPUT), budget=InvocationBudget(0.01, on_complete=late.put_nowait)
+    )
+    assert response.text == A_PROTECT_INPUT
+    # The request completes on the background loop.
+    assert late.get(timeout=5).text == "late"
@@ -0,0 +1,164 @@
+from typing import Callable
+from unittest.mock import Mock, patch
+from uuid import uuid4
+
+from pytest import mark, raises
+
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_protect.cache import ResponseCache, invalidate_stage, request_key
+from galileo_protect.invocation import ainvoke, invoke
+from galileo_protect.schemas import Payload, Request
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME, a_response
+
+
+def a_request_json(text: str = A_PROTECT_INPUT, timeout: float = 10, stage_name: str = A_STAGE_NAME) -> dict:
+    return Request(payload=Payload(input=text), project_id=uuid4(), stage_name=stage_name, timeout=timeout).model_dump(
+        mode="json"
+    )
+
+
+class TestRequestKey:
+    def test_stable(self) -> None:
+        request_json = a_request_json()
+        assert request_key(request_json) == request_key(dict(request_json))
+
+    def test_ignores_timeout(self) -> None:
+        request_json = a_request_json()
+        assert request_key(request_json) == request_key({**request_json, "timeout": 60})
+
+    @mark.parametrize(
+        "changes",
+        [
+            {"payload": {"input": "other", "output": None}},
+            {"stage_name": "other"},
+            {"metadata": {"key": "value"}},
+            {"rulesets": [{"rules": [{"metric": "pii", "operator": "empty", "target_value": None}]}]},
+        ],
+    )
+    def test_changes(self, changes: dict) -> None:
+        request_json = a_request_json()
+        assert request_key(request_json) != request_key({**request_json, **changes})
+
+    def test_stage_version(self) -> None:
+        request_json = a_request_json()
+        assert request_key(request_json, stage_version=1) != request_key(request_json, stage_version=2)
+
+
+class TestResponseCache:
+    def test_hit_miss(self) -> None:
+        cache = ResponseCache()
+        assert cache.get("key") is None
+        cache.set("key", a_response())
+        response = cache.get("key")
+        assert response is not None
+        assert response.text == A_PROTECT_INPUT
+        stats = cache.stats
+        assert stats.hits == 1
+        assert stats.misses == 1
+        assert stats.entries == 1
+        assert stats.size_bytes > 0
+
+    @mark.parametrize(
+        ["status", "cached"],
+        [
+            (ExecutionStatus.triggered, True),
+            (ExecutionStatus.not_triggered, True),
+            (ExecutionStatus.error, False),
+            (ExecutionStatus.timeout, False),
+            (ExecutionStatus.paused, False),
+        ],
+    )
+    def test_cacheable_statuses(self, status: ExecutionStatus, cached: bool) -> None:
+        cache = ResponseCache()
+        cache.set("key", a_response(status=status))
+        assert (cache.get("key") is not None) == cached
+
+    def test_max_entries(self) -> None:
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", a_response())
+        cache.set("b", a_response())
+        # Touch `a` so that `b` is the least recently used.
+        assert cache.get("a") is not None
+        cache.set("c", a_response())
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.stats.evictions == 1
+
+    def test_max_bytes(self) -> None:
+        response = a_response()
+        size = len("a") + len(response.model_dump_json())
+        cache = ResponseCache(max_bytes=size * 2)
+        for key in ["a", "b", "c"]:
+            cache.set(key, response)
+        assert len(cache) == 2
+        assert cache.stats.size_bytes <= size * 2
+        # Entries larger than the cache are never stored.
+        cache.set("large", a_response(text="x" * size * 2))
+        assert cache.get("large") is None
+
+    def test_ttl(self) -> None:
+        cache = ResponseCache(ttl=10)
+        with patch("galileo_protect.cache.monotonic", return_value=0):
+            cache.set("key", a_response())
+        with patch("galileo_protect.cache.monotonic", return_value=5):
+            assert cache.get("key") is not None
+        with patch("galileo_protect.cache.monotonic", return_value=11):
+            assert cache.get("key") is None
+        assert len(cache) == 0
+        assert cache.stats.evictions == 1
+
+    def test_invalidate(self) -> None:
+        cache = ResponseCache()
+        request_json = a_request_json()
+        cache.set("key", a_response(), request_json=request_json)
+        cache.set("other", a_response(), request_json=a_request_json(stage_name="other"))
+        invalidate_stage(stage_name=A_STAGE_NAME)
+        assert cache.get("key") is None
+        assert cache.get("other") is not None
+
+    def test_invalidate_project(self) -> None:
+        cache = ResponseCache()
+        request_json = a_request_json()
+        cache.set("key", a_response(), request_json=request_json)
+        cache.set("other", a_response(), request_json=a_request_json())
+        invalidate_stage(stage_name=A_STAGE_NAME, project_id=request_json["project_id"])
+        assert cache.get("key") is None
+        # Stages with the same name in other projects are kept.
+        assert cache.get("other") is not None
+
+    def test_clear(self) -> None:
+        cache = ResponseCache()
+        cache.set("key", a_response())
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats == ResponseCache().stats
+
+    def test_invalid_max_entries(self) -> None:
+        with raises(ValueError, match="Max entries must be at least 1."):
+            ResponseCache(max_entries=0)
+
+
+def test_invoke_cached(mock_invoke: Mock, set_validated_config: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    cache = ResponseCache()
+    for _ in range(3):
+        response = invoke(payload=Payload(input=A_PROTECT_INPUT), cache=cache)
+        assert response.text == A_PROTECT_INPUT
+    assert mock_invoke.call_count == 1
+    assert cache.stats.hits == 2
+    assert cache.stats.misses == 1
+
+
+@mark.asyncio
+async def test_ainvoke_cached_stage_version(mock_invoke: Mock, set_validated_config: Callable) -> None:
+    config = set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    cache = ResponseCache()
+    await ainvoke(payload=Payload(input=A_PROTECT_INPUT), cache=cache)
+    await ainvoke(payload=Payload(input=A_PROTECT_INPUT), cache=cache)
+    assert mock_invoke.call_count == 1
+    # A new stage version is a different key.
+    config.stage_version = 1
+    await ainvoke(payload=Payload(input=A_PROTECT_INPUT), cache=cache)
+    assert mock_invoke.call_count == 2
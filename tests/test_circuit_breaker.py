@@ -0,0 +1,139 @@
+from typing import Callable, List
+from unittest.mock import patch
+from uuid import uuid4
+
+from httpx import Response as HttpxResponse
+from pytest import mark, raises
+from respx import MockRouter
+
+from galileo_core.exceptions.http import GalileoHTTPException
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_protect.circuit_breaker import CircuitBreaker, CircuitPolicy, CircuitState, CircuitTransition
+from galileo_protect.constants.routes import Routes
+from galileo_protect.exceptions import CircuitOpenError
+from galileo_protect.invocation import ainvoke
+from galileo_protect.protector import Protector
+from galileo_protect.schemas import Payload, RawResponse, ResultMode
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME
+
+A_PROJECT_ID = str(uuid4())
+A_REQUEST = dict(project_id=A_PROJECT_ID, stage_name=A_STAGE_NAME, payload=dict(input=A_PROTECT_INPUT))
+
+
+async def succeed() -> Response:
+    return Response(text=A_PROTECT_INPUT, trace_metadata=TraceMetadata())
+
+
+async def time_out() -> Response:
+    return Response(text=A_PROTECT_INPUT, status=ExecutionStatus.timeout, trace_metadata=TraceMetadata())
+
+
+async def fail() -> Response:
+    raise GalileoHTTPException("Internal Server Error", 500, "")
+
+
+async def reject() -> Response:
+    raise GalileoHTTPException("Unprocessable Entity", 422, "")
+
+
+async def call(breaker: CircuitBreaker, fn: Callable) -> None:
+    try:
+        await breaker.run(A_REQUEST, fn)
+    except GalileoHTTPException:
+        pass
+
+
+class TestCircuitBreaker:
+    @mark.parametrize("failing_fn", [fail, time_out])
+    @mark.asyncio
+    async def test_opens(self, failing_fn: Callable) -> None:
+        breaker = CircuitBreaker(window_size=10, min_calls=4, failure_rate_threshold=0.5)
+        for fn in [succeed, succeed, failing_fn]:
+            await call(breaker, fn)
+        assert breaker.state(A_PROJECT_ID, A_STAGE_NAME) == CircuitState.closed
+        await call(breaker, failing_fn)
+        assert breaker.state(A_PROJECT_ID, A_STAGE_NAME) == CircuitState.open
+        with raises(CircuitOpenError):
+            await breaker.run(A_REQUEST, succeed)
+        # Other stages are tracked separately.
+        assert breaker.state(A_PROJECT_ID, "other") == CircuitState.closed
+        await breaker.run(dict(A_REQUEST, stage_name="other"), succeed)
+
+    @mark.asyncio
+    async def test_client_errors_ignored(self) -> None:
+        breaker = CircuitBreaker(min_calls=1)
+        for _ in range(5):
+            await call(breaker, reject)
+        assert breaker.state(A_PROJECT_ID, A_STAGE_NAME) == CircuitState.closed
+
+    @mark.asyncio
+    async def test_sliding_window(self) -> None:
+        breaker = CircuitBreaker(window_size=4, min_calls=4, failure_rate_threshold=0.75)
+        for fn in [fail, fail, succeed, succeed, succeed, fail, fail]:
+            await call(breaker, fn)
+        # Only 2 of the last 4 calls failed.
+        assert breaker.state(A_PROJECT_ID, A_STAGE_NAME) == CircuitState.closed
+
+    @mark.parametrize(["probe_fn", "expected_state"], [[succeed, CircuitState.closed], [fail, CircuitState.open]])
+    @mark.asyncio
+    async def test_half_open(self, probe_fn: Callable, expected_state: CircuitState) -> None:
+        transitions: List[CircuitTransition] = []
+        breaker = CircuitBreaker(min_calls=1, open_duration=10, listeners=[transitions.append])
+        with patch("galileo_protect.circuit_breaker.monotonic", return_value=100):
+            await call(breaker, fail)
+        with patch("galileo_protect.circuit_breaker.monotonic", return_value=105):
+            with raises(CircuitOpenError) as exc_info:
+                await breaker.run(A_REQUEST, succeed)
+            assert exc_info.value.retry_after == 5
+        with patch("galileo_protect.circuit_breaker.monotonic", return_value=111):
+            await call(breaker, probe_fn)
+        assert breaker.state(A_PROJECT_ID, A_STAGE_NAME) == expected_state
+        assert [(transition.from_state, transition.to_state) for transition in transitions] == [
+            (CircuitState.closed, CircuitState.open),
+            (CircuitState.open, CircuitState.half_open),
+            (CircuitState.half_open, expected_state),
+        ]
+        assert transitions[0].project == A_PROJECT_ID
+        assert transitions[0].stage == A_STAGE_NAME
+
+    def test_fallback(self) -> None:
+        error = CircuitOpenError(A_PROJECT_ID, A_STAGE_NAME, 1)
+        response = CircuitBreaker().fallback(A_REQUEST, error)
+        assert (response.text, response.status) == (A_PROTECT_INPUT, ExecutionStatus.skipped)
+        response = CircuitBreaker(policy="fail_closed", override_text="Unavailable.").fallback(A_REQUEST, error)
+        assert (response.text, response.status) == ("Unavailable.", ExecutionStatus.triggered)
+        with raises(CircuitOpenError):
+            CircuitBreaker(policy=CircuitPolicy.raise_error).fallback(A_REQUEST, error)
+
+    def test_invalid(self) -> None:
+        with raises(ValueError, match="Override text must be provided for the fail-closed policy."):
+            CircuitBreaker(policy=CircuitPolicy.fail_closed)
+        with raises(ValueError, match="Failure rate threshold must be between 0 and 1."):
+            CircuitBreaker(failure_rate_threshold=0)
+
+
+@mark.asyncio
+async def test_ainvoke_fails_open(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    route = respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(return_value=HttpxResponse(503))
+    breaker = CircuitBreaker(min_calls=2)
+    for _ in range(2):
+        with raises(GalileoHTTPException):
+            await ainvoke(payload=Payload(input=A_PROTECT_INPUT), circuit_breaker=breaker)
+    response = await ainvoke(payload=Payload(input=A_PROTECT_INPUT), circuit_breaker=breaker)
+    assert (response.text, response.status) == (A_PROTECT_INPUT, ExecutionStatus.skipped)
+    assert route.call_count == 2
+
+
+def test_protector_fails_closed(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(return_value=HttpxResponse(500))
+    protector = Protector(
+        circuit_breaker=CircuitBreaker(policy=CircuitPolicy.fail_closed, override_text="Unavailable.", min_calls=1)
+    )
+    with raises(GalileoHTTPException):
+        protector.invoke(Payload(input=A_PROTECT_INPUT))
+    response = protector.invoke(Payload(input=A_PROTECT_INPUT), result_mode=ResultMode.raw)
+    assert isinstance(response, RawResponse)
+    assert (response.text, response.status) == ("Unavailable.", ExecutionStatus.triggered)
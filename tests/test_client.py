@@ -0,0 +1,54 @@
+from typing import Callable
+from unittest.mock import Mock, patch
+from uuid import uuid4
+
+from pytest import mark, raises
+
+from galileo_protect.client import ProtectClient
+from galileo_protect.invocation import ainvoke, invoke
+from galileo_protect.langchain import ProtectTool
+from galileo_protect.schemas import Payload
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME
+
+
+@mark.asyncio
+async def test_ainvoke_client(mock_invoke: Mock, set_validated_config: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    async with ProtectClient(max_connections=4, keepalive_expiry=1) as client:
+        for _ in range(3):
+            response = await ainvoke(payload=Payload(input=A_PROTECT_INPUT), client=client)
+            assert response.text == A_PROTECT_INPUT
+        async_client = client._async_client
+        assert async_client is not None
+        # The same pooled client is used for all requests.
+        response = await ainvoke(payload=Payload(input=A_PROTECT_INPUT), client=client)
+        assert client._async_client is async_client
+        assert mock_invoke.call_count == 4
+        assert mock_invoke.calls.last.request.headers["Authorization"].startswith("Bearer ")
+    assert client._async_client is None
+    assert async_client.is_closed
+
+
+def test_invoke_client(mock_invoke: Mock, set_validated_config: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    client = ProtectClient()
+    response = invoke(payload=Payload(input=A_PROTECT_INPUT), client=client)
+    assert response.text == A_PROTECT_INPUT
+    assert client._async_client is not None
+    client.close()
+    assert client._async_client is None
+
+
+def test_tool_client(mock_invoke: Mock, set_validated_config: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    client = ProtectClient()
+    tool = ProtectTool(client=client)
+    tool.run(dict(input=A_PROTECT_INPUT))
+    assert client._async_client is not None
+    client.close()
+
+
+def test_http2_requires_h2() -> None:
+    with patch("galileo_protect.client.is_dependency_available", return_value=False):
+        with raises(ImportError, match="HTTP/2 requires the `h2` package"):
+            ProtectClient(http2=True)
@@ -0,0 +1,117 @@
+from asyncio import CancelledError, ensure_future, gather, run, sleep
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from unittest.mock import Mock
+from uuid import uuid4
+
+from httpx import Request as HttpxRequest
+from httpx import Response as HttpxResponse
+from pytest import mark, raises
+from respx import MockRouter
+
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_protect.coalesce import SingleFlight
+from galileo_protect.constants.routes import Routes
+from galileo_protect.invocation import ainvoke
+from galileo_protect.schemas import Payload
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME
+
+
+class TestSingleFlight:
+    @mark.asyncio
+    async def test_shared_result(self) -> None:
+        single_flight = SingleFlight()
+        calls = Mock()
+
+        async def fn() -> str:
+            calls()
+            await sleep(0.05)
+            return "result"
+
+        results = await gather(*[single_flight.run("key", fn) for _ in range(5)])
+        assert results == ["result"] * 5
+        assert calls.call_count == 1
+        assert len(single_flight) == 0
+
+    @mark.asyncio
+    async def test_different_keys(self) -> None:
+        single_flight = SingleFlight()
+        calls = Mock()
+
+        async def fn() -> None:
+            calls()
+            await sleep(0.01)
+
+        await gather(single_flight.run("a", fn), single_flight.run("b", fn))
+        assert calls.call_count == 2
+
+    @mark.asyncio
+    async def test_leader_cancelled(self) -> None:
+        single_flight = SingleFlight()
+        calls = Mock()
+
+        async def fn() -> str:
+            calls()
+            await sleep(0.05)
+            return "ok"
+
+        leader = ensure_future(single_flight.run("key", fn))
+        await sleep(0)
+        follower = ensure_future(single_flight.run("key", fn))
+        await sleep(0.01)
+        leader.cancel()
+        with raises(CancelledError):
+            await leader
+        # The follower takes over the call instead of being cancelled.
+        assert await follower == "ok"
+        assert calls.call_count == 2
+        assert len(single_flight) == 0
+
+    @mark.asyncio
+    async def test_shared_exception(self) -> None:
+        single_flight = SingleFlight()
+
+        async def fn() -> None:
+            await sleep(0.05)
+            raise ValueError("failed")
+
+        results = await gather(*[single_flight.run("key", fn) for _ in range(3)], return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        # The next call after the failure is a new call.
+        with raises(ValueError):
+            await single_flight.run("key", fn)
+
+    def test_threads(self) -> None:
+        single_flight = SingleFlight()
+        calls = Mock()
+
+        async def fn() -> str:
+            calls()
+            await sleep(0.2)
+            return "result"
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: run(single_flight.run("key", fn)), range(4)))
+        assert results == ["result"] * 4
+        assert calls.call_count == 1
+
+
+@mark.asyncio
+async def test_ainvoke_coalesce(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+
+    async def side_effect(request: HttpxRequest) -> HttpxResponse:
+        # Keep the request in flight so that the other invocations join it.
+        await sleep(0.05)
+        return HttpxResponse(
+            200,
+            json=Response(text=A_PROTECT_INPUT, trace_metadata=TraceMetadata()).model_dump(mode="json"),
+        )
+
+    route = respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(side_effect=side_effect)
+    responses = await gather(*[ainvoke(payload=Payload(input=A_PROTECT_INPUT), coalesce=True) for _ in range(5)])
+    assert all(response.text == A_PROTECT_INPUT for response in responses)
+    assert route.call_count == 1
+    # Without coalescing, every invocation is sent.
+    await gather(*[ainvoke(payload=Payload(input=A_PROTECT_INPUT)) for _ in range(5)])
+    assert route.call_count == 6
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta, timezone
+from json import loads
+from time import time
+from typing import Callable
+from unittest.mock import patch
+from uuid import uuid4
+
+from httpx import ReadTimeout
+from pytest import mark, raises
+from respx import MockRouter
+
+from galileo_core.helpers.api_client import ApiClient
+from galileo_protect.circuit_breaker import CircuitBreaker
+from galileo_protect.constants.routes import Routes
+from galileo_protect.deadline import (
+    get_deadline,
+    protect_deadline,
+    read_timeout_kwargs,
+    remaining_time,
+    use_deadline,
+)
+from galileo_protect.exceptions import DeadlineExceededError
+from galileo_protect.invocation import ainvoke, invoke
+from galileo_protect.langchain import ProtectTool
+from galileo_protect.protector import Protector
+from galileo_protect.schemas import Payload
+from galileo_protect.schemas.stage import StageResponse
+from galileo_protect.stage import get_stage
+from galileo_protect.worker_pool import ProtectWorkerPool
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME
+
+
+class TestProtectDeadline:
+    def test_nested(self) -> None:
+        assert get_deadline() is None
+        assert remaining_time() is None
+        assert read_timeout_kwargs() == dict()
+        now = time()
+        with protect_deadline(now + 10) as outer:
+            assert outer == get_deadline() == now + 10
+            # The earliest deadline applies.
+            with protect_deadline(now + 20) as inner:
+                assert inner == now + 10
+            with protect_deadline(now + 5):
+                assert get_deadline() == now + 5
+                assert 0 < read_timeout_kwargs()["read_timeout"] <= 5
+            assert get_deadline() == now + 10
+        assert get_deadline() is None
+
+    def test_datetime(self) -> None:
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=10)
+        with protect_deadline(deadline):
+            assert get_deadline() == deadline.timestamp()
+
+    def test_use_deadline(self) -> None:
+        now = time()
+        with protect_deadline(now + 10):
+            # Replaces the current deadline instead of nesting.
+            with use_deadline(now + 20):
+                assert get_deadline() == now + 20
+            with use_deadline(None):
+                assert get_deadline() is None
+            assert get_deadline() == now + 10
+
+    def test_expired(self) -> None:
+        with protect_deadline(time() - 1):
+            # Also caught as a builtin timeout.
+            with raises(TimeoutError, match="exceeded"):
+                remaining_time()
+
+
+@mark.asyncio
+async def test_ainvoke_bounded_by_deadline(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    route = mock_echo_invoke()
+    with protect_deadline(time() + 2):
+        response = await ainvoke(payload=Payload(input=A_PROTECT_INPUT))
+    assert response.text == A_PROTECT_INPUT
+    # The server timeout leaves time for the response before the deadline.
+    assert 1 < loads(route.calls.last.request.content)["timeout"] < 2
+    # Deadlines later than the timeout don't change it.
+    with protect_deadline(time() + 60):
+        await ainvoke(payload=Payload(input=A_PROTECT_INPUT), timeout=5)
+    assert loads(route.calls.last.request.content)["timeout"] == 5
+
+
+@mark.asyncio
+async def test_ainvoke_expired(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    route = mock_echo_invoke()
+    with protect_deadline(time() - 1):
+        with raises(DeadlineExceededError):
+            await ainvoke(payload=Payload(input=A_PROTECT_INPUT))
+        with raises(DeadlineExceededError):
+            await Protector().ainvoke(Payload(input=A_PROTECT_INPUT))
+    assert not route.called
+
+
+@mark.asyncio
+async def test_ainvoke_timeout_at_deadline(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    project_id = uuid4()
+    set_validated_config(project_id=project_id, stage_name=A_STAGE_NAME)
+    respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(side_effect=ReadTimeout("timed out"))
+    circuit_breaker = CircuitBreaker(min_calls=1)
+    with protect_deadline(time() + 2):
+        with raises(DeadlineExceededError):
+            await ainvoke(payload=Payload(input=A_PROTECT_INPUT), circuit_breaker=circuit_breaker)
+    # Running out of time isn't a backend failure.
+    assert circuit_breaker.state(project_id, A_STAGE_NAME) == "closed"
+    # Timeouts not caused by the deadline are left as is.
+    with protect_deadline(time() + 60):
+        with raises(ReadTimeout):
+            await ainvoke(payload=Payload(input=A_PROTECT_INPUT), timeout=5)
+
+
+def test_invoke_propagates_deadline(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    route = mock_echo_invoke()
+    with protect_deadline(time() - 1):
+        with raises(DeadlineExceededError):
+            invoke(payload=Payload(input=A_PROTECT_INPUT))
+        with raises(DeadlineExceededError):
+            ProtectTool().run(dict(input=A_PROTECT_INPUT))
+    assert not route.called
+    with protect_deadline(time() + 2):
+        assert A_PROTECT_INPUT in ProtectTool().run(dict(input=A_PROTECT_INPUT))
+    assert loads(route.calls.last.request.content)["timeout"] < 2
+
+
+def test_worker_pool_deadline_per_payload(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_echo_invoke()
+    with ProtectWorkerPool() as pool:
+        with protect_deadline(time() - 1):
+            expired = pool.submit(Payload(input="expired"))
+        assert pool.submit(Payload(input=A_PROTECT_INPUT)).result(timeout=5).text == A_PROTECT_INPUT
+        with raises(DeadlineExceededError):
+            expired.result(timeout=5)
+
+
+def test_stage_helpers(set_validated_config: Callable) -> None:
+    project_id = uuid4()
+    set_validated_config(project_id=project_id, stage_name=A_STAGE_NAME)
+    stage = StageResponse(id=uuid4(), name=A_STAGE_NAME, project_id=project_id)
+    with patch.object(ApiClient, "request", return_value=stage.model_dump(mode="json")) as mock_request:
+        get_stage()
+        assert "read_timeout" not in mock_request.call_args.kwargs
+        with protect_deadline(time() + 2):
+            get_stage()
+        assert 0 < mock_request.call_args.kwargs["read_timeout"] <= 2
+        with protect_deadline(time() - 1):
+            with raises(DeadlineExceededError):
+                get_stage()
+    assert mock_request.call_count == 2
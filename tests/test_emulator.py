@@ -0,0 +1,211 @@
+from pathlib import Path
+from random import Random
+from socket import socket
+from typing import Callable, Generator
+from uuid import uuid4
+
+from httpx import post, put
+from pytest import fixture, mark, raises
+
+from galileo_core.exceptions.http import GalileoHTTPException
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.stage import StageType
+from galileo_protect.emulator import EmulatorServer, EmulatorSettings, EmulatorStage, LatencyDistribution
+from galileo_protect.emulator.settings import LatencyKind
+from galileo_protect.invocation import invoke
+from galileo_protect.project import create_project, get_projects
+from galileo_protect.schemas import Payload, Rule, RuleMetrics, RuleOperator, Ruleset
+from galileo_protect.schemas.config import ProtectConfig
+from galileo_protect.stage import create_stage, get_stage, pause_stage, resume_stage, update_stage
+from tests.data import A_JWT_TOKEN
+
+TOXICITY_RULESET = Ruleset(rules=[Rule(metric=RuleMetrics.toxicity, operator=RuleOperator.gt, target_value=0.5)])
+TOXIC_PAYLOAD = Payload(input="Hi", output="You are an idiot.")
+
+
+@fixture
+def emulator(tmp_home_dir: Path) -> Generator[Callable[..., EmulatorServer], None, None]:
+    servers = list()
+
+    def curry(**settings: object) -> EmulatorServer:
+        server = EmulatorServer(EmulatorSettings.model_validate(dict(port=0, seed=0, **settings))).__enter__()
+        servers.append(server)
+        ProtectConfig.get(console_url=server.url, api_url=server.url, jwt_token=A_JWT_TOKEN, project_id=uuid4())
+        return server
+
+    yield curry
+    ProtectConfig.get().reset()
+    for server in servers:
+        server.__exit__()
+
+
+@mark.parametrize(
+    ["spec", "kind", "parameters"],
+    [
+        ["0.05", LatencyKind.fixed, (0.05,)],
+        ["fixed:0.1", LatencyKind.fixed, (0.1,)],
+        ["uniform:0.01,0.1", LatencyKind.uniform, (0.01, 0.1)],
+        ["normal:0.05,0.01", LatencyKind.normal, (0.05, 0.01)],
+        ["lognormal:-3,0.5", LatencyKind.lognormal, (-3, 0.5)],
+        ["exponential:0.05", LatencyKind.exponential, (0.05,)],
+    ],
+)
+def test_latency_parse(spec: str, kind: LatencyKind, parameters: tuple) -> None:
+    latency = LatencyDistribution.parse(spec)
+    assert latency.kind == kind
+    assert latency.parameters == parameters
+    random = Random(0)
+    assert all(latency.sample(random) >= 0 for _ in range(100))
+
+
+@mark.parametrize("spec", ["gamma:1,2", "uniform:0.1", "fixed:a", "normal:1,2,3"])
+def test_latency_parse_invalid(spec: str) -> None:
+    with raises(ValueError):
+        LatencyDistribution.parse(spec)
+
+
+def test_latency_uniform_bounds() -> None:
+    latency, random = LatencyDistribution.parse("uniform:0.01,0.02"), Random(0)
+    assert all(0.01 <= latency.sample(random) <= 0.02 for _ in range(100))
+
+
+@mark.parametrize(
+    "settings",
+    [
+        dict(workers=2, port=0),
+        dict(error_rate=1.5),
+        dict(workers=0),
+        dict(port=-1),
+        dict(stages=[dict(project_name="project", name="stage")] * 2),
+    ],
+    ids=str,
+)
+def test_settings_invalid(settings: dict) -> None:
+    with raises(ValueError):
+        EmulatorSettings.model_validate(settings)
+
+
+def test_projects(emulator: Callable) -> None:
+    emulator()
+    name = f"project-{uuid4()}"
+    project = create_project(name)
+    assert project.name == name
+    assert [project.id for project in get_projects()] == [project.id]
+    # Existing projects are reused by name.
+    assert create_project(name).id == project.id
+
+
+def test_central_stage_lifecycle(emulator: Callable) -> None:
+    emulator(metrics=dict(toxicity=0.9))
+    config = ProtectConfig.get()
+    stage = create_stage(name="central", type=StageType.central, prioritized_rulesets=[TOXICITY_RULESET])
+    assert stage.version == 0
+    assert get_stage(stage_name="central").id == stage.id
+    response = invoke(TOXIC_PAYLOAD, project_id=config.project_id, stage_id=stage.id)
+    assert response.status == ExecutionStatus.triggered
+    # Without rules, nothing is triggered.
+    updated = update_stage(stage_id=stage.id, prioritized_rulesets=[])
+    assert updated.version == 1
+    response = invoke(TOXIC_PAYLOAD, project_id=config.project_id, stage_id=stage.id)
+    assert response.status == ExecutionStatus.not_triggered
+    assert response.text == TOXIC_PAYLOAD.output
+    pause_stage(stage_id=stage.id)
+    assert get_stage(stage_id=stage.id).paused
+    response = invoke(TOXIC_PAYLOAD, project_id=config.project_id, stage_id=stage.id)
+    assert response.status == ExecutionStatus.paused
+    resume_stage(stage_id=stage.id)
+    assert not get_stage(stage_id=stage.id).paused
+
+
+@mark.parametrize(
+    ["payload", "status"],
+    [
+        [TOXIC_PAYLOAD, ExecutionStatus.triggered],
+        [Payload(input="Hi", output="Hello there."), ExecutionStatus.not_triggered],
+    ],
+)
+def test_invoke_local_providers(emulator: Callable, payload: Payload, status: ExecutionStatus) -> None:
+    emulator()
+    response = invoke(payload, prioritized_rulesets=[TOXICITY_RULESET], stage_name=f"stage-{uuid4()}")
+    assert response.status == status
+
+
+def test_invoke_fixed_metrics(emulator: Callable) -> None:
+    emulator(metrics=dict(toxicity=0.1))
+    response = invoke(TOXIC_PAYLOAD, prioritized_rulesets=[TOXICITY_RULESET], stage_name="stage")
+    assert response.status == ExecutionStatus.not_triggered
+
+
+def test_invoke_no_auto_create(emulator: Callable) -> None:
+    emulator(auto_create=False)
+    with raises(GalileoHTTPException):
+        invoke(TOXIC_PAYLOAD, prioritized_rulesets=[TOXICITY_RULESET], stage_name="stage")
+
+
+def test_invoke_error_rate(emulator: Callable) -> None:
+    emulator(error_rate=1)
+    with raises(GalileoHTTPException):
+        invoke(TOXIC_PAYLOAD, prioritized_rulesets=[TOXICITY_RULESET], stage_name="stage")
+
+
+def test_invoke_latency_timeout(emulator: Callable) -> None:
+    emulator(latency=LatencyDistribution.parse("10"))
+    response = invoke(TOXIC_PAYLOAD, prioritized_rulesets=[TOXICITY_RULESET], stage_name="stage", timeout=0.1)
+    assert response.status == ExecutionStatus.timeout
+    assert response.text == TOXIC_PAYLOAD.output
+
+
+def test_invoke_echoes_metadata_and_headers(emulator: Callable) -> None:
+    server = emulator()
+    response = post(
+        f"{server.url}protect/invoke",
+        json=dict(
+            payload=dict(input="Hi"),
+            project_name="project",
+            stage_name="stage",
+            metadata=dict(key="value"),
+            headers={"x-trace": "trace"},
+        ),
+    )
+    assert response.status_code == 200
+    assert response.json()["metadata"] == dict(key="value")
+    assert response.headers["x-trace"] == "trace"
+
+
+def test_invalid_request(emulator: Callable) -> None:
+    server = emulator()
+    assert post(f"{server.url}protect/invoke", json=dict(payload=dict())).status_code == 422
+    assert post(f"{server.url}unknown", json=dict()).status_code == 404
+
+
+def test_seeded_stages(emulator: Callable) -> None:
+    server = emulator(
+        metrics=dict(toxicity=0.9),
+        stages=[EmulatorStage(project_name="seeded", name="central", rulesets=[TOXICITY_RULESET])],
+    )
+    project_id = server.state.get_projects("seeded")[0].id
+    response = invoke(TOXIC_PAYLOAD, project_id=project_id, stage_name="central")
+    assert response.status == ExecutionStatus.triggered
+    assert get_stage(project_id=project_id, stage_name="central").type == StageType.central
+
+
+def test_multiple_workers_reject_changes(tmp_home_dir: Path) -> None:
+    with socket() as free:
+        free.bind(("127.0.0.1", 0))
+        port = free.getsockname()[1]
+    stage = EmulatorStage(project_name="seeded", name="central", rulesets=[TOXICITY_RULESET])
+    # A single worker of a multi-worker emulator.
+    with EmulatorServer(EmulatorSettings(port=port, workers=2, stages=[stage])) as server:
+        project_id = server.state.get_projects("seeded")[0].id
+        stage_id = server.state.get_stage(project_id, stage_name="central").id
+        stage_url = f"{server.url}projects/{project_id}/stages/{stage_id}"
+        assert post(f"{server.url}projects", json=dict(name="other", type="protect")).status_code == 405
+        assert post(f"{server.url}projects/{project_id}/stages", json=dict(name="other")).status_code == 405
+        assert post(stage_url, json=dict(prioritized_rulesets=[])).status_code == 405
+        assert put(stage_url, params=dict(pause=True)).status_code == 405
+        # Invocations still auto-create projects and stages, which are the same on all workers.
+        response = post(
+            f"{server.url}protect/invoke",
+            json=dict(payload=dict(input="Hi"), project_name="new", stage_name="local"),
+        )
+        assert response.status_code == 200
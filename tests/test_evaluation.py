@@ -0,0 +1,70 @@
+from itertools import product
+from typing import Any, List
+
+from pytest import mark
+
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_protect.evaluation import RuleEvaluator, compile_rule
+from galileo_protect.schemas import Payload, Rule, RuleMetrics, RuleOperator
+from tests.data import A_PROTECT_INPUT, a_rule, a_ruleset
+
+VALUES: List[Any] = [None, 0, 0.5, 1, True, "a", "b", "", [], ["a"], ["a", "b"], [1, 2], {"a": 1}]
+TARGETS = [None, 0, 0.5, 1, "a", "c", [], ["a"], ["a", "b"], [1], [1, "a"]]
+
+
+@mark.parametrize(("operator", "target"), product(RuleOperator, TARGETS))
+def test_compile_rule_matches_evaluate(operator: RuleOperator, target: Any) -> None:
+    rule = Rule(metric=RuleMetrics.pii, operator=operator, target_value=target)
+    predicate = compile_rule(rule)
+    for value in VALUES:
+        assert predicate(value) == rule.evaluate(value), value
+
+
+class TestRuleEvaluator:
+    def test_priority_order(self) -> None:
+        evaluator = RuleEvaluator(
+            [
+                a_ruleset(
+                    a_rule(RuleMetrics.toxicity, RuleOperator.gt, 0.5),
+                    a_rule(RuleMetrics.pii),
+                    choice="toxic pii",
+                ),
+                a_ruleset(a_rule(RuleMetrics.toxicity, RuleOperator.gt, 0.5), choice="toxic"),
+                a_ruleset(a_rule("pii", RuleOperator.contains, "email"), choice="email"),
+            ]
+        )
+        assert evaluator.metrics == {"toxicity", "pii"}
+        # All the rules of a ruleset must be met.
+        assert evaluator.triggered({RuleMetrics.toxicity: 0.9, RuleMetrics.pii: ["email"]}) is evaluator.rulesets[0]
+        assert evaluator.triggered({RuleMetrics.toxicity: 0.9, RuleMetrics.pii: []}) is evaluator.rulesets[1]
+        # Keys can be metric names.
+        assert evaluator.triggered({"toxicity": 0.1, "pii": ["email"]}) is evaluator.rulesets[2]
+        assert evaluator.triggered({"toxicity": 0.1}) is None
+        assert evaluator.triggered(dict()) is None
+
+    def test_evaluate(self) -> None:
+        evaluator = RuleEvaluator(
+            [
+                a_ruleset(
+                    a_rule(RuleMetrics.prompt_injection, RuleOperator.any, ["jailbreak"]),
+                    choice="blocked",
+                )
+            ]
+        )
+        payload = Payload(input=A_PROTECT_INPUT)
+        response = evaluator.evaluate(payload, {RuleMetrics.prompt_injection: "jailbreak"})
+        assert response.status == ExecutionStatus.triggered
+        assert response.text == "blocked"
+        assert response.trace_metadata.execution_time >= 0
+        response = evaluator.evaluate(payload, {RuleMetrics.prompt_injection: "none"})
+        assert response.status == ExecutionStatus.not_triggered
+        assert response.text == A_PROTECT_INPUT
+        # The output is passed through when there's one.
+        response = evaluator.evaluate(Payload(input=A_PROTECT_INPUT, output="output"), dict())
+        assert response.text == "output"
+
+    def test_passthrough_action(self) -> None:
+        evaluator = RuleEvaluator([a_ruleset(a_rule(RuleMetrics.tone, RuleOperator.eq, "anger"))])
+        response = evaluator.evaluate(Payload(input=A_PROTECT_INPUT), {RuleMetrics.tone: "anger"})
+        assert response.status == ExecutionStatus.triggered
+        assert response.text == A_PROTECT_INPUT
@@ -0,0 +1,66 @@
+from asyncio import sleep
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from threading import get_ident
+
+from pytest import raises
+
+from galileo_protect.execution import async_run
+
+
+async def thread_ident() -> int:
+    await sleep(0)
+    return get_ident()
+
+
+async def fail() -> None:
+    raise ValueError("failed")
+
+
+def test_single_background_loop() -> None:
+    idents = {async_run(thread_ident()) for _ in range(10)}
+    assert len(idents) == 1
+    assert get_ident() not in idents
+
+
+def test_from_threads() -> None:
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        idents = set(executor.map(lambda _: async_run(thread_ident()), range(8)))
+    assert len(idents) == 1
+
+
+def test_no_wait() -> None:
+    future = async_run(thread_ident(), wait_for_result=False)
+    assert isinstance(future, Future)
+    assert isinstance(future.result(timeout=5), int)
+
+
+def test_exception() -> None:
+    with raises(ValueError, match="failed"):
+        async_run(fail())
+
+
+def test_context_propagated() -> None:
+    var: ContextVar[str] = ContextVar("var", default="default")
+
+    async def get() -> str:
+        return var.get()
+
+    token = var.set("caller")
+    try:
+        assert async_run(get()) == "caller"
+    finally:
+        var.reset(token)
+    # Values don't leak into later calls.
+    assert async_run(get()) == "default"
+
+
+def test_wait_on_background_loop() -> None:
+    async def nested() -> int:
+        # Blocking here would deadlock the only background loop.
+        return async_run(thread_ident())
+
+    with raises(RuntimeError, match="event loop"):
+        async_run(nested())
+    # The loop is still usable.
+    assert isinstance(async_run(thread_ident()), int)
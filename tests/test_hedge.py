@@ -0,0 +1,157 @@
+from asyncio import CancelledError, sleep
+from typing import Callable, List
+from uuid import uuid4
+
+from httpx import Request as HttpxRequest
+from httpx import Response as HttpxResponse
+from pytest import mark, raises
+from respx import MockRouter
+
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_protect.constants.routes import Routes
+from galileo_protect.hedge import HedgePolicy
+from galileo_protect.invocation import ainvoke
+from galileo_protect.latency import LatencyWindow
+from galileo_protect.schemas import Payload
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME
+
+
+def a_call(delays: List[float], results: List[str], cancelled: List[int]) -> Callable:
+    """Get a function whose nth call takes `delays[n]` seconds, and fails for a negative delay."""
+    calls = iter(range(len(delays)))
+
+    async def call() -> str:
+        n = next(calls)
+        try:
+            await sleep(abs(delays[n]))
+        except CancelledError:
+            cancelled.append(n)
+            raise
+        if delays[n] < 0:
+            raise ValueError(f"call {n} failed")
+        results.append(f"call {n}")
+        return f"call {n}"
+
+    return call
+
+
+class TestLatencyWindow:
+    def test_percentile(self) -> None:
+        window = LatencyWindow(min_samples=10)
+        for sample in range(1, 10):
+            window.add(sample)
+        assert window.percentile(50) is None
+        window.add(10)
+        assert window.percentile(50) == 5
+        assert window.percentile(90) == 9
+        assert window.percentile(100) == 10
+
+    def test_sliding(self) -> None:
+        window = LatencyWindow(max_samples=4, min_samples=1)
+        for sample in range(10):
+            window.add(sample)
+        assert len(window) == 4
+        assert window.percentile(1) == 6
+        window.clear()
+        assert window.percentile(50) is None
+
+
+class TestHedgePolicy:
+    @mark.asyncio
+    async def test_fast_primary_not_hedged(self) -> None:
+        policy = HedgePolicy(delay=0.1, max_hedge_ratio=1)
+        results: List[str] = []
+        assert await policy.run(a_call([0, 0], results, [])) == "call 0"
+        assert policy.stats.hedges == 0
+        assert len(policy.latencies) == 1
+
+    @mark.asyncio
+    async def test_hedge_wins(self) -> None:
+        policy = HedgePolicy(delay=0.01, max_hedge_ratio=1)
+        cancelled: List[int] = []
+        assert await policy.run(a_call([1, 0], [], cancelled)) == "call 1"
+        await sleep(0)
+        # The slow primary is cancelled.
+        assert cancelled == [0]
+        stats = policy.stats
+        assert (stats.requests, stats.hedges, stats.hedge_wins, stats.hedge_rate) == (1, 1, 1, 1.0)
+
+    @mark.asyncio
+    async def test_primary_wins(self) -> None:
+        policy = HedgePolicy(delay=0.01, max_hedge_ratio=1)
+        cancelled: List[int] = []
+        assert await policy.run(a_call([0.02, 1], [], cancelled)) == "call 0"
+        await sleep(0)
+        assert cancelled == [1]
+        assert policy.stats.hedge_wins == 0
+
+    @mark.asyncio
+    async def test_failed_primary_falls_back_to_hedge(self) -> None:
+        policy = HedgePolicy(delay=0.01, max_hedge_ratio=1)
+        assert await policy.run(a_call([-0.02, 0.05], [], [])) == "call 1"
+
+    @mark.asyncio
+    async def test_both_fail(self) -> None:
+        policy = HedgePolicy(delay=0.01, max_hedge_ratio=1)
+        with raises(ValueError, match="call 1 failed"):
+            await policy.run(a_call([-0.02, -0.03], [], []))
+
+    @mark.asyncio
+    async def test_budget(self) -> None:
+        policy = HedgePolicy(delay=0, max_hedge_ratio=0.5)
+        for _ in range(4):
+            await policy.run(a_call([0.01, 0.01], [], []))
+        stats = policy.stats
+        # The budget grows by half a hedge per request.
+        assert (stats.requests, stats.hedges, stats.throttled) == (4, 2, 2)
+
+    @mark.asyncio
+    async def test_percentile(self) -> None:
+        policy = HedgePolicy(delay=5, percentile=50, min_samples=2)
+        assert policy.hedge_delay() == 5
+        policy.latencies.add(0.1)
+        policy.latencies.add(0.2)
+        assert policy.hedge_delay() == 0.1
+
+    @mark.asyncio
+    async def test_percentile_steady_slow_primary(self) -> None:
+        policy = HedgePolicy(delay=0.05, percentile=50, min_samples=1, max_hedge_ratio=1)
+        call = a_call([1, 0] * 5, [], [])
+        for _ in range(5):
+            assert await policy.run(call) is not None
+            # Hedges win every time, the delay doesn't shrink below the primary's latency.
+            delay = policy.hedge_delay()
+            assert delay is not None and delay >= 0.05
+        assert policy.stats.hedge_wins == 5
+
+    def test_invalid(self) -> None:
+        with raises(ValueError, match="Either a hedge delay or a latency percentile must be set."):
+            HedgePolicy()
+        with raises(ValueError, match="Hedge percentile must be between 0 and 100."):
+            HedgePolicy(percentile=100)
+        with raises(ValueError, match="Max hedge ratio must be between 0 and 1."):
+            HedgePolicy(delay=1, max_hedge_ratio=2)
+
+
+@mark.asyncio
+async def test_ainvoke_hedged(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    delays = [1, 0]
+    calls: List[HttpxRequest] = []
+
+    async def side_effect(request: HttpxRequest) -> HttpxResponse:
+        calls.append(request)
+        await sleep(delays[len(calls) - 1])
+        return HttpxResponse(
+            200,
+            json=Response(text=A_PROTECT_INPUT, status="NOT_TRIGGERED", trace_metadata=TraceMetadata()).model_dump(
+                mode="json"
+            ),
+        )
+
+    respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(side_effect=side_effect)
+    policy = HedgePolicy(delay=0.05, max_hedge_ratio=1)
+    response = await ainvoke(payload=Payload(input=A_PROTECT_INPUT), hedge=policy)
+    assert response.text == A_PROTECT_INPUT
+    assert len(calls) == 2
+    assert policy.stats.hedge_wins == 1
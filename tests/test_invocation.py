@@ -2,11 +2,13 @@ from typing import Callable, List
 from unittest.mock import Mock
 from uuid import uuid4
 
-from pytest import mark
+from pytest import mark, raises
+from respx import MockRouter
 
+from galileo_core.exceptions.http import GalileoHTTPException
 from galileo_core.schemas.protect.execution_status import ExecutionStatus
 from galileo_core.schemas.protect.response import Response
-from galileo_protect.invocation import ainvoke, invoke
+from galileo_protect.invocation import ainvoke, ainvoke_many, invoke, invoke_many
 from galileo_protect.langchain import ProtectTool
 from galileo_protect.schemas import Payload, Ruleset
 from tests.data import A_PROJECT_NAME, A_PROTECT_INPUT, A_STAGE_NAME
@@ -146,3 +148,38 @@ class TestInvoke:
         assert response.text is not None
         assert response.status == ExecutionStatus.not_triggered
         assert mock_invoke.called
+
+
+class TestInvokeMany:
+    @mark.parametrize("max_concurrency", [1, 4, 16])
+    def test_invoke_many(
+        self, set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable, max_concurrency: int
+    ) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        route = mock_echo_invoke()
+        inputs = [f"input-{i}" for i in range(10)]
+        responses = invoke_many([Payload(input=text) for text in inputs], max_concurrency=max_concurrency)
+        assert route.call_count == len(inputs)
+        assert [response.text for response in responses if isinstance(response, Response)] == inputs
+
+    @mark.asyncio
+    async def test_ainvoke_many_errors(
+        self, set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+    ) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        mock_echo_invoke()
+        responses = await ainvoke_many([Payload(input="foo"), Payload(input="fail"), Payload(input="bar")])
+        assert len(responses) == 3
+        assert isinstance(responses[0], Response) and responses[0].text == "foo"
+        assert isinstance(responses[1], GalileoHTTPException)
+        assert isinstance(responses[2], Response) and responses[2].text == "bar"
+
+    @mark.asyncio
+    async def test_ainvoke_many_empty(self, set_validated_config: Callable) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        assert await ainvoke_many([]) == []
+
+    @mark.asyncio
+    async def test_ainvoke_many_invalid_concurrency(self) -> None:
+        with raises(ValueError, match="Max concurrency must be at least 1."):
+            await ainvoke_many([Payload(input="foo")], max_concurrency=0)
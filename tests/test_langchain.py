@@ -1,13 +1,16 @@
-from json import dumps
-from typing import Any, List, Optional
+from json import dumps, loads
+from typing import Any, Callable, List, Optional
 from unittest.mock import patch
+from uuid import uuid4
 
-from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.callbacks import BaseCallbackHandler, CallbackManagerForLLMRun
 from langchain_core.language_models.llms import LLM
-from pytest import CaptureFixture, mark
+from pydantic import ValidationError
+from pytest import CaptureFixture, mark, raises
+from respx import MockRouter
 
-from galileo_protect.langchain import ProtectParser
-from tests.data import A_TRACE_METADATA_DICT
+from galileo_protect.langchain import ProtectParser, ProtectTool
+from tests.data import A_STAGE_NAME, A_TRACE_METADATA_DICT
 
 
 class ProtectLLM(LLM):
@@ -25,6 +28,14 @@ class ProtectLLM(LLM):
         return prompt
 
 
+class ToolStartHandler(BaseCallbackHandler):
+    def __init__(self) -> None:
+        self.tool_starts = 0
+
+    def on_tool_start(self, *args: Any, **kwargs: Any) -> None:
+        self.tool_starts += 1
+
+
 @mark.parametrize(
     ["output", "ignore_trigger", "expected_return", "expected_call_count"],
     [
@@ -75,3 +86,75 @@ def test_echo(echo_output: bool, expected_output: str, capsys: CaptureFixture) -
     parser.parser(dumps({"text": "foo", "status": "NOT_TRIGGERED", **A_TRACE_METADATA_DICT}))
     captured = capsys.readouterr()
     assert captured.out == expected_output
+
+
+@mark.parametrize("ignore_trigger", [True, False])
+@mark.asyncio
+async def test_aparser(ignore_trigger: bool) -> None:
+    parser = ProtectParser(chain=ProtectLLM(), ignore_trigger=ignore_trigger)
+    with patch.object(ProtectLLM, "ainvoke", wraps=parser.chain.ainvoke) as mock_fn:
+        output = dumps({"text": "triggering text", "status": "TRIGGERED", **A_TRACE_METADATA_DICT})
+        assert await parser.aparser(output) == "triggering text"
+        assert mock_fn.call_count == int(ignore_trigger)
+        output = dumps({"text": "foo", "status": "NOT_TRIGGERED", **A_TRACE_METADATA_DICT})
+        assert await parser.aparser(output) == "foo"
+        assert mock_fn.call_count == int(ignore_trigger) + 1
+
+
+@mark.parametrize(
+    ["status", "expected_chunks"],
+    [["NOT_TRIGGERED", ["streamed"]], ["TRIGGERED", ["triggering text"]]],
+)
+@mark.asyncio
+async def test_astream(status: str, expected_chunks: List[str]) -> None:
+    parser = ProtectParser(chain=ProtectLLM())
+    text = "streamed" if status == "NOT_TRIGGERED" else "triggering text"
+    output = dumps({"text": text, "status": status, **A_TRACE_METADATA_DICT})
+    assert [chunk async for chunk in parser.astream(output)] == expected_chunks
+
+
+class TestToolBatch:
+    INPUTS: List[Any] = ["foo", dict(input="bar")]
+
+    def test_batch(self, set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        route = mock_echo_invoke()
+        outputs = ProtectTool().batch(self.INPUTS, config=dict(max_concurrency=2))
+        assert [loads(output)["text"] for output in outputs] == ["foo", "bar"]
+        assert route.call_count == 2
+
+    @mark.asyncio
+    async def test_abatch(
+        self, set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+    ) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        route = mock_echo_invoke()
+        outputs = await ProtectTool().abatch(self.INPUTS)
+        assert [loads(output)["text"] for output in outputs] == ["foo", "bar"]
+        assert route.call_count == 2
+
+    def test_return_exceptions(
+        self, set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+    ) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        mock_echo_invoke()
+        outputs = ProtectTool().batch(["foo", "fail", dict()], return_exceptions=True)
+        assert loads(outputs[0])["text"] == "foo"
+        assert isinstance(outputs[1], Exception)
+        assert isinstance(outputs[2], ValidationError)
+        with raises(Exception):
+            ProtectTool().batch(["foo", "fail"])
+
+    def test_callbacks_fall_back(
+        self, set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+    ) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        route = mock_echo_invoke()
+        handler = ToolStartHandler()
+        with patch("galileo_protect.langchain.invoke_many") as mock_invoke_many:
+            outputs = ProtectTool().batch(self.INPUTS, config=dict(callbacks=[handler]))
+        # Callbacks are fired per item by LangChain's generic batch.
+        assert not mock_invoke_many.called
+        assert handler.tool_starts == 2
+        assert route.call_count == 2
+        assert [loads(output)["text"] for output in outputs] == ["foo", "bar"]
@@ -0,0 +1,164 @@
+from typing import Callable, Generator, List, Optional, Tuple
+from unittest.mock import patch
+from uuid import uuid4
+
+from pytest import fixture, mark, raises
+from respx import MockRouter
+
+from galileo_core.exceptions.http import GalileoHTTPException
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_protect.cache import ResponseCache
+from galileo_protect.invocation import ainvoke
+from galileo_protect.metrics import (
+    CompositeRecorder,
+    MetricsRecorder,
+    OpenTelemetryRecorder,
+    PrometheusRecorder,
+    get_metrics_recorder,
+    set_metrics_recorder,
+)
+from galileo_protect.preflight import Preflight
+from galileo_protect.schemas import Payload, RuleMetrics, RuleOperator
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME, a_rule, a_ruleset
+
+
+@fixture
+def recorder() -> Generator[PrometheusRecorder, None, None]:
+    recorder = PrometheusRecorder()
+    set_metrics_recorder(recorder)
+    yield recorder
+    set_metrics_recorder(None)
+
+
+class ListRecorder(MetricsRecorder):
+    def __init__(self) -> None:
+        self.requests: List[Tuple[str, str, float, Optional[float]]] = []
+
+    def record_request(self, project: str, stage: str, latency: float, execution_time: Optional[float]) -> None:
+        self.requests.append((project, stage, latency, execution_time))
+
+
+class TestPrometheusRecorder:
+    def test_render(self) -> None:
+        recorder = PrometheusRecorder(buckets=(0.1, 1))
+        recorder.record_invocation("project", "stage", 0.05, status=ExecutionStatus.triggered)
+        recorder.record_invocation("project", "stage", 2, error=TimeoutError())
+        recorder.record_request("project", "stage", 0.5, 0.2)
+        recorder.record_request("project", "stage", 0.5, None)
+        lines = recorder.render().splitlines()
+        assert "# TYPE galileo_protect_invocations_total counter" in lines
+        assert 'galileo_protect_invocations_total{project="project",stage="stage",status="triggered"} 1' in lines
+        assert 'galileo_protect_invocations_total{project="project",stage="stage",status="exception"} 1' in lines
+        assert (
+            'galileo_protect_invocation_errors_total{project="project",stage="stage",error="TimeoutError"} 1' in lines
+        )
+        # Buckets are cumulative.
+        assert [line for line in lines if line.startswith("galileo_protect_invocation_latency_seconds")] == [
+            'galileo_protect_invocation_latency_seconds_bucket{project="project",stage="stage",le="0.1"} 1',
+            'galileo_protect_invocation_latency_seconds_bucket{project="project",stage="stage",le="1"} 1',
+            'galileo_protect_invocation_latency_seconds_bucket{project="project",stage="stage",le="+Inf"} 2',
+            'galileo_protect_invocation_latency_seconds_sum{project="project",stage="stage"} 2.05',
+            'galileo_protect_invocation_latency_seconds_count{project="project",stage="stage"} 2',
+        ]
+        assert 'galileo_protect_request_latency_seconds_count{project="project",stage="stage"} 2' in lines
+        assert 'galileo_protect_execution_time_seconds_count{project="project",stage="stage"} 1' in lines
+        assert 'galileo_protect_overhead_seconds_sum{project="project",stage="stage"} 0.3' in lines
+
+    def test_escape_labels(self) -> None:
+        recorder = PrometheusRecorder()
+        recorder.record_invocation('a "project"\\', "stage\n", 0.1, status=ExecutionStatus.skipped)
+        assert 'project="a \\"project\\"\\\\",stage="stage\\n"' in recorder.render()
+
+    def test_clear(self) -> None:
+        recorder = PrometheusRecorder()
+        recorder.record_request("project", "stage", 0.5, 0.2)
+        recorder.clear()
+        assert "project" not in recorder.render()
+
+    def test_invalid(self) -> None:
+        with raises(ValueError, match="must be sorted"):
+            PrometheusRecorder(buckets=(1, 0.1))
+
+
+def test_disabled_by_default() -> None:
+    assert get_metrics_recorder() is None
+
+
+def test_composite() -> None:
+    first, second = ListRecorder(), ListRecorder()
+    recorder = CompositeRecorder(first, second)
+    recorder.record_request("project", "stage", 0.5, 0.2)
+    # The base recorder ignores invocations.
+    recorder.record_invocation("project", "stage", 0.5, status=ExecutionStatus.triggered)
+    assert first.requests == second.requests == [("project", "stage", 0.5, 0.2)]
+
+
+def test_open_telemetry_requires_package() -> None:
+    with patch("galileo_protect.metrics.is_dependency_available", return_value=False):
+        with raises(ImportError, match="`opentelemetry-api` package"):
+            OpenTelemetryRecorder()
+
+
+@mark.asyncio
+async def test_ainvoke_metrics(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable, recorder: PrometheusRecorder
+) -> None:
+    project_id = uuid4()
+    set_validated_config(project_id=project_id, stage_name=A_STAGE_NAME)
+    mock_echo_invoke()
+    cache = ResponseCache()
+    for _ in range(2):
+        await ainvoke(payload=Payload(input=A_PROTECT_INPUT), cache=cache)
+    with raises(GalileoHTTPException):
+        await ainvoke(payload=Payload(input="fail"))
+    lines = recorder.render().splitlines()
+    labels = f'project="{project_id}",stage="{A_STAGE_NAME}"'
+    assert f'galileo_protect_invocations_total{{{labels},status="not_triggered"}} 2' in lines
+    assert f'galileo_protect_invocation_errors_total{{{labels},error="GalileoHTTPException"}} 1' in lines
+    assert f"galileo_protect_invocation_latency_seconds_count{{{labels}}} 3" in lines
+    # The cached invocation doesn't send a request, and the failed request isn't recorded.
+    assert f"galileo_protect_request_latency_seconds_count{{{labels}}} 1" in lines
+    assert f"galileo_protect_execution_time_seconds_count{{{labels}}} 1" in lines
+
+
+@mark.asyncio
+async def test_ainvoke_local_decision_metrics(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable, recorder: PrometheusRecorder
+) -> None:
+    project_id = uuid4()
+    set_validated_config(project_id=project_id, stage_name=A_STAGE_NAME)
+    route = mock_echo_invoke()
+    ruleset = a_ruleset(a_rule(RuleMetrics.input_toxicity, RuleOperator.gte, 0.8), choice="toxic")
+    await ainvoke(payload=Payload(input="you moron"), prioritized_rulesets=[ruleset], local_metrics=True)
+    # Skipped by the preflight, no ruleset can apply to a payload without output.
+    await ainvoke(
+        payload=Payload(input=A_PROTECT_INPUT), prioritized_rulesets=[a_ruleset(RuleMetrics.pii)], preflight=Preflight()
+    )
+    assert not route.called
+    lines = recorder.render().splitlines()
+    labels = f'project="{project_id}",stage="{A_STAGE_NAME}"'
+    # Decided without a request, they're only recorded as invocations.
+    assert f'galileo_protect_invocations_total{{{labels},status="triggered"}} 1' in lines
+    assert f'galileo_protect_invocations_total{{{labels},status="not_triggered"}} 1' in lines
+    assert f"galileo_protect_invocation_latency_seconds_count{{{labels}}} 2" in lines
+    assert not any(line.startswith("galileo_protect_request_latency_seconds_count") for line in lines)
+
+
+@mark.asyncio
+async def test_ainvoke_parallel_rulesets_metrics(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable, recorder: PrometheusRecorder
+) -> None:
+    project_id = uuid4()
+    set_validated_config(project_id=project_id, stage_name=A_STAGE_NAME)
+    mock_echo_invoke()
+    await ainvoke(
+        payload=Payload(input=A_PROTECT_INPUT),
+        prioritized_rulesets=[a_ruleset(RuleMetrics.pii), a_ruleset(RuleMetrics.toxicity)],
+        parallel_rulesets=True,
+    )
+    lines = recorder.render().splitlines()
+    labels = f'project="{project_id}",stage="{A_STAGE_NAME}"'
+    # One invocation, with a request per ruleset.
+    assert f'galileo_protect_invocations_total{{{labels},status="not_triggered"}} 1' in lines
+    assert f"galileo_protect_invocation_latency_seconds_count{{{labels}}} 1" in lines
+    assert f"galileo_protect_request_latency_seconds_count{{{labels}}} 2" in lines
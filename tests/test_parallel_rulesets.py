@@ -0,0 +1,150 @@
+from asyncio import CancelledError, sleep
+from json import loads
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from httpx import Request as HttpxRequest
+from httpx import Response as HttpxResponse
+from pytest import mark, raises
+from respx import MockRouter, Route
+
+from galileo_core.exceptions.http import GalileoHTTPException
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_protect.constants.routes import Routes
+from galileo_protect.invocation import ainvoke, invoke
+from galileo_protect.schemas import Payload, RuleMetrics
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME, a_ruleset
+
+# Delay and status of the response for each ruleset's metric, None for a failure.
+Behaviors = Dict[str, Tuple[float, Optional[str]]]
+
+
+RULESETS = [a_ruleset(RuleMetrics.context_adherence_luna), a_ruleset(RuleMetrics.pii), a_ruleset(RuleMetrics.toxicity)]
+
+
+def mock_ruleset_invoke(respx_mock: MockRouter, behaviors: Behaviors, cancelled: List[str]) -> Route:
+    async def side_effect(request: HttpxRequest) -> HttpxResponse:
+        metric = loads(request.content)["rulesets"][0]["rules"][0]["metric"]
+        delay, status = behaviors[metric]
+        try:
+            await sleep(delay)
+        except CancelledError:
+            cancelled.append(metric)
+            raise
+        if status is None:
+            return HttpxResponse(500, text="Internal Server Error")
+        return HttpxResponse(
+            200, json=Response(text=metric, status=status, trace_metadata=TraceMetadata()).model_dump(mode="json")
+        )
+
+    return respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(side_effect=side_effect)
+
+
+@mark.asyncio
+@mark.parametrize(
+    ("behaviors", "expected", "expected_cancelled"),
+    [
+        # The highest priority ruleset triggers, the slow ones are cancelled.
+        (
+            {"context_adherence_luna": (0, "TRIGGERED"), "pii": (5, "TRIGGERED"), "toxicity": (5, "NOT_TRIGGERED")},
+            "context_adherence_luna",
+            ["pii", "toxicity"],
+        ),
+        # A lower priority ruleset triggers first, but waits for the ones ahead of it.
+        (
+            {"context_adherence_luna": (0.2, "NOT_TRIGGERED"), "pii": (0, "TRIGGERED"), "toxicity": (5, "TRIGGERED")},
+            "pii",
+            ["toxicity"],
+        ),
+        (
+            {"context_adherence_luna": (0.2, "TRIGGERED"), "pii": (0, "TRIGGERED"), "toxicity": (0, "TRIGGERED")},
+            "context_adherence_luna",
+            [],
+        ),
+        # A degraded ruleset could have been triggered, it's reported like a single request.
+        (
+            {"context_adherence_luna": (0.1, "TIMEOUT"), "pii": (0, "TRIGGERED"), "toxicity": (5, "TRIGGERED")},
+            "context_adherence_luna",
+            ["toxicity"],
+        ),
+        # Failures of rulesets behind the triggered one don't matter.
+        (
+            {"context_adherence_luna": (0, "NOT_TRIGGERED"), "pii": (0.2, "TRIGGERED"), "toxicity": (0, None)},
+            "pii",
+            [],
+        ),
+    ],
+)
+async def test_first_triggered_wins(
+    set_validated_config: Callable,
+    respx_mock: MockRouter,
+    behaviors: Behaviors,
+    expected: str,
+    expected_cancelled: List[str],
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    cancelled: List[str] = list()
+    mock_ruleset_invoke(respx_mock, behaviors, cancelled)
+    started_at = monotonic()
+    response = await ainvoke(
+        payload=Payload(input=A_PROTECT_INPUT), prioritized_rulesets=RULESETS, parallel_rulesets=True
+    )
+    assert monotonic() - started_at < 2
+    assert response.status == ExecutionStatus(str(behaviors[expected][1]).lower())
+    assert response.text == expected
+    await sleep(0)
+    assert sorted(cancelled) == expected_cancelled
+
+
+@mark.asyncio
+async def test_none_triggered(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    behaviors: Behaviors = {
+        "context_adherence_luna": (0, "NOT_TRIGGERED"),
+        "pii": (0.1, "TIMEOUT"),
+        "toxicity": (0, "NOT_TRIGGERED"),
+    }
+    mock_ruleset_invoke(respx_mock, behaviors, list())
+    response = await ainvoke(
+        payload=Payload(input=A_PROTECT_INPUT), prioritized_rulesets=RULESETS, parallel_rulesets=True
+    )
+    # Degraded rulesets are reported.
+    assert response.status == ExecutionStatus.timeout
+    behaviors["pii"] = (0, "NOT_TRIGGERED")
+    response = await ainvoke(
+        payload=Payload(input=A_PROTECT_INPUT), prioritized_rulesets=RULESETS, parallel_rulesets=True
+    )
+    assert response.status == ExecutionStatus.not_triggered
+
+
+@mark.asyncio
+async def test_higher_priority_failure(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    cancelled: List[str] = list()
+    behaviors: Behaviors = {
+        "context_adherence_luna": (0.1, None),
+        "pii": (0, "TRIGGERED"),
+        "toxicity": (5, "TRIGGERED"),
+    }
+    mock_ruleset_invoke(respx_mock, behaviors, cancelled)
+    with raises(GalileoHTTPException):
+        await ainvoke(payload=Payload(input=A_PROTECT_INPUT), prioritized_rulesets=RULESETS, parallel_rulesets=True)
+    await sleep(0)
+    assert cancelled == ["toxicity"]
+
+
+def test_invoke_parallel_rulesets(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    behaviors: Behaviors = {metric: (0, "NOT_TRIGGERED") for metric in ("context_adherence_luna", "pii", "toxicity")}
+    behaviors["toxicity"] = (0, "TRIGGERED")
+    route = mock_ruleset_invoke(respx_mock, behaviors, list())
+    response = invoke(payload=Payload(input=A_PROTECT_INPUT), prioritized_rulesets=RULESETS, parallel_rulesets=True)
+    assert response.text == "toxicity"
+    assert route.call_count == 3
+    # Without it, or with a single ruleset, the rulesets are sent in a single request.
+    invoke(payload=Payload(input=A_PROTECT_INPUT), prioritized_rulesets=RULESETS)
+    invoke(payload=Payload(input=A_PROTECT_INPUT), prioritized_rulesets=RULESETS[-1:], parallel_rulesets=True)
+    assert route.call_count == 5
+    assert len(loads(route.calls[3].request.content)["rulesets"]) == 3
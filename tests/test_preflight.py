@@ -0,0 +1,98 @@
+from json import loads
+from typing import Callable, List
+from uuid import uuid4
+
+from pytest import mark
+from respx import MockRouter
+
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_protect.invocation import ainvoke, invoke
+from galileo_protect.preflight import Preflight, PreflightReport, metric_field
+from galileo_protect.schemas import Payload, RuleMetrics
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME, a_ruleset
+
+INPUT_RULESET = a_ruleset(RuleMetrics.input_pii, RuleMetrics.prompt_injection)
+OUTPUT_RULESET = a_ruleset(RuleMetrics.pii)
+MIXED_RULESET = a_ruleset(RuleMetrics.input_toxicity, RuleMetrics.context_adherence_luna)
+CUSTOM_RULESET = a_ruleset("custom_metric")
+
+
+@mark.parametrize(
+    ("metric", "field"),
+    [
+        (RuleMetrics.input_pii, "input"),
+        (RuleMetrics.prompt_injection, "input"),
+        (RuleMetrics.toxicity, "output"),
+        (RuleMetrics.context_adherence_luna, "output"),
+        ("custom_metric", None),
+    ],
+)
+def test_metric_field(metric: str, field: str) -> None:
+    assert metric_field(metric) == field
+
+
+class TestPreflight:
+    def test_prune(self) -> None:
+        reports: List[PreflightReport] = list()
+        preflight = Preflight(on_prune=reports.append)
+        report = preflight.check(
+            Payload(input=A_PROTECT_INPUT), [OUTPUT_RULESET, INPUT_RULESET, MIXED_RULESET, CUSTOM_RULESET]
+        )
+        assert report.rulesets == [INPUT_RULESET, CUSTOM_RULESET]
+        assert [(pruned.index, pruned.missing_fields) for pruned in report.pruned] == [(0, ["output"]), (2, ["output"])]
+        assert not report.skip
+        assert reports == [report]
+        # Nothing to prune.
+        report = preflight.check(
+            Payload(input=A_PROTECT_INPUT, output=A_PROTECT_INPUT), [OUTPUT_RULESET, MIXED_RULESET]
+        )
+        assert report.rulesets == [OUTPUT_RULESET, MIXED_RULESET]
+        assert len(reports) == 1
+        # Input checks on a payload with only an output.
+        report = preflight.check(Payload(output=A_PROTECT_INPUT), [INPUT_RULESET, MIXED_RULESET])
+        assert report.skip
+        assert report.pruned[1].missing_fields == ["input"]
+        stats = preflight.stats
+        assert (stats.invocations, stats.skipped, stats.pruned_rulesets) == (3, 1, 4)
+
+    def test_callback_failure(self) -> None:
+        def fail(report: PreflightReport) -> None:
+            raise RuntimeError
+
+        report = Preflight(on_prune=fail).check(Payload(input=A_PROTECT_INPUT), [OUTPUT_RULESET])
+        assert report.skip
+
+
+@mark.asyncio
+async def test_ainvoke_preflight(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    route = mock_echo_invoke()
+    preflight = Preflight()
+    payload = Payload(input=A_PROTECT_INPUT)
+    response = await ainvoke(payload=payload, prioritized_rulesets=[OUTPUT_RULESET, MIXED_RULESET], preflight=preflight)
+    assert response.status == ExecutionStatus.not_triggered
+    assert response.text == A_PROTECT_INPUT
+    assert not route.called
+    await ainvoke(payload=payload, prioritized_rulesets=[OUTPUT_RULESET, INPUT_RULESET], preflight=preflight)
+    assert len(loads(route.calls.last.request.content)["rulesets"]) == 1
+    # Stage rulesets are only known to the server.
+    await ainvoke(payload=payload, preflight=preflight)
+    assert route.call_count == 2
+    assert preflight.stats.invocations == 2
+
+
+def test_invoke_preflight(set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    route = mock_echo_invoke()
+    response = invoke(
+        payload=Payload(input=A_PROTECT_INPUT),
+        prioritized_rulesets=[OUTPUT_RULESET],
+        metadata=dict(key="value"),
+        preflight=Preflight(),
+    )
+    assert response.status == ExecutionStatus.not_triggered
+    # The metadata is echoed back, as the API does.
+    assert response.model_dump()["metadata"] == dict(key="value")
+    assert not route.called
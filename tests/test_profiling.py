@@ -0,0 +1,127 @@
+from pathlib import Path
+from typing import Callable
+from unittest.mock import patch
+from uuid import uuid4
+
+from pytest import mark, raises
+from respx import MockRouter
+
+from galileo_protect.emulator import EmulatorServer, EmulatorSettings
+from galileo_protect.invocation import ainvoke, invoke, invoke_many
+from galileo_protect.profiling import CallProfile, Phase, Profiler, current_call, protect_profile
+from galileo_protect.protector import Protector
+from galileo_protect.schemas import Payload
+from galileo_protect.schemas.config import ProtectConfig
+from tests.data import A_JWT_TOKEN, A_PROTECT_INPUT, A_STAGE_NAME
+
+# Phases recorded for a call that sends a request, to a mocked transport.
+PHASES = [Phase.config, Phase.request, Phase.auth, Phase.wait, Phase.decode, Phase.total]
+
+
+def a_call(**durations: int) -> CallProfile:
+    call = CallProfile()
+    call.durations = {Phase(phase): duration for phase, duration in durations.items()}
+    return call
+
+
+class TestProfiler:
+    def test_summary(self) -> None:
+        profiler = Profiler()
+        for n in range(1, 101):
+            profiler.calls.append(a_call(wait=n * 1_000_000, decode=1_000_000, total=(n + 2) * 1_000_000))
+        summary = profiler.summary()
+        assert list(summary) == ["wait", "decode", "total", "other"]
+        assert summary["wait"].calls == 100
+        assert summary["wait"].p50 == 0.05
+        assert summary["wait"].p99 == 0.099
+        assert summary["wait"].max == 0.1
+        assert summary["decode"].mean == 0.001
+        # The time not spent in the other phases.
+        assert summary["other"].max == 0.001
+
+    def test_ring_buffer(self) -> None:
+        profiler = Profiler(max_calls=3)
+        for n in range(5):
+            profiler.calls.append(a_call(total=n))
+        assert len(profiler) == 3
+        assert profiler.summary()["total"].p50 == 3e-9
+        profiler.clear()
+        assert profiler.summary() == dict()
+
+    def test_dump(self) -> None:
+        profiler = Profiler()
+        profiler.calls.append(a_call(wait=2_000_000, total=3_000_000))
+        lines = profiler.dump().splitlines()
+        assert lines[0].split() == ["phase", "calls", "mean", "p50", "p99", "max"]
+        assert lines[1].split() == ["wait", "1", "2.000", "2.000", "2.000", "2.000"]
+        assert lines[-1].split()[0] == "other"
+
+    def test_invalid(self) -> None:
+        with raises(ValueError, match="Max calls must be at least 1"):
+            Profiler(max_calls=0)
+
+
+@mark.asyncio
+async def test_ainvoke_phases(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_echo_invoke()
+    # Not profiled outside of the context.
+    await ainvoke(payload=Payload(input=A_PROTECT_INPUT))
+    with protect_profile() as profiler:
+        for _ in range(3):
+            await ainvoke(payload=Payload(input=A_PROTECT_INPUT))
+        assert current_call() is None
+        await Protector().ainvoke(Payload(input=A_PROTECT_INPUT), result_mode="raw")
+    await ainvoke(payload=Payload(input=A_PROTECT_INPUT))
+    assert len(profiler) == 4
+    for call in profiler.calls:
+        assert list(call.durations) == PHASES
+        assert call.durations[Phase.wait] <= call.durations[Phase.total]
+    assert profiler.summary()["total"].calls == 4
+
+
+def test_invoke_phases(set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_echo_invoke()
+    profiler = Profiler()
+    # Several contexts can record to the same profiler.
+    for _ in range(2):
+        with protect_profile(profiler=profiler):
+            invoke(payload=Payload(input=A_PROTECT_INPUT))
+    with protect_profile(profiler=profiler):
+        invoke_many([Payload(input=str(n)) for n in range(3)])
+    assert len(profiler) == 5
+    assert all(list(call.durations) == PHASES for call in profiler.calls)
+
+
+def test_network_phases(tmp_home_dir: Path) -> None:
+    with EmulatorServer(EmulatorSettings(port=0)) as server:
+        ProtectConfig.get(console_url=server.url, api_url=server.url, jwt_token=A_JWT_TOKEN, project_id=uuid4())
+        try:
+            with protect_profile() as profiler:
+                invoke(payload=Payload(input=A_PROTECT_INPUT), stage_name=A_STAGE_NAME)
+        finally:
+            ProtectConfig.get().reset()
+    # The round trip is split by the network events of a real transport.
+    durations = profiler.calls[0].durations
+    assert list(durations) == [
+        Phase.config,
+        Phase.request,
+        Phase.auth,
+        Phase.send,
+        Phase.wait,
+        Phase.receive,
+        Phase.decode,
+        Phase.total,
+    ]
+    assert sum(durations[phase] for phase in (Phase.send, Phase.wait, Phase.receive)) <= durations[Phase.total]
+
+
+def test_not_profiled(set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_echo_invoke()
+    with patch.object(CallProfile, "add") as mock_add:
+        invoke(payload=Payload(input=A_PROTECT_INPUT))
+    mock_add.assert_not_called()
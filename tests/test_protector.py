@@ -0,0 +1,74 @@
+from json import loads
+from typing import Callable, List
+from unittest.mock import Mock, patch
+from uuid import uuid4
+
+from pytest import mark, raises
+
+from galileo_core.schemas.protect.execution_status import ExecutionStatus
+from galileo_core.schemas.protect.response import Response
+from galileo_protect.cache import ResponseCache
+from galileo_protect.invocation import Request, invoke
+from galileo_protect.protector import Protector
+from galileo_protect.schemas import Payload, RawResponse, ResultMode, Ruleset
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME
+
+
+@mark.parametrize("metadata", [None, {"key": "value"}])
+@mark.parametrize("headers", [None, {"key": "value"}])
+def test_same_request_as_invoke(
+    mock_invoke: Mock,
+    set_validated_config: Callable,
+    rulesets: List[Ruleset],
+    metadata: dict,
+    headers: dict,
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    payload = Payload(input=A_PROTECT_INPUT, output=A_PROTECT_INPUT)
+    invoke(payload=payload, prioritized_rulesets=rulesets, timeout=5, metadata=metadata, headers=headers)
+    expected = loads(mock_invoke.calls.last.request.content)
+    protector = Protector(prioritized_rulesets=rulesets, timeout=5)
+    response = protector.invoke(payload=payload, metadata=metadata, headers=headers)
+    assert response.text == A_PROTECT_INPUT
+    assert loads(mock_invoke.calls.last.request.content) == expected
+
+
+@mark.asyncio
+async def test_validates_once(mock_invoke: Mock, set_validated_config: Callable, rulesets: List[Ruleset]) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    with patch("galileo_protect.invocation.Request", wraps=Request) as mock_request_model:
+        protector = Protector(prioritized_rulesets=rulesets)
+        for text in ["foo", "bar", "baz"]:
+            response = await protector.ainvoke(payload=Payload(input=text))
+            assert response.text == A_PROTECT_INPUT
+    assert mock_request_model.call_count == 1
+    assert mock_invoke.call_count == 3
+    assert [loads(call.request.content)["payload"]["input"] for call in mock_invoke.calls] == ["foo", "bar", "baz"]
+
+
+def test_invalid_identity(set_validated_config: Callable) -> None:
+    set_validated_config()
+    with raises(ValueError, match="Either stage_id or stage_name and project_id"):
+        Protector()
+
+
+@mark.parametrize("result_mode", [ResultMode.raw, "raw"])
+def test_raw_result(mock_invoke: Mock, set_validated_config: Callable, result_mode: ResultMode) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    protector = Protector()
+    raw = protector.invoke(payload=Payload(input=A_PROTECT_INPUT), result_mode=result_mode)
+    assert isinstance(raw, RawResponse)
+    assert raw.text == A_PROTECT_INPUT
+    assert raw.status == ExecutionStatus.not_triggered
+    assert isinstance(raw.to_response(), Response)
+
+
+@mark.asyncio
+async def test_raw_result_cached(mock_invoke: Mock, set_validated_config: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    protector = Protector(cache=ResponseCache())
+    for _ in range(2):
+        raw = await protector.ainvoke(payload=Payload(input=A_PROTECT_INPUT), result_mode=ResultMode.raw)
+        assert isinstance(raw, RawResponse)
+        assert raw.text == A_PROTECT_INPUT
+    assert mock_invoke.call_count == 1
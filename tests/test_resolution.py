@@ -0,0 +1,130 @@
+from json import loads
+from typing import Callable
+from unittest.mock import Mock, patch
+from uuid import uuid4
+
+from pytest import raises
+
+from galileo_core.constants.request_method import RequestMethod
+from galileo_core.constants.routes import Routes as CoreRoutes
+from galileo_core.schemas.core.project import ProjectResponse, ProjectType
+from galileo_protect.constants.routes import Routes
+from galileo_protect.invocation import invoke
+from galileo_protect.project import get_project
+from galileo_protect.resolution import NameResolutionCache, resolution_cache
+from galileo_protect.schemas import Payload
+from galileo_protect.schemas.stage import StageResponse
+from galileo_protect.stage import create_stage, get_stage, update_stage
+from tests.data import A_PROJECT_NAME, A_PROTECT_INPUT, A_STAGE_NAME
+
+
+def a_project() -> ProjectResponse:
+    return ProjectResponse(id=uuid4(), type=ProjectType.protect, name=A_PROJECT_NAME)
+
+
+class TestNameResolutionCache:
+    def test_project(self) -> None:
+        cache = NameResolutionCache()
+        project = a_project()
+        assert cache.get_project(project_name=A_PROJECT_NAME) is None
+        cache.set_project(project)
+        assert cache.get_project(project_name=A_PROJECT_NAME) == project
+        assert cache.get_project(project_id=project.id) == project
+        assert cache.get_project_id(A_PROJECT_NAME) == project.id
+        cache.invalidate(project_name=A_PROJECT_NAME)
+        assert cache.get_project(project_name=A_PROJECT_NAME) is None
+        assert cache.get_project(project_id=project.id) is None
+
+    def test_stage(self) -> None:
+        cache = NameResolutionCache()
+        project_id, stage_id = uuid4(), uuid4()
+        cache.set_stage(StageResponse(id=stage_id, name=A_STAGE_NAME, project_id=project_id))
+        assert cache.get_stage_id(project_id, A_STAGE_NAME) == stage_id
+        assert cache.get_stage_id(uuid4(), A_STAGE_NAME) is None
+        cache.invalidate(project_id=project_id, stage_name=A_STAGE_NAME)
+        assert cache.get_stage_id(project_id, A_STAGE_NAME) is None
+
+    def test_ttl(self) -> None:
+        cache = NameResolutionCache(ttl=10)
+        with patch("galileo_protect.resolution.monotonic", return_value=0):
+            cache.set_project(a_project())
+        with patch("galileo_protect.resolution.monotonic", return_value=5):
+            assert cache.get_project_id(A_PROJECT_NAME) is not None
+        with patch("galileo_protect.resolution.monotonic", return_value=11):
+            assert cache.get_project_id(A_PROJECT_NAME) is None
+
+    def test_max_entries(self) -> None:
+        cache = NameResolutionCache(max_entries=2)
+        project_id = uuid4()
+        stage_ids = [uuid4() for _ in range(3)]
+        for index, stage_id in enumerate(stage_ids[:2]):
+            cache.set_stage(StageResponse(id=stage_id, name=f"stage-{index}", project_id=project_id))
+        # Reading the first stage makes the second one the least recently used.
+        assert cache.get_stage_id(project_id, "stage-0") == stage_ids[0]
+        cache.set_stage(StageResponse(id=stage_ids[2], name="stage-2", project_id=project_id))
+        assert cache.get_stage_id(project_id, "stage-0") == stage_ids[0]
+        assert cache.get_stage_id(project_id, "stage-1") is None
+        assert cache.get_stage_id(project_id, "stage-2") == stage_ids[2]
+
+    def test_max_entries_invalid(self) -> None:
+        with raises(ValueError):
+            NameResolutionCache(max_entries=0)
+
+    def test_clear(self) -> None:
+        cache = NameResolutionCache()
+        cache.set_project(a_project())
+        cache.clear()
+        assert cache.get_project_id(A_PROJECT_NAME) is None
+
+
+def test_get_stage_resolves_project_once(set_validated_config: Callable, mock_request: Callable) -> None:
+    set_validated_config()
+    project = a_project()
+    matcher_project = mock_request(
+        RequestMethod.GET,
+        CoreRoutes.projects,
+        params=dict(project_name=A_PROJECT_NAME),
+        json=[project.model_dump(mode="json")],
+    )
+    mock_request(
+        RequestMethod.GET,
+        Routes.stages.format(project_id=project.id),
+        json=StageResponse(id=uuid4(), name=A_STAGE_NAME, project_id=project.id).model_dump(mode="json"),
+    )
+    for _ in range(3):
+        get_stage(project_name=A_PROJECT_NAME, stage_name=A_STAGE_NAME)
+    assert matcher_project.call_count == 1
+    # The project is also served from the cache.
+    assert get_project(project_name=A_PROJECT_NAME) == project
+    assert matcher_project.call_count == 1
+
+
+def test_update_stage_uses_created_stage(set_validated_config: Callable, mock_request: Callable) -> None:
+    config = set_validated_config()
+    project_id, stage_id = uuid4(), uuid4()
+    response = StageResponse(id=stage_id, name=A_STAGE_NAME, project_id=project_id, version=0)
+    mock_request(RequestMethod.POST, Routes.stages.format(project_id=project_id), json=response.model_dump(mode="json"))
+    create_stage(project_id=project_id, name=A_STAGE_NAME)
+    matcher_get = mock_request(
+        RequestMethod.GET, Routes.stages.format(project_id=project_id), json=response.model_dump(mode="json")
+    )
+    matcher_update = mock_request(
+        RequestMethod.POST,
+        Routes.stage.format(project_id=project_id, stage_id=stage_id),
+        json=response.model_copy(update=dict(version=1)).model_dump(mode="json"),
+    )
+    # Drop the IDs from the config so that they need to be resolved from the name.
+    config.stage_id = None
+    update_stage(project_id=project_id, stage_name=A_STAGE_NAME)
+    assert matcher_update.called
+    assert not matcher_get.called
+
+
+def test_invoke_sends_resolved_stage_id(mock_invoke: Mock, set_validated_config: Callable) -> None:
+    project_id, stage_id = uuid4(), uuid4()
+    set_validated_config(project_id=project_id, stage_name=A_STAGE_NAME)
+    invoke(payload=Payload(input=A_PROTECT_INPUT))
+    assert loads(mock_invoke.calls.last.request.content)["stage_id"] is None
+    resolution_cache.set_stage(StageResponse(id=stage_id, name=A_STAGE_NAME, project_id=project_id))
+    invoke(payload=Payload(input=A_PROTECT_INPUT))
+    assert loads(mock_invoke.calls.last.request.content)["stage_id"] == str(stage_id)
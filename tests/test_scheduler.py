@@ -0,0 +1,157 @@
+from asyncio import gather, sleep, wait_for
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from time import monotonic
+from typing import Callable, List
+from uuid import uuid4
+
+from httpx import Response as HttpxResponse
+from pytest import approx, mark, raises
+from respx import MockRouter
+
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_protect.constants.routes import Routes
+from galileo_protect.exceptions import RateLimitedError, SchedulerQueueFullError
+from galileo_protect.invocation import ainvoke
+from galileo_protect.langchain import ProtectTool
+from galileo_protect.scheduler import InvocationScheduler, Priority, retry_after_seconds
+from galileo_protect.schemas import Payload
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME
+
+A_KEY = ("credentials", "project")
+AN_OK_RESPONSE = HttpxResponse(
+    200,
+    json=Response(text=A_PROTECT_INPUT, status="NOT_TRIGGERED", trace_metadata=TraceMetadata()).model_dump(mode="json"),
+)
+
+
+def a_call(name: str, admitted: List[str]) -> Callable:
+    async def call() -> str:
+        admitted.append(name)
+        return name
+
+    return call
+
+
+@mark.parametrize(
+    ["value", "expected"],
+    [["2", 2.0], ["0.5", 0.5], ["-1", 0.0], [None, None], ["soon", None], ["Wed, 21 Oct 2015 07:28:00 GMT", 0.0]],
+)
+def test_retry_after_seconds(value: str, expected: float) -> None:
+    assert retry_after_seconds(value) == expected
+
+
+def test_retry_after_seconds_date() -> None:
+    value = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert retry_after_seconds(value) == approx(30, abs=2)
+
+
+class TestInvocationScheduler:
+    @mark.asyncio
+    async def test_burst(self) -> None:
+        scheduler = InvocationScheduler(rate=1, burst=3)
+        admitted: List[str] = []
+        started_at = monotonic()
+        await gather(*[scheduler.run(A_KEY, a_call(str(n), admitted)) for n in range(3)])
+        assert monotonic() - started_at < 0.5
+        assert scheduler.stats.admitted == 3
+
+    @mark.asyncio
+    async def test_rate(self) -> None:
+        scheduler = InvocationScheduler(rate=50, burst=1)
+        admitted: List[str] = []
+        started_at = monotonic()
+        await gather(*[scheduler.run(A_KEY, a_call(str(n), admitted)) for n in range(6)])
+        # The first call uses the burst, the rest wait for a token each.
+        assert monotonic() - started_at >= 0.09
+        assert admitted == [str(n) for n in range(6)]
+        stats = scheduler.stats
+        assert (stats.admitted, stats.queued) == (6, 0)
+
+    @mark.asyncio
+    async def test_separate_keys(self) -> None:
+        scheduler = InvocationScheduler(rate=0.1, burst=1)
+        admitted: List[str] = []
+        await scheduler.run(A_KEY, a_call("first", admitted))
+        await scheduler.run(("credentials", "other"), a_call("other", admitted))
+        assert admitted == ["first", "other"]
+
+    @mark.asyncio
+    async def test_weighted_fair_queueing(self) -> None:
+        scheduler = InvocationScheduler(rate=100, burst=1)
+        admitted: List[str] = []
+        await scheduler.run(A_KEY, a_call("warm up", admitted))
+        batch = [scheduler.run(A_KEY, a_call("batch", admitted), Priority.batch) for _ in range(8)]
+        interactive = [scheduler.run(A_KEY, a_call("interactive", admitted), "interactive") for _ in range(4)]
+        await gather(*batch, *interactive)
+        # Interactive invocations get 4 tokens for every batch token, even if queued later.
+        assert admitted[1:6].count("interactive") == 4
+        assert admitted.count("batch") == 8
+
+    @mark.asyncio
+    async def test_queue_full(self) -> None:
+        scheduler = InvocationScheduler(rate=10, burst=1, max_queue_size=1)
+        admitted: List[str] = []
+        results = await gather(
+            *[scheduler.run(A_KEY, a_call(str(n), admitted)) for n in range(3)], return_exceptions=True
+        )
+        assert isinstance(results[2], SchedulerQueueFullError)
+        assert admitted == ["0", "1"]
+        assert scheduler.stats.rejected == 1
+
+    @mark.asyncio
+    async def test_cancelled_waiter(self) -> None:
+        scheduler = InvocationScheduler(rate=20, burst=1)
+        admitted: List[str] = []
+        await scheduler.run(A_KEY, a_call("first", admitted))
+        with raises(TimeoutError):
+            await wait_for(scheduler.run(A_KEY, a_call("cancelled", admitted)), timeout=0.01)
+        await scheduler.run(A_KEY, a_call("last", admitted))
+        await sleep(0.05)
+        assert admitted == ["first", "last"]
+
+    def test_invalid(self) -> None:
+        with raises(ValueError, match="Rate must be positive."):
+            InvocationScheduler(rate=0)
+        with raises(ValueError, match="Burst must be at least 1."):
+            InvocationScheduler(rate=1, burst=0.5)
+        with raises(ValueError, match="Priority weights must be positive."):
+            InvocationScheduler(rate=1, weights={"batch": 0})
+
+
+@mark.asyncio
+async def test_ainvoke_retries_after(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    route = respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(
+        side_effect=[HttpxResponse(429, headers={"Retry-After": "0.1"}), AN_OK_RESPONSE]
+    )
+    scheduler = InvocationScheduler(rate=100)
+    started_at = monotonic()
+    response = await ainvoke(payload=Payload(input=A_PROTECT_INPUT), scheduler=scheduler)
+    assert response.text == A_PROTECT_INPUT
+    assert monotonic() - started_at >= 0.1
+    assert route.call_count == 2
+    assert scheduler.stats.retries == 1
+
+
+@mark.asyncio
+async def test_ainvoke_retries_exhausted(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(return_value=HttpxResponse(503))
+    with raises(RateLimitedError) as exc_info:
+        await ainvoke(
+            payload=Payload(input=A_PROTECT_INPUT),
+            scheduler=InvocationScheduler(rate=100, max_retries=1, backoff=0.01),
+        )
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.retry_after is None
+
+
+def test_tool_scheduler(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(return_value=AN_OK_RESPONSE)
+    scheduler = InvocationScheduler(rate=100)
+    tool = ProtectTool(scheduler=scheduler, priority=Priority.batch)
+    tool.run(dict(input=A_PROTECT_INPUT))
+    tool.batch([A_PROTECT_INPUT, A_PROTECT_INPUT])
+    assert scheduler.stats.admitted == 3
@@ -7,9 +7,12 @@ from pytest import mark, raises
 from galileo_core.constants.request_method import RequestMethod
 from galileo_core.constants.routes import Routes as CoreRoutes
 from galileo_core.schemas.core.project import ProjectResponse, ProjectType
+from galileo_core.schemas.protect.response import Response, TraceMetadata
 from galileo_core.schemas.protect.ruleset import Ruleset
 from galileo_core.schemas.protect.stage import StageType
+from galileo_protect.cache import ResponseCache
 from galileo_protect.constants.routes import Routes
+from galileo_protect.resolution import resolution_cache
 from galileo_protect.schemas.stage import StageResponse
 from galileo_protect.stage import (
     create_stage,
@@ -351,6 +354,26 @@ class TestUpdate:
         assert stage.name == A_STAGE_NAME
         assert stage.type == StageType.central
 
+    def test_invalidates_cache(self, set_validated_config: Callable, mock_request: Callable) -> None:
+        project_id, stage_id = uuid4(), uuid4()
+        set_validated_config()
+        cache = ResponseCache()
+        cache.set(
+            "key",
+            Response(text=A_STAGE_NAME, trace_metadata=TraceMetadata()),
+            request_json=dict(stage_id=str(stage_id)),
+        )
+        response = StageResponse(
+            id=stage_id, name=A_STAGE_NAME, project_id=project_id, version=2, type=StageType.central
+        )
+        mock_request(
+            RequestMethod.POST,
+            Routes.stage.format(project_id=project_id, stage_id=stage_id),
+            json=response.model_dump(mode="json"),
+        )
+        update_stage(project_id=project_id, stage_id=stage_id)
+        assert cache.get("key") is None
+
     def test_raises_missing_project_id(self, set_validated_config: Callable) -> None:
         set_validated_config()
         with raises(ValueError) as exc_info:
@@ -365,6 +388,34 @@ class TestUpdate:
 
 
 class TestPause:
+    @mark.parametrize("name_from_config", [True, False])
+    def test_invalidates_cache_by_name(
+        self, set_validated_config: Callable, mock_request: Callable, name_from_config: bool
+    ) -> None:
+        project_id, stage_id = uuid4(), uuid4()
+        cache = ResponseCache()
+        # Cached before the stage ID was known.
+        cache.set(
+            "key",
+            Response(text=A_STAGE_NAME, trace_metadata=TraceMetadata()),
+            request_json=dict(project_id=str(project_id), stage_name=A_STAGE_NAME),
+        )
+        cache.set(
+            "other",
+            Response(text=A_STAGE_NAME, trace_metadata=TraceMetadata()),
+            request_json=dict(project_id=str(uuid4()), stage_name=A_STAGE_NAME),
+        )
+        if name_from_config:
+            set_validated_config(project_id=project_id, stage_id=stage_id, stage_name=A_STAGE_NAME)
+        else:
+            set_validated_config()
+            resolution_cache.set_stage(StageResponse(id=stage_id, name=A_STAGE_NAME, project_id=project_id))
+        mock_request(RequestMethod.PUT, Routes.stage.format(project_id=project_id, stage_id=stage_id))
+        pause_stage(project_id=project_id, stage_id=stage_id)
+        assert cache.get("key") is None
+        # Same-named stages of other projects are kept.
+        assert cache.get("other") is not None
+
     @mark.parametrize("pause", ["true", True])
     def test_params(self, set_validated_config: Callable, mock_request: Callable, pause: Union[str, bool]) -> None:
         project_id, stage_id = uuid4(), uuid4()
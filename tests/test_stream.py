@@ -0,0 +1,190 @@
+from asyncio import Event, gather, sleep, wait_for
+from json import loads
+from typing import AsyncIterator, Callable, List
+from uuid import uuid4
+
+from httpx import Request as HttpxRequest
+from httpx import Response as HttpxResponse
+from pytest import mark, raises
+from respx import MockRouter, Route
+
+from galileo_core.exceptions.http import GalileoHTTPException
+from galileo_core.schemas.protect.response import Response, TraceMetadata
+from galileo_protect.constants.routes import Routes
+from galileo_protect.stream import ProtectStreamGuard, WindowPolicy, _Window
+from tests.data import A_STAGE_NAME
+
+OVERRIDE_TEXT = "Sorry, I can't help with that."
+TOKENS = ["This ", "is ", "fine. ", "This ", "is ", "bad. ", "More ", "tokens ", "here."]
+
+
+def mock_trigger_invoke(respx_mock: MockRouter, trigger: str = "bad") -> Route:
+    """Mock the invoke route to trigger when the payload output contains `trigger`."""
+
+    def side_effect(request: HttpxRequest) -> HttpxResponse:
+        output = loads(request.content)["payload"]["output"]
+        triggered = trigger in output
+        return HttpxResponse(
+            200,
+            json=Response(
+                text=OVERRIDE_TEXT if triggered else output,
+                status="TRIGGERED" if triggered else "NOT_TRIGGERED",
+                trace_metadata=TraceMetadata(),
+            ).model_dump(mode="json"),
+        )
+
+    return respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(side_effect=side_effect)
+
+
+async def atokens(tokens: List[str], delay: float = 0.05) -> AsyncIterator[str]:
+    for token in tokens:
+        await sleep(delay)
+        yield token
+
+
+class TestWindow:
+    def test_tokens(self) -> None:
+        window = _Window(WindowPolicy.tokens, tokens=3, seconds=1)
+        assert [window.add(token) for token in TOKENS[:6]] == [False, False, True, False, False, True]
+
+    def test_sentence(self) -> None:
+        window = _Window(WindowPolicy.sentence, tokens=3, seconds=1)
+        assert [window.add(token) for token in ["Hi", " there", "!", ' "Quoted."', "\n"]] == [
+            False,
+            False,
+            True,
+            True,
+            True,
+        ]
+
+    def test_time(self) -> None:
+        window = _Window(WindowPolicy.time, tokens=3, seconds=0)
+        assert window.add("a")
+
+
+class TestStreamGuard:
+    def test_passthrough(self, set_validated_config: Callable, respx_mock: MockRouter) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        route = mock_trigger_invoke(respx_mock, trigger="never")
+        guard = ProtectStreamGuard(window_tokens=4)
+        assert list(guard.guard(TOKENS)) == TOKENS
+        assert guard.triggered_response is None
+        # 2 full windows and a final check on the full output.
+        assert route.call_count == 3
+        assert loads(route.calls.last.request.content)["payload"]["output"] == "".join(TOKENS)
+
+    def test_triggered(self, set_validated_config: Callable, respx_mock: MockRouter) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        mock_trigger_invoke(respx_mock)
+        guard = ProtectStreamGuard(window_policy=WindowPolicy.sentence)
+        streamed = list(guard.guard(TOKENS))
+        assert streamed[-1] == OVERRIDE_TEXT
+        assert streamed.count(OVERRIDE_TEXT) == 1
+        assert guard.triggered_response is not None
+        assert guard.triggered_response.text == OVERRIDE_TEXT
+
+    @mark.asyncio
+    async def test_async_passthrough(self, set_validated_config: Callable, respx_mock: MockRouter) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        mock_trigger_invoke(respx_mock, trigger="never")
+        guard = ProtectStreamGuard(window_policy="sentence", input="Say something.")
+        assert [token async for token in guard.aguard(atokens(TOKENS, delay=0))] == TOKENS
+
+    @mark.asyncio
+    async def test_async_triggered_cuts_stream(self, set_validated_config: Callable, respx_mock: MockRouter) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        route = mock_trigger_invoke(respx_mock)
+        guard = ProtectStreamGuard(window_policy=WindowPolicy.sentence, input="Say something.")
+        streamed = [token async for token in guard.aguard(atokens(TOKENS))]
+        # The check for the second sentence completes before the next token arrives.
+        assert streamed == [*TOKENS[:6], OVERRIDE_TEXT]
+        assert route.call_count == 2
+        assert loads(route.calls.last.request.content)["payload"]["input"] == "Say something."
+
+    @mark.asyncio
+    async def test_async_stalled_stream_cut(self, set_validated_config: Callable, respx_mock: MockRouter) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        mock_trigger_invoke(respx_mock)
+        stalled = Event()
+
+        async def stalling() -> AsyncIterator[str]:
+            yield "This is bad. "
+            # The next token never arrives.
+            await stalled.wait()
+            yield "More tokens."
+
+        guard = ProtectStreamGuard(window_policy=WindowPolicy.sentence)
+
+        async def consume() -> List[str]:
+            return [token async for token in guard.aguard(stalling())]
+
+        assert await wait_for(consume(), timeout=5) == ["This is bad. ", OVERRIDE_TEXT]
+
+    @mark.asyncio
+    async def test_async_time_window_between_tokens(
+        self, set_validated_config: Callable, respx_mock: MockRouter
+    ) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        route = mock_trigger_invoke(respx_mock, trigger="never")
+
+        async def slow() -> AsyncIterator[str]:
+            yield "First. "
+            await sleep(0.3)
+            assert route.call_count == 1
+            yield "Second."
+
+        guard = ProtectStreamGuard(window_policy=WindowPolicy.time, window_seconds=0.05)
+        assert [token async for token in guard.aguard(slow())] == ["First. ", "Second."]
+        # The window after the first token, and the final check. Windows without new
+        # tokens aren't checked.
+        assert [loads(call.request.content)["payload"]["output"] for call in route.calls] == [
+            "First. ",
+            "First. Second.",
+        ]
+
+    def test_failed_check_continues(self, set_validated_config: Callable, respx_mock: MockRouter) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        route = respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(return_value=HttpxResponse(500))
+        guard = ProtectStreamGuard(window_tokens=2)
+        assert list(guard.guard(TOKENS)) == TOKENS
+        assert route.called
+
+    def test_failed_check_raises(self, set_validated_config: Callable, respx_mock: MockRouter) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(return_value=HttpxResponse(500))
+        guard = ProtectStreamGuard(window_tokens=2, raise_errors=True)
+        with raises(GalileoHTTPException):
+            list(guard.guard(TOKENS))
+
+    @mark.asyncio
+    async def test_async_failed_check_continues(self, set_validated_config: Callable, respx_mock: MockRouter) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(return_value=HttpxResponse(500))
+        guard = ProtectStreamGuard(window_policy=WindowPolicy.sentence)
+        assert [token async for token in guard.aguard(atokens(TOKENS, delay=0.01))] == TOKENS
+
+    @mark.asyncio
+    async def test_async_concurrent_streams(self, set_validated_config: Callable, respx_mock: MockRouter) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        mock_trigger_invoke(respx_mock)
+        guard = ProtectStreamGuard(window_policy=WindowPolicy.sentence)
+        triggered: List[Response] = []
+
+        async def consume(tokens: List[str]) -> List[str]:
+            return [token async for token in guard.aguard(atokens(tokens), on_trigger=triggered.append)]
+
+        fine = ["All ", "good. "] * 4
+        streamed = await gather(consume(TOKENS), consume(fine))
+        assert streamed[0][-1] == OVERRIDE_TEXT
+        assert streamed[1] == fine
+        # Only the stream that was cut reports a response.
+        assert [response.text for response in triggered] == [OVERRIDE_TEXT]
+
+    def test_empty_stream(self, set_validated_config: Callable) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        assert list(ProtectStreamGuard().guard([])) == []
+
+    def test_invalid_window(self, set_validated_config: Callable) -> None:
+        set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+        with raises(ValueError, match="Window tokens must be at least 1."):
+            ProtectStreamGuard(window_tokens=0)
@@ -0,0 +1,124 @@
+from json import loads
+from typing import Callable
+from unittest.mock import Mock
+from uuid import uuid4
+
+from httpx import ReadTimeout
+from httpx import Response as HttpxResponse
+from pytest import approx, mark, raises
+from respx import MockRouter
+
+from galileo_protect.constants.invoke import TIMEOUT, TIMEOUT_MARGIN
+from galileo_protect.constants.routes import Routes
+from galileo_protect.invocation import ainvoke
+from galileo_protect.protector import Protector
+from galileo_protect.schemas import Payload, RawResponse
+from galileo_protect.timeout import AdaptiveTimeout
+from tests.data import A_PROTECT_INPUT, A_STAGE_NAME, a_response
+
+A_REQUEST = dict(project_id=str(uuid4()), stage_name=A_STAGE_NAME)
+
+
+class TestAdaptiveTimeout:
+    def test_defaults_until_observed(self) -> None:
+        adaptive_timeout = AdaptiveTimeout(min_samples=5)
+        for _ in range(4):
+            assert adaptive_timeout.timeouts(A_REQUEST) == (TIMEOUT, TIMEOUT + TIMEOUT_MARGIN)
+            adaptive_timeout.observe(A_REQUEST, a_response(execution_time=0.1), elapsed=0.15)
+        adaptive_timeout.observe(A_REQUEST, a_response(execution_time=0.1), elapsed=0.15)
+        assert adaptive_timeout.timeouts(A_REQUEST) != (TIMEOUT, TIMEOUT + TIMEOUT_MARGIN)
+
+    @mark.parametrize(
+        ["execution_time", "elapsed", "expected_timeout", "expected_read_timeout"],
+        [
+            # 2x the execution time, with the minimum read margin.
+            [0.2, 0.25, 0.4, 0.9],
+            # Bounded by the floor.
+            [0.01, 0.02, 0.1, 0.6],
+            # Bounded by the ceiling, with 2x the network time as the read margin.
+            [3, 4, 5, 7],
+            # The read margin is bounded by the default timeout margin.
+            [0.2, 5.2, 0.4, 0.4 + TIMEOUT_MARGIN],
+        ],
+    )
+    def test_timeouts(
+        self, execution_time: float, elapsed: float, expected_timeout: float, expected_read_timeout: float
+    ) -> None:
+        adaptive_timeout = AdaptiveTimeout(floor=0.1, ceiling=5, min_samples=1)
+        adaptive_timeout.observe(A_REQUEST, a_response(execution_time=execution_time), elapsed=elapsed)
+        timeouts = adaptive_timeout.timeouts(A_REQUEST)
+        assert timeouts.timeout == approx(expected_timeout)
+        assert timeouts.read_timeout == approx(expected_read_timeout)
+
+    def test_unknown_execution_time(self) -> None:
+        adaptive_timeout = AdaptiveTimeout(floor=0.1, min_samples=1)
+        response = RawResponse.from_json(b'{"text": "foo", "trace_metadata": {}}')
+        assert response.execution_time < 0
+        # All of the round trip is counted as execution.
+        adaptive_timeout.observe(A_REQUEST, response, elapsed=0.2)
+        assert adaptive_timeout.timeouts(A_REQUEST) == approx((0.4, 0.9))
+
+    def test_observe_timeout(self) -> None:
+        adaptive_timeout = AdaptiveTimeout(floor=0.1, ceiling=5, min_samples=1)
+        adaptive_timeout.observe(A_REQUEST, a_response(execution_time=0.2), elapsed=0.2)
+        assert adaptive_timeout.timeouts(A_REQUEST) == approx((0.4, 0.9))
+        # A request cut by the timeouts raises them.
+        adaptive_timeout.observe_timeout(dict(A_REQUEST, timeout=0.4), read_timeout=0.9)
+        assert adaptive_timeout.timeouts(A_REQUEST) == approx((0.8, 1.8))
+
+    def test_per_stage(self) -> None:
+        adaptive_timeout = AdaptiveTimeout(floor=0.1, min_samples=1)
+        other_stage = dict(A_REQUEST, stage_name="other")
+        adaptive_timeout.observe(A_REQUEST, a_response(execution_time=0.2), elapsed=0.2)
+        adaptive_timeout.observe(other_stage, RawResponse.from_response(a_response(execution_time=1)), elapsed=1)
+        assert adaptive_timeout.timeouts(A_REQUEST).timeout == approx(0.4)
+        assert adaptive_timeout.timeouts(other_stage).timeout == approx(2)
+        adaptive_timeout.clear()
+        assert adaptive_timeout.timeouts(A_REQUEST).timeout == TIMEOUT
+
+    def test_invalid(self) -> None:
+        with raises(ValueError, match="Timeout percentile must be between 0 and 100."):
+            AdaptiveTimeout(percentile=0)
+        with raises(ValueError, match="Timeout multiplier must be at least 1."):
+            AdaptiveTimeout(multiplier=0.5)
+        with raises(ValueError, match="Timeout floor must be positive and at most the ceiling."):
+            AdaptiveTimeout(floor=20)
+
+
+@mark.asyncio
+async def test_ainvoke_adaptive_timeout(mock_invoke: Mock, set_validated_config: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    adaptive_timeout = AdaptiveTimeout(floor=0.25, min_samples=1)
+    await ainvoke(payload=Payload(input=A_PROTECT_INPUT), timeout=adaptive_timeout)
+    assert loads(mock_invoke.calls.last.request.content)["timeout"] == TIMEOUT
+    await ainvoke(payload=Payload(input=A_PROTECT_INPUT), timeout=adaptive_timeout)
+    # The mocked responses are fast, so the timeout drops to the floor.
+    assert loads(mock_invoke.calls.last.request.content)["timeout"] == 0.25
+
+
+def test_protector_adaptive_timeout(mock_invoke: Mock, set_validated_config: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    protector = Protector(timeout=AdaptiveTimeout(floor=0.25, min_samples=1))
+    for _ in range(2):
+        protector.invoke(Payload(input=A_PROTECT_INPUT))
+    assert loads(mock_invoke.calls.last.request.content)["timeout"] == 0.25
+
+
+@mark.asyncio
+async def test_ainvoke_adaptive_timeout_timed_out(set_validated_config: Callable, respx_mock: MockRouter) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    adaptive_timeout = AdaptiveTimeout(floor=0.25, min_samples=1)
+    route = respx_mock.post(url__regex=f".*/{Routes.invoke}$").mock(
+        side_effect=[
+            HttpxResponse(200, json=a_response().model_dump(mode="json")),
+            ReadTimeout("timed out"),
+            HttpxResponse(200, json=a_response().model_dump(mode="json")),
+        ]
+    )
+    await ainvoke(payload=Payload(input=A_PROTECT_INPUT), timeout=adaptive_timeout)
+    with raises(ReadTimeout):
+        await ainvoke(payload=Payload(input=A_PROTECT_INPUT), timeout=adaptive_timeout)
+    assert loads(route.calls.last.request.content)["timeout"] == 0.25
+    await ainvoke(payload=Payload(input=A_PROTECT_INPUT), timeout=adaptive_timeout)
+    # The timed out request raised the timeout.
+    assert loads(route.calls.last.request.content)["timeout"] == 0.5
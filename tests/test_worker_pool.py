@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from uuid import uuid4
+
+from pytest import mark, raises
+from respx import MockRouter
+
+from galileo_protect.exceptions import WorkerPoolFullError
+from galileo_protect.protector import Protector
+from galileo_protect.schemas import Payload
+from galileo_protect.worker_pool import ProtectWorkerPool
+from tests.data import A_STAGE_NAME
+
+
+def test_submit_from_threads(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    route = mock_echo_invoke()
+    with ProtectWorkerPool(max_batch_size=8) as pool:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = list(executor.map(lambda n: pool.submit(Payload(input=str(n))), range(40)))
+        assert [future.result(timeout=5).text for future in futures] == [str(n) for n in range(40)]
+    stats = pool.stats
+    assert (stats.submitted, stats.completed, stats.failed, stats.queued) == (40, 40, 0, 0)
+    # Payloads are gathered into batches.
+    assert 5 <= stats.batches < 40
+    assert route.call_count == 40
+
+
+@mark.asyncio
+async def test_ainvoke(set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_echo_invoke()
+    async with ProtectWorkerPool() as pool:
+        response = await pool.ainvoke(Payload(input="foo"))
+        assert response.text == "foo"
+        with raises(Exception):
+            await pool.ainvoke(Payload(input="fail"))
+    assert pool.stats.failed == 1
+
+
+def test_invoke_owns_client(set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_echo_invoke()
+    protector = Protector()
+    pool = ProtectWorkerPool(protector)
+    # The protector that was passed in isn't changed.
+    assert protector.client is None
+    assert pool.protector.client is not None
+    assert pool.invoke(Payload(input="foo")).text == "foo"
+    assert pool.protector.client._async_client is not None
+    pool.shutdown()
+    assert pool.protector.client._async_client is None
+    with raises(RuntimeError, match="Worker pool is shut down."):
+        pool.submit(Payload(input="foo"))
+
+
+def test_queue_full(set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    mock_echo_invoke()
+    pool = ProtectWorkerPool(batch_window=0.5, max_queue_size=2)
+    futures = [pool.submit(Payload(input=str(n))) for n in range(2)]
+    with raises(WorkerPoolFullError):
+        pool.submit(Payload(input="rejected"))
+    assert pool.stats.rejected == 1
+    pool.shutdown()
+    assert [future.result().text for future in futures] == ["0", "1"]
+
+
+def test_shutdown_cancel_pending(
+    set_validated_config: Callable, respx_mock: MockRouter, mock_echo_invoke: Callable
+) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    route = mock_echo_invoke()
+    pool = ProtectWorkerPool(batch_window=0.5)
+    futures = [pool.submit(Payload(input=str(n))) for n in range(3)]
+    futures[0].cancel()
+    pool.shutdown(cancel_pending=True)
+    assert all(future.cancelled() for future in futures)
+    assert not route.called
+
+
+def test_invalid(set_validated_config: Callable) -> None:
+    set_validated_config(project_id=uuid4(), stage_name=A_STAGE_NAME)
+    with raises(ValueError, match="Batch size, queue size and requests in flight must be at least 1."):
+        ProtectWorkerPool(max_batch_size=0)